@@ -0,0 +1,3 @@
+from interview_app.analytics import run
+
+run()
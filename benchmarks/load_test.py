@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from interview_app import settings  # noqa: E402
+from interview_app.mock_server import MockServer  # noqa: E402
+from interview_app.workers import get_registry  # noqa: E402
+
+# Drives the interview apps headlessly with AppTest against the local mock
+# backend: N candidates run M answer turns each, interleaved in this process.
+
+APPS = ["main_streamlit.py", "main_streamlit_02.py", "main_streamlit_03.py"]
+WORDS = "scalable service cache queue shard replica latency budget index retry".split()
+
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))]
+
+
+def rss_mb():
+    # Current RSS from /proc where available, peak RSS otherwise
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_answer(candidate, turn, words):
+    return " ".join(WORDS[(candidate + turn + i) % len(WORDS)] for i in range(words))
+
+
+class CandidateRun:
+    def __init__(self, app_path, timeout):
+        self.app = AppTest.from_file(app_path, default_timeout=timeout)
+        self.reruns = []
+        self.turns = []
+        self.error = None
+
+    def run(self):
+        started = time.perf_counter()
+        self.app.run()
+        self.reruns.append(time.perf_counter() - started)
+        if self.app.exception:
+            raise RuntimeError(self.app.exception[0].message)
+
+    def interview(self, candidate, turns, words):
+        # Generator: yields after every rerun so the scheduler can interleave candidates.
+        # Yields True while only waiting on a pending backend call.
+        self.run()
+        yield False
+        self.app.button[0].click()
+        self.run()
+        yield False
+        for turn in range(turns):
+            started = time.perf_counter()
+            self.app.chat_input[0].set_value(make_answer(candidate, turn, words))
+            self.run()
+            yield False
+            while self.app.session_state["pending_turn"] is not None:
+                yield True
+                self.run()
+            self.turns.append(time.perf_counter() - started)
+
+
+def drive(runs, turns, words, poll):
+    # AppTest patches process-global Streamlit state, so scripts cannot run on
+    # several threads at once. Candidates are interleaved on one thread instead;
+    # their backend calls still overlap on the shared submission pool.
+    active = {i: run.interview(i, turns, words) for i, run in enumerate(runs)}
+    while active:
+        waiting = True
+        for candidate, interview in list(active.items()):
+            try:
+                waiting = next(interview) and waiting
+            except StopIteration:
+                del active[candidate]
+                waiting = False
+            except Exception as ex:
+                runs[candidate].error = f"candidate {candidate}: {ex}"
+                del active[candidate]
+                waiting = False
+        if waiting:
+            time.sleep(poll)
+
+
+def bench_app(app, candidates, turns, words, latency, poll, timeout):
+    server = MockServer(port=0, latency=latency).start()
+    settings.BACKEND_URL = server.url
+    # Finished turns of the previous app must not answer this one's
+    get_registry.clear()
+    rss_before = rss_mb()
+    runs = [CandidateRun(os.path.join(ROOT, app), timeout) for _ in range(candidates)]
+
+    started = time.perf_counter()
+    drive(runs, turns, words, poll)
+    elapsed = time.perf_counter() - started
+
+    server.shutdown()
+    server.server_close()
+
+    reruns = [s for run in runs for s in run.reruns]
+    turn_times = [s for run in runs for s in run.turns]
+    answers = [entry for entry in server.backend.request_log if entry[0] > 0]
+    first = [entry for entry in answers if entry[0] <= 2]
+    last_length = max((entry[0] for entry in answers), default=0)
+    last = [entry for entry in answers if entry[0] == last_length]
+    return {
+        "app": app,
+        "candidates": candidates,
+        "turns": turns,
+        "elapsed_s": round(elapsed, 2),
+        "errors": [run.error for run in runs if run.error],
+        "rerun_ms": {q: round(percentile(reruns, q) * 1000, 1) for q in (50, 95, 99)},
+        "turn_ms": {q: round(percentile(turn_times, q) * 1000, 1) for q in (50, 95, 99)},
+        "bytes_per_turn": {
+            "request_mean": round(statistics.fmean(e[1] for e in answers), 1) if answers else 0,
+            "response_mean": round(statistics.fmean(e[2] for e in answers), 1) if answers else 0,
+            "request_first": round(statistics.fmean(e[1] for e in first), 1) if first else 0,
+            "request_last": round(statistics.fmean(e[1] for e in last), 1) if last else 0,
+        },
+        "rss_mb": {"before": round(rss_before, 1), "after": round(rss_mb(), 1)},
+        "backend": server.backend.snapshot(),
+    }
+
+
+def print_report(results):
+    header = f"{'app':<22}{'rerun p50/p95/p99 ms':>24}{'turn p50/p95 ms':>20}{'req B/turn first→last':>26}{'resp B/turn':>13}{'RSS MB':>16}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        rerun = "/".join(str(r["rerun_ms"][q]) for q in (50, 95, 99))
+        turn = "/".join(str(r["turn_ms"][q]) for q in (50, 95))
+        wire = r["bytes_per_turn"]
+        growth = f"{wire['request_first']:.0f}→{wire['request_last']:.0f}"
+        rss = f"{r['rss_mb']['before']:.0f}→{r['rss_mb']['after']:.0f}"
+        print(f"{r['app']:<22}{rerun:>24}{turn:>20}{growth:>26}{wire['response_mean']:>13.0f}{rss:>16}")
+        for error in r["errors"]:
+            print(f"  ! {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless load test for the interview apps")
+    parser.add_argument("apps", nargs="*", default=APPS)
+    parser.add_argument("--candidates", type=int, default=4, help="Concurrent simulated candidates")
+    parser.add_argument("--turns", type=int, default=10, help="Answer turns per candidate")
+    parser.add_argument("--answer-words", type=int, default=80)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock backend latency per call, in seconds")
+    parser.add_argument("--poll", type=float, default=0.05, help="Seconds between reruns while a turn is pending")
+    parser.add_argument("--timeout", type=float, default=60.0, help="AppTest timeout per rerun, in seconds")
+    parser.add_argument("--json", help="Also write the raw results to this file")
+    args = parser.parse_args()
+
+    results = [
+        bench_app(app, args.candidates, args.turns, args.answer_words, args.latency, args.poll, args.timeout)
+        for app in args.apps
+    ]
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# Shared interview client core, session state model and UI skins for the
+# NOHA / Bar Riser interview apps. Entry points live in main_streamlit*.py.
@@ -0,0 +1,211 @@
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from . import settings
+
+# Recruiter dashboard over the score store. Each filter combination is one
+# scan of the Parquet dataset (memory-mapped, pruned to the selected date and
+# question_id partitions, only the needed columns); the scan is reduced to small
+# aggregate frames right away and only those are cached.
+
+PERCENTILES = [10, 25, 50, 75, 90]
+SCORE_BINS = np.arange(0, 10.5, 0.5)
+
+
+def _dataset(root, table):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    partitioning = ds.partitioning(pa.schema([("date", pa.string()), ("question_id", pa.int64())]), flavor="hive")
+    return ds.dataset(
+        os.path.join(root, table),
+        format="parquet",
+        partitioning=partitioning,
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def _filter(start, end, question_ids):
+    import pyarrow.dataset as ds
+
+    expression = (ds.field("date") >= start.isoformat()) & (ds.field("date") <= end.isoformat())
+    if question_ids:
+        expression &= ds.field("question_id").isin(list(question_ids))
+    return expression
+
+
+def read_table(root, table, columns, start, end, question_ids=()):
+    if not os.path.isdir(os.path.join(root, table)):
+        return None
+    return _dataset(root, table).to_table(columns=columns, filter=_filter(start, end, question_ids))
+
+
+def _categorical(column):
+    # String columns are grouped on dictionary codes rather than Python strings
+    encoded = column.combine_chunks().dictionary_encode()
+    return pd.Categorical.from_codes(encoded.indices.to_numpy(zero_copy_only=False),
+                                     categories=encoded.dictionary.to_pylist())
+
+
+def _floats(column):
+    return column.to_numpy(zero_copy_only=False).astype(float, copy=False)
+
+
+def score_distribution(final_scores):
+    counts, edges = np.histogram(final_scores[~np.isnan(final_scores)], bins=SCORE_BINS)
+    return pd.DataFrame({"Score": edges[:-1], "Evaluations": counts})
+
+
+def criterion_percentiles(criteria, scores):
+    # One (criterion number, score) pair per criteria_score entry; evaluations
+    # may carry any number of criteria
+    frame = pd.DataFrame({"criterion": criteria, "score": scores}).dropna()
+    grouped = frame.groupby("criterion")["score"]
+    summary = pd.DataFrame({"mean": grouped.mean()})
+    for p in PERCENTILES:
+        summary[f"p{p}"] = grouped.quantile(p / 100)
+    summary.index = [f"Criteria {criterion}" for criterion in summary.index]
+    return summary
+
+
+def question_difficulty(question_ids, final_scores):
+    # Lowest mean score first: the hardest questions lead the table
+    frame = pd.DataFrame({"question_id": question_ids, "final_score": final_scores})
+    grouped = frame.groupby("question_id")["final_score"]
+    summary = grouped.agg(["count", "mean", "std", "median"])
+    summary["p25"] = grouped.quantile(0.25)
+    summary["p75"] = grouped.quantile(0.75)
+    return summary.sort_values("mean")
+
+
+def subcriteria_summary(names, weights, scores):
+    frame = pd.DataFrame({"subcriterion": names, "weight": weights, "score": scores})
+    frame["weighted"] = frame["weight"] * frame["score"]
+    return frame.groupby("subcriterion", observed=True).agg(
+        evaluations=("score", "size"),
+        mean_score=("score", "mean"),
+        mean_weight=("weight", "mean"),
+        mean_weighted=("weighted", "mean"),
+    ).sort_values("mean_score")
+
+
+def daily_counts(dates, final_scores):
+    frame = pd.DataFrame({"date": dates, "final_score": final_scores})
+    return frame.groupby("date", observed=True)["final_score"].agg(evaluations="size", mean_score="mean")
+
+
+@st.cache_data(ttl=settings.ANALYTICS_CACHE_TTL, show_spinner="Aggregating scores…", max_entries=64)
+def query(root, start, end, question_ids, refresh_token=0):
+    # refresh_token only takes part in the cache key (the Reload button bumps it)
+    evaluations = read_table(root, "evaluations",
+                             ["date", "question_id", "interview_id", "final_score"],
+                             start, end, question_ids)
+    if evaluations is None or evaluations.num_rows == 0:
+        return None
+
+    final_scores = _floats(evaluations.column("final_score"))
+    result = {
+        "evaluations": evaluations.num_rows,
+        "interviews": len(evaluations.column("interview_id").unique()),
+        "mean_score": float(np.nanmean(final_scores)),
+        "median_score": float(np.nanmedian(final_scores)),
+        "distribution": score_distribution(final_scores),
+        "criteria": None,
+        "questions": question_difficulty(evaluations.column("question_id").to_numpy(), final_scores),
+        "daily": daily_counts(_categorical(evaluations.column("date")), final_scores),
+        "subcriteria": None,
+    }
+
+    criteria = read_table(root, "criteria", ["criterion", "score"], start, end, question_ids)
+    if criteria is not None and criteria.num_rows:
+        result["criteria"] = criterion_percentiles(criteria.column("criterion").to_numpy(),
+                                                   _floats(criteria.column("score")))
+
+    subcriteria = read_table(root, "subcriteria", ["subcriterion", "weight", "score"], start, end, question_ids)
+    if subcriteria is not None and subcriteria.num_rows:
+        result["subcriteria"] = subcriteria_summary(
+            _categorical(subcriteria.column("subcriterion")),
+            _floats(subcriteria.column("weight")),
+            _floats(subcriteria.column("score")),
+        )
+    return result
+
+
+@st.cache_data(ttl=settings.ANALYTICS_CACHE_TTL, show_spinner=False)
+def partitions(root, refresh_token=0):
+    # (dates, question ids) from the directory names, without opening any file
+    table_root = os.path.join(root, "evaluations")
+    dates, question_ids = set(), set()
+    if os.path.isdir(table_root):
+        for date_entry in os.scandir(table_root):
+            if not date_entry.name.startswith("date="):
+                continue
+            dates.add(date_entry.name[len("date="):])
+            for question_entry in os.scandir(date_entry.path):
+                if question_entry.name.startswith("question_id="):
+                    try:
+                        question_ids.add(int(question_entry.name[len("question_id="):]))
+                    except ValueError:
+                        pass
+    return sorted(dates), sorted(question_ids)
+
+
+def run(root=settings.SCORE_STORE_DIR):
+    st.set_page_config(page_title="Interview analytics", page_icon="📊", layout="wide")
+    st.title("Interview analytics")
+
+    if "analytics_refresh" not in st.session_state:
+        st.session_state.analytics_refresh = 0
+    with st.sidebar:
+        if st.button("Reload data"):
+            st.session_state.analytics_refresh += 1
+    token = st.session_state.analytics_refresh
+
+    dates, question_ids = partitions(root, token)
+    if not dates:
+        st.info(f"No evaluations stored in `{root}` yet.")
+        return
+
+    with st.sidebar:
+        first, last = datetime.date.fromisoformat(dates[0]), datetime.date.fromisoformat(dates[-1])
+        picked = st.date_input("Dates", value=(first, last), min_value=first, max_value=last)
+        start, end = (picked[0], picked[-1]) if isinstance(picked, (list, tuple)) else (picked, picked)
+        selected = st.multiselect("Questions", question_ids, placeholder="All questions")
+
+    result = query(root, start, end, tuple(sorted(selected)), token)
+    if result is None:
+        st.info("No evaluations match these filters.")
+        return
+
+    columns = st.columns(4)
+    columns[0].metric("Evaluations", f"{result['evaluations']:,}")
+    columns[1].metric("Interviews", f"{result['interviews']:,}")
+    columns[2].metric("Mean score", f"{result['mean_score']:.2f}")
+    columns[3].metric("Median score", f"{result['median_score']:.2f}")
+
+    left, right = st.columns(2)
+    with left:
+        st.subheader("Final score distribution")
+        st.bar_chart(result["distribution"], x="Score", y="Evaluations")
+    with right:
+        st.subheader("Evaluations per day")
+        st.line_chart(result["daily"]["evaluations"])
+
+    if result["criteria"] is not None:
+        st.subheader("Percentiles per criterion")
+        st.dataframe(result["criteria"].style.format("{:.2f}"), use_container_width=True)
+
+    st.subheader("Question difficulty")
+    st.caption("Hardest first (lowest mean final score)")
+    st.dataframe(result["questions"].style.format("{:.2f}", subset=["mean", "std", "median", "p25", "p75"]),
+                 use_container_width=True)
+
+    if result["subcriteria"] is not None:
+        st.subheader("Subcriteria")
+        st.dataframe(result["subcriteria"].style.format("{:.2f}", subset=["mean_score", "mean_weight", "mean_weighted"]),
+                     use_container_width=True)
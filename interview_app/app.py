@@ -0,0 +1,39 @@
+import streamlit as st
+
+from . import instrumentation, profiling, sessions, settings
+from .core import InterviewSession
+from .skins import SKINS
+
+
+def run(skin_name):
+    # cProfile of the whole rerun with NOHA_PROFILE=1
+    with profiling.profile_rerun():
+        _run(skin_name)
+
+
+def _run(skin_name):
+    skin = SKINS[skin_name]()
+    skin.configure_page()
+
+    # Registered as running so the idle sweeper leaves this session alone; a
+    # session the sweeper marked is cleared before anything reads its state
+    token = sessions.begin_session()
+    try:
+        # Per-rerun timings and payload sizes (sidebar with ?metrics=1)
+        instrumentation.begin_rerun(skin.name)
+        instrumentation.render_sidebar(sessions.live_counts)
+
+        session = InterviewSession(skin)
+        skin.render(session)
+    except sessions.UnknownCandidate:
+        session = None
+    finally:
+        sessions.end_session(token)
+
+    if session is None:
+        st.error("This interview link is not valid. Please check the link you were sent.")
+        st.stop()
+
+    if settings.METRICS_FILE:
+        instrumentation.note(**sessions.live_counts())
+    instrumentation.finish_rerun()
@@ -0,0 +1,318 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urljoin
+
+import requests
+import streamlit as st
+
+from . import settings
+from .client import RETRY_STATUSES, LatencyStats
+
+logger = logging.getLogger(__name__)
+
+# Several /begin_interview backends in priority order. Each one has a circuit
+# breaker fed by its own calls and by a background health check, so a dead
+# backend is skipped instead of hanging every session until its read timeout.
+# A turn goes to the first available backend; if it has not answered by the
+# backend's recent p95 latency the same turn is also sent to the next one and
+# the first answer wins. Both requests carry the same Idempotency-Key, so the
+# backend can recognise the duplicate.
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+ALIASES = {
+    "local": settings.LOCAL_BACKEND_URL,
+    "remote": settings.REMOTE_BACKEND_URL,
+}
+
+
+class BackendUnavailable(Exception):
+    pass
+
+
+class CircuitBreaker:
+    # closed: calls flow. open: the backend is skipped until reset_timeout has
+    # passed, then half_open lets calls through and the next result decides.
+    def __init__(self, failure_threshold=settings.BREAKER_FAILURES, reset_timeout=settings.BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.succeeded_at = None
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.succeeded_at = time.monotonic()
+
+    def succeeded_within(self, seconds):
+        with self._lock:
+            return self.succeeded_at is not None and time.monotonic() - self.succeeded_at < seconds
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def probe_succeeded(self):
+        # The backend answers its health check again: let the next call try it
+        with self._lock:
+            if self.opened_at is not None:
+                self.opened_at = time.monotonic() - self.reset_timeout
+
+
+class Backend:
+    def __init__(self, url):
+        self.url = url
+        self.health_url = urljoin(url, settings.BACKEND_HEALTH_PATH)
+        self.breaker = CircuitBreaker()
+        self.stats = LatencyStats()
+
+    @property
+    def available(self):
+        return self.breaker.state != "open"
+
+    def snapshot(self):
+        stats = self.stats.snapshot()
+        return {
+            "url": self.url,
+            "state": self.breaker.state,
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "p95_ms": round(stats["p95_ms"], 1),
+        }
+
+
+class BackendPool:
+    def __init__(
+        self,
+        urls,
+        hedge=settings.HEDGE,
+        hedge_percentile=settings.HEDGE_PERCENTILE,
+        hedge_min_delay=settings.HEDGE_MIN_DELAY,
+        hedge_initial_delay=settings.HEDGE_INITIAL_DELAY,
+        hedge_min_samples=settings.HEDGE_MIN_SAMPLES,
+        hedge_max_in_flight=settings.HEDGE_MAX_IN_FLIGHT,
+        health_interval=settings.HEALTH_INTERVAL,
+        max_workers=settings.WORKER_THREADS * 2,
+    ):
+        self.backends = [Backend(url) for url in urls]
+        self.hedge = hedge and len(self.backends) > 1
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_initial_delay = hedge_initial_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_max_in_flight = hedge_max_in_flight
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+        self.failovers = 0
+        # Requests on the executor, losers still running in the background included
+        self.attempts_in_flight = 0
+        self.hedges_in_flight = 0
+        self.health_interval = health_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="interview-backend")
+        self._health_session = requests.Session()
+        if health_interval > 0:
+            self._checker = threading.Thread(target=self._check_forever, args=(health_interval,), daemon=True,
+                                             name="interview-backend-health")
+            self._checker.start()
+
+    def available(self):
+        return [backend for backend in self.backends if backend.available]
+
+    def hedge_delay(self, backend):
+        # Until the backend has some history, a fixed delay stands in for its p95
+        if backend.stats.calls < self.hedge_min_samples:
+            return self.hedge_initial_delay
+        return max(self.hedge_min_delay, backend.stats.percentile(self.hedge_percentile))
+
+    def _count(self, key):
+        with self._lock:
+            setattr(self, key, getattr(self, key) + 1)
+
+    def _reserve_hedge(self):
+        # A loser keeps its executor thread until its backend answers, so hedges
+        # are capped, and skipped outright while every thread is busy
+        with self._lock:
+            if self.hedges_in_flight >= self.hedge_max_in_flight or self.attempts_in_flight >= self.max_workers:
+                self.hedges_skipped += 1
+                return False
+            self.hedges_in_flight += 1
+            return True
+
+    def _release(self, hedge):
+        with self._lock:
+            self.attempts_in_flight -= 1
+            if hedge:
+                self.hedges_in_flight -= 1
+
+    def _attempt(self, backend, client, body, prepared, stream, headers, hedge):
+        # Runs on the pool's executor. The TurnStream constructor waits for the
+        # first event of a streamed turn, so this measures time to an answer,
+        # not time to response headers.
+        started = time.perf_counter()
+        try:
+            turn = client.turn_stream(backend.url, body, prepared, stream=stream, headers=headers)
+        except Exception:
+            backend.stats.record(time.perf_counter() - started, ok=False)
+            backend.breaker.record_failure()
+            raise
+        finally:
+            self._release(hedge)
+        failed = turn.res.status_code in RETRY_STATUSES or turn.res.status_code >= 500
+        backend.stats.record(time.perf_counter() - started, ok=not failed)
+        if failed:
+            backend.breaker.record_failure()
+        else:
+            backend.breaker.record_success()
+        return turn
+
+    def stream_interview(self, client, body, sync=None, stream=settings.STREAMING, key=None):
+        candidates = self.available()
+        if not candidates:
+            raise BackendUnavailable("No interview backend is available, please try again shortly")
+
+        headers = {IDEMPOTENCY_HEADER: key or uuid.uuid4().hex}
+        prepared = sync.prepare(body) if sync is not None else body
+        pending = {}
+
+        def launch(hedge=False):
+            backend = candidates.pop(0)
+            with self._lock:
+                self.attempts_in_flight += 1
+            future = self._executor.submit(self._attempt, backend, client, body, prepared, stream, headers, hedge)
+            pending[future] = (backend, hedge)
+            return backend
+
+        primary = launch()
+        delay = self.hedge_delay(primary)
+        hedging = self.hedge
+        winner = failure = None
+        launched = 1
+        while pending and winner is None:
+            done, _ = wait(pending, timeout=delay if hedging and candidates else None, return_when=FIRST_COMPLETED)
+            if not done:
+                if self._reserve_hedge():
+                    # The primary is slower than usual: race it against the next backend
+                    launch(hedge=True)
+                    launched += 1
+                    self._count("hedged")
+                else:
+                    hedging = False
+                continue
+            for future in done:
+                backend, _ = pending.pop(future)
+                try:
+                    turn = future.result()
+                except Exception as ex:
+                    failure = ex
+                    continue
+                if turn.res.status_code in RETRY_STATUSES or turn.res.status_code >= 500:
+                    failure = turn
+                    continue
+                winner = turn
+                winner.metrics["backend"] = backend.url
+                winner.metrics["hedged"] = launched > 1
+                if backend is not primary:
+                    racing = any(other is primary for other, _ in pending.values())
+                    self._count("hedge_wins" if racing else "failovers")
+                break
+            if winner is None and not pending and candidates:
+                # Nothing left in flight: fail over to the next backend now
+                launch()
+                launched += 1
+
+        for future, (_, hedge) in pending.items():
+            if future.cancel():
+                # Never started, so never reached _attempt
+                self._release(hedge)
+            else:
+                # Still running: its connection is closed as soon as it returns
+                future.add_done_callback(_discard)
+
+        if winner is None:
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+        if sync is not None and winner:
+            sync.acknowledge(winner.res, body)
+        return winner
+
+    def check_health(self, timeout=5):
+        # A failed probe counts as one failure towards BREAKER_FAILURES, like a
+        # failed call. A probe that times out while real calls keep succeeding
+        # only says the backend is busy (one evaluation can take longer than
+        # the probe timeout), so it is not counted.
+        for backend in self.backends:
+            try:
+                res = self._health_session.get(backend.health_url, timeout=(settings.CONNECT_TIMEOUT, timeout))
+                res.close()
+                # Any answer short of a server error means the backend is up;
+                # it does not have to implement the health path
+                healthy = res.status_code < 500
+            except requests.Timeout:
+                if backend.breaker.succeeded_within(self.health_interval + timeout):
+                    continue
+                healthy = False
+            except requests.RequestException:
+                healthy = False
+            if healthy:
+                backend.breaker.probe_succeeded()
+            else:
+                backend.breaker.record_failure()
+
+    def _check_forever(self, interval):
+        while True:
+            try:
+                self.check_health()
+            except Exception:
+                logger.exception("Backend health check failed")
+            time.sleep(interval)
+
+    def snapshot(self):
+        with self._lock:
+            counts = {
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "hedges_skipped": self.hedges_skipped,
+                "failovers": self.failovers,
+            }
+        return dict(counts, backends=[backend.snapshot() for backend in self.backends])
+
+
+def _discard(future):
+    try:
+        turn = future.result()
+    except Exception:
+        return
+    turn.res.close()
+
+
+def backend_urls(default_url):
+    # NOHA_BACKENDS lists URLs (or "local"/"remote") in priority order; without
+    # it the app's own endpoint is the only backend
+    if settings.BACKENDS:
+        return tuple(ALIASES.get(url, url) for url in settings.BACKENDS)
+    return (settings.BACKEND_URL or default_url,)
+
+
+@st.cache_resource
+def get_backend_pool(urls):
+    return BackendPool(urls)
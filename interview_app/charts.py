@@ -0,0 +1,102 @@
+import io
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from . import settings
+
+
+class PngCache:
+    # Process-wide LRU of rendered chart PNGs keyed on (chart, history token, length, points)
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            png = self._items.get(key)
+            if png is not None:
+                self._items.move_to_end(key)
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            self._items[key] = png
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+_png_cache = PngCache(settings.CHART_CACHE_SIZE)
+
+
+def criteria_columns(history):
+    return [f"Criteria {i+1}" for i in range(history.width)]
+
+
+def _draw_final(ax, history, points):
+    (attempts, scores), = history.series(points)
+    ax.plot(attempts, scores, marker='o', linestyle='-', color='b')
+    ax.set_title("Final Score Over Time")
+    ax.set_xlabel("Attempts")
+    ax.set_ylabel("Score")
+    ax.grid(True)
+
+
+def _draw_criteria(ax, history, points):
+    for attempts, scores in history.series(points):
+        ax.plot(attempts, scores, marker='o', linestyle='-')
+    ax.set_title("Criteria Score Over Attempts")
+    ax.set_xlabel("Attempts")
+    ax.set_ylabel("Score")
+    ax.legend(criteria_columns(history), loc="upper right")
+    ax.grid(True)
+
+
+def _render_png(draw, history, points):
+    # matplotlib.figure.Figure is not registered with pyplot, so nothing keeps
+    # the figure alive once the PNG has been written
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    try:
+        draw(fig.subplots(), history, points)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png")
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+def _matplotlib_chart(name, draw, history, points):
+    key = (name, history.token, len(history), points)
+    png = _png_cache.get(key)
+    if png is None:
+        png = _render_png(draw, history, points)
+        _png_cache.put(key, png)
+    st.image(png, use_container_width=True)
+
+
+def final_score_chart(history, backend=settings.CHART_BACKEND, points=settings.CHART_POINTS):
+    # `history` is a scores.ScoreHistory; beyond `points` attempts the line is
+    # downsampled (LTTB), which keeps its peaks and dips
+    if backend == "native":
+        (attempts, scores), = history.series(points)
+        st.line_chart({"Attempt": attempts, "Final Score": scores}, x="Attempt")
+    else:
+        _matplotlib_chart("final_score", _draw_final, history, points)
+
+
+def criteria_score_chart(history, backend=settings.CHART_BACKEND, points=settings.CHART_POINTS):
+    if backend == "native":
+        # Long format: each criterion is downsampled on its own attempts
+        data = {"Attempt": [], "Score": [], "Criterion": []}
+        for column, (attempts, scores) in zip(criteria_columns(history), history.series(points)):
+            data["Attempt"].extend(attempts.tolist())
+            data["Score"].extend(scores.tolist())
+            data["Criterion"].extend([column] * len(attempts))
+        st.line_chart(data, x="Attempt", y="Score", color="Criterion")
+    else:
+        _matplotlib_chart("criteria_score", _draw_criteria, history, points)
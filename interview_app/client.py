@@ -0,0 +1,470 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from . import settings, wire
+
+RETRY_STATUSES = (502, 503, 504)
+HISTORY_GAP_STATUS = 409
+HISTORY_SEQ_HEADER = "X-History-Seq"
+SSE_CONTENT_TYPE = "text/event-stream"
+STREAM_FIELDS = ("greeting", "question", "hint")
+
+
+class LatencyStats:
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds, ok=True):
+        with self._lock:
+            self.calls += 1
+            if not ok:
+                self.errors += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self._samples.append(seconds)
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def percentile(self, q):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self):
+        with self._lock:
+            calls = self.calls
+            summary = {
+                "calls": calls,
+                "errors": self.errors,
+                "retries": self.retries,
+                "mean_ms": (self.total_seconds / calls * 1000) if calls else 0.0,
+                "max_ms": self.max_seconds * 1000,
+            }
+        summary["p50_ms"] = self.percentile(50) * 1000
+        summary["p95_ms"] = self.percentile(95) * 1000
+        return summary
+
+
+def _fingerprint(entry):
+    return json.dumps(entry, sort_keys=True)
+
+
+class HistorySync:
+    # Tracks how much of chat_history the backend has acknowledged so that
+    # later turns only carry the new (or changed) entries
+    def __init__(self, mode=settings.HISTORY_SYNC):
+        self.mode = mode
+        self.reset()
+
+    def reset(self):
+        self.interview_id = None
+        self.acked = 0
+        self.acked_tail = None
+
+    def prepare(self, body):
+        history = body.get("chat_history") or []
+        if (
+            self.mode != "delta"
+            or not self.acked
+            or body.get("interview_id") != self.interview_id
+            or self.acked > len(history)
+        ):
+            return body
+
+        # The last acknowledged entry is mutated in place when the candidate answers
+        base = self.acked
+        if _fingerprint(history[base - 1]) != self.acked_tail:
+            base -= 1
+
+        delta = {k: v for k, v in body.items() if k != "chat_history"}
+        delta["history_mode"] = "delta"
+        delta["history_base"] = base
+        delta["chat_history_delta"] = history[base:]
+        return delta
+
+    def acknowledge(self, res, body):
+        seq = res.headers.get(HISTORY_SEQ_HEADER)
+        history = body.get("chat_history") or []
+        if seq is None or not body.get("interview_id") or int(seq) != len(history):
+            # Backend does not speak the delta protocol (or disagrees); stay on full sync
+            self.reset()
+            return
+        self.interview_id = body["interview_id"]
+        self.acked = len(history)
+        self.acked_tail = _fingerprint(history[-1]) if history else None
+
+
+def results_digest(results):
+    # Names an evaluation_results mapping for diff-encoded evaluations; content
+    # based, so any backend holding the same results agrees on it
+    return hashlib.blake2b(json.dumps(results, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+class EvaluationGap(Exception):
+    pass
+
+
+class EvaluationSync:
+    # Keeps the interview's last full evaluation_results. Requests name it by
+    # digest; a backend holding the same results answers with
+    #
+    #   "evaluation_results_diff": {"base": <digest>, "digest": <new digest>,
+    #       "scores": {name: score}, "results": {name: [weight, score]}, "removed": [name]}
+    #
+    # where "scores" are subcriteria whose score alone changed and "results" are
+    # new ones or ones whose weight changed. apply() expands it in place, so the
+    # rest of the app only ever sees full mappings; `changed` names the
+    # subcriteria the last evaluation touched (None after a full one).
+    def __init__(self, mode=settings.EVALUATION_SYNC):
+        self.mode = mode
+        self.reset()
+
+    def reset(self):
+        self.results = None
+        self.digest = None
+        self.changed = None
+
+    def prepare(self, body):
+        if self.mode != "diff":
+            return body
+        return dict(body, evaluation_mode="diff", evaluation_base=self.digest)
+
+    def apply(self, data):
+        evaluation = data.get("evaluation") if isinstance(data, dict) else None
+        if not isinstance(evaluation, dict):
+            return
+        diff = evaluation.pop("evaluation_results_diff", None)
+        if diff is not None:
+            if diff["digest"] == self.digest:
+                # Streamed turns carry the evaluation twice (meta and final data)
+                evaluation["evaluation_results"] = self.results
+                return
+            scores = diff.get("scores", {})
+            if (
+                self.results is None
+                or diff["base"] != self.digest
+                or any(name not in self.results for name in scores)
+            ):
+                # Diffed against results this session does not hold
+                self.reset()
+                raise EvaluationGap("The evaluation did not match the previous one")
+            results = dict(self.results)
+            results.update({name: [results[name][0], score] for name, score in scores.items()})
+            results.update(diff.get("results", {}))
+            for name in diff.get("removed", []):
+                results.pop(name, None)
+            evaluation["evaluation_results"] = self.results = results
+            self.digest = diff["digest"]
+            self.changed = [*scores, *diff.get("results", {}), *diff.get("removed", [])]
+        elif "evaluation_results" in evaluation and evaluation["evaluation_results"] is not self.results:
+            self.results = evaluation["evaluation_results"]
+            self.digest = results_digest(self.results)
+            self.changed = None
+
+
+class WireNegotiation:
+    # Remembers, per endpoint, which body type and compression the backend has
+    # advertised in its Accept-Post / Accept-Encoding response headers. Until it
+    # has, request bodies are plain JSON; a 415 forgets the endpoint again.
+    def __init__(
+        self,
+        compression=settings.WIRE_COMPRESSION,
+        body_format=settings.WIRE_FORMAT,
+        min_bytes=settings.WIRE_MIN_BYTES,
+    ):
+        self.encodings = [e for e in wire.content_encodings() if compression in ("auto", e)]
+        self.body_types = [t for t in wire.body_types() if body_format == "msgpack" or t == wire.JSON_TYPE]
+        self.min_bytes = min_bytes
+        self._lock = threading.Lock()
+        self._peers = {}
+
+    def accept_headers(self):
+        # Responses are decompressed by urllib3, which handles gzip and (with
+        # zstandard installed) zstd
+        return {
+            "Accept": ", ".join(self.body_types),
+            "Accept-Encoding": ", ".join(self.encodings + [wire.IDENTITY]),
+        }
+
+    def encode(self, url, body, plain=False):
+        with self._lock:
+            content_type, encoding = (wire.JSON_TYPE, None) if plain else self._peers.get(url, (wire.JSON_TYPE, None))
+        started = time.perf_counter()
+        data = wire.encode(body, content_type)
+        encoded = time.perf_counter()
+        metrics = {"serialize_ms": (encoded - started) * 1000, "body_bytes": len(data)}
+        headers = {"Content-Type": content_type}
+        if encoding and len(data) >= self.min_bytes:
+            data = wire.compress(data, encoding)
+            headers["Content-Encoding"] = encoding
+            metrics["compress_ms"] = (time.perf_counter() - encoded) * 1000
+        metrics["request_bytes"] = len(data)
+        return data, headers, metrics
+
+    def learn(self, url, res):
+        if "Accept-Post" not in res.headers and "Accept-Encoding" not in res.headers:
+            return
+        content_type = wire.choose(res.headers.get("Accept-Post"), self.body_types) or wire.JSON_TYPE
+        encoding = wire.choose(res.headers.get("Accept-Encoding"), self.encodings)
+        with self._lock:
+            self._peers[url] = (content_type, encoding)
+
+    def forget(self, url):
+        with self._lock:
+            self._peers.pop(url, None)
+
+
+class InterviewStreamError(Exception):
+    pass
+
+
+def _iter_sse(res, metrics):
+    res.encoding = "utf-8"
+    event, data = "message", []
+    for line in res.iter_lines(chunk_size=None, decode_unicode=True):
+        metrics["response_bytes"] += len(line) + 1
+        if not line:
+            if data:
+                started = time.perf_counter()
+                payload = json.loads("\n".join(data))
+                metrics["decode_ms"] += (time.perf_counter() - started) * 1000
+                yield event, payload
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+
+
+class TurnStream:
+    # Wraps one /begin_interview turn. `meta` holds the response data without the
+    # generated text, iterating yields the text as it arrives (also collected in
+    # `received`) and `data` holds the complete response once the iteration has
+    # finished. Plain JSON responses, and streams that were already consumed,
+    # are yielded as a single chunk so callers have one code path. `metrics`
+    # collects timings and byte counts for the instrumentation panel.
+    def __init__(self, res):
+        self.res = res
+        self.ok = res.ok
+        self.meta = None
+        self.data = None
+        self.field = None
+        self.received = []
+        self._events = None
+        self._finished = []
+        self.metrics = dict(getattr(res, "metrics", {}), response_bytes=0, decode_ms=0.0)
+        if not self.ok:
+            res.close()
+            return
+
+        events = getattr(res, "events", None)
+        if events is not None or res.headers.get("Content-Type", "").startswith(SSE_CONTENT_TYPE):
+            # Server-sent events, or events pushed over an InterviewSocket
+            self._started = time.perf_counter()
+            self._events = events(self.metrics) if events is not None else _iter_sse(res, self.metrics)
+            event, payload = next(self._events, (None, None))
+            if event != "meta":
+                raise InterviewStreamError("Stream did not start with a meta event")
+            self.field = payload.pop("stream_field", None)
+            self.meta = payload
+        else:
+            content = res.content
+            started = time.perf_counter()
+            self.data = wire.decode(content, res.headers.get("Content-Type"))["data"]
+            self.metrics["decode_ms"] = (time.perf_counter() - started) * 1000
+            self.metrics["response_bytes"] = len(content)
+            self.metrics["response_wire_bytes"] = int(res.headers.get("Content-Length") or len(content))
+            self.meta = self.data
+            self.field = next((f for f in STREAM_FIELDS if f in self.data), None)
+
+    def __bool__(self):
+        return self.ok
+
+    def __iter__(self):
+        if self._events is None:
+            text = self.data.get(self.field) if self.data and self.field else None
+            if text:
+                yield text
+            return
+
+        completed = False
+        try:
+            for event, payload in self._events:
+                if event == "token":
+                    if not self.received:
+                        self.metrics["first_token_ms"] = (time.perf_counter() - self._started) * 1000
+                    self.received.append(payload)
+                    yield payload
+                elif event == "done":
+                    self.data = payload["data"]
+                elif event == "error":
+                    raise InterviewStreamError(payload.get("detail", "Stream failed"))
+            completed = True
+        finally:
+            self._events = None
+            self.metrics["stream_ms"] = (time.perf_counter() - self._started) * 1000
+            self.res.close()
+            if completed and self.data is None:
+                self.data = dict(self.meta)
+                if self.field:
+                    self.data[self.field] = "".join(self.received)
+            callbacks, self._finished = self._finished, []
+            for callback in callbacks:
+                callback(self)
+
+    def when_finished(self, callback):
+        # Calls callback(stream) once the stream has been read to the end or
+        # given up on; right away for plain JSON responses and consumed streams
+        if self._events is None:
+            callback(self)
+        else:
+            self._finished.append(callback)
+
+    def prefixed(self, prefix):
+        yield prefix
+        yield from self
+
+    def text(self):
+        for _ in self:
+            pass
+        return self.data.get(self.field) if self.field else None
+
+
+class InterviewClient:
+    def __init__(
+        self,
+        pool_size=settings.POOL_SIZE,
+        connect_timeout=settings.CONNECT_TIMEOUT,
+        read_timeout=settings.READ_TIMEOUT,
+        max_retries=settings.MAX_RETRIES,
+        backoff_base=settings.BACKOFF_BASE,
+        backoff_max=settings.BACKOFF_MAX,
+    ):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = LatencyStats()
+        self.wire = WireNegotiation()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.wire.accept_headers())
+
+    def _backoff(self, attempt):
+        # Full jitter: sleep anywhere between 0 and the capped exponential delay
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        time.sleep(random.uniform(0, delay))
+
+    def post(self, url, body, headers=None, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+        try:
+            return self._post(url, body, headers, **kwargs)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _post(self, url, body, headers=None, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        data, wire_headers, metrics = self.wire.encode(url, body)
+        plain = "Content-Encoding" not in wire_headers and wire_headers["Content-Type"] == wire.JSON_TYPE
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                res = self.session.post(url, data=data, headers=dict(wire_headers, **(headers or {})), **kwargs)
+            except (requests.ConnectionError, requests.ConnectTimeout):
+                # A read timeout is not retried: the backend may still be scoring the answer
+                self.stats.record(time.perf_counter() - started, ok=False)
+                if attempt >= self.max_retries:
+                    raise
+            except requests.RequestException:
+                self.stats.record(time.perf_counter() - started, ok=False)
+                raise
+            else:
+                if res.status_code == wire.UNSUPPORTED_MEDIA_STATUS and not plain:
+                    # The backend stopped accepting what it advertised; resend as plain JSON
+                    res.close()
+                    self.wire.forget(url)
+                    data, wire_headers, metrics = self.wire.encode(url, body, plain=True)
+                    plain = True
+                    continue
+                self.wire.learn(url, res)
+                retryable = res.status_code in RETRY_STATUSES
+                elapsed = time.perf_counter() - started
+                self.stats.record(elapsed, ok=res.ok)
+                if not retryable or attempt >= self.max_retries:
+                    res.metrics = dict(metrics, network_ms=elapsed * 1000, attempts=attempt + 1)
+                    return res
+                res.close()
+
+            self.stats.record_retry()
+            self._backoff(attempt)
+            attempt += 1
+
+    def send_turn(self, url, body, prepared, stream=False, headers=None):
+        # One turn to one backend. `prepared` is what HistorySync.prepare made of
+        # `body`; if the backend has lost the acknowledged history the full body
+        # is sent instead. HistorySync itself is left alone, so the same prepared
+        # body can go to several backends.
+        kwargs = {"headers": dict(headers or {})}
+        delta = prepared is not body
+        if stream:
+            body, prepared = dict(body, stream=True), dict(prepared, stream=True)
+            kwargs = {"stream": True, "headers": dict(kwargs["headers"], Accept=SSE_CONTENT_TYPE)}
+
+        res = self.post(url, prepared, **kwargs)
+        if delta and res.status_code == HISTORY_GAP_STATUS and HISTORY_SEQ_HEADER in res.headers:
+            # The backend lost track of this interview; resync with the full transcript
+            res.close()
+            res = self.post(url, body, **kwargs)
+        return res
+
+    def begin_interview(self, url, body, sync=None, stream=False, headers=None):
+        if sync is None:
+            return self.send_turn(url, body, body, stream=stream, headers=headers)
+
+        res = self.send_turn(url, body, sync.prepare(body), stream=stream, headers=headers)
+        if res.ok:
+            sync.acknowledge(res, body)
+        else:
+            sync.reset()
+        return res
+
+    def turn_stream(self, url, body, prepared, stream=settings.STREAMING, headers=None):
+        return TurnStream(self.send_turn(url, body, prepared, stream=stream, headers=headers))
+
+    def stream_interview(self, url, body, sync=None, stream=settings.STREAMING):
+        return TurnStream(self.begin_interview(url, body, sync=sync, stream=stream))
+
+    def close(self):
+        self.session.close()
+
+
+@st.cache_resource
+def get_client():
+    return InterviewClient()
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import uuid
+
+import streamlit as st
+
+from . import instrumentation, journal, opening, settings, state
+from .backends import backend_urls, get_backend_pool
+from .client import EvaluationGap, get_client
+from .workers import get_registry, submit_turn, wait_for_turn
+
+
+def build_body(chat_history, interview_id, candidate_answer=None, question=None, ids=None):
+    # /begin_interview request body; `ids` overrides the default user/question ids
+    body = {
+        "user_id": settings.DEFAULT_USER_ID,
+        "question_type_id": settings.DEFAULT_QUESTION_TYPE_ID,
+        "question_id": settings.DEFAULT_QUESTION_ID,
+        "question": question,
+        "chat_history": chat_history,
+        "interview_id": interview_id,
+        "candidate_answer": candidate_answer,
+    }
+    body.update(ids or {})
+    return body
+
+
+def worker_body(body):
+    # The worker serializes the body later, by then chat_history has moved on
+    return dict(body, chat_history=[dict(entry) for entry in body['chat_history']])
+
+
+def turn_key(scope, client_id, interview_id, turn, question=None, candidate_answer=None):
+    # Idempotency key of one answer to one turn of one session: every submission
+    # of it (double submits, reruns that cut a call short) gets the same key.
+    # The session's persisted id and the backends the turn goes to are part of
+    # it, since interview ids are only unique per backend (a restarted backend
+    # hands out the same ones again).
+    material = json.dumps([list(scope), client_id, interview_id, turn, question, candidate_answer])
+    return hashlib.blake2b(material.encode(), digest_size=16).hexdigest()
+
+
+class InterviewSession:
+    # Request/response handling shared by every skin for one script run. The
+    # skin decides where things are drawn through its show_* hooks.
+    def __init__(self, skin):
+        self.skin = skin
+        self.client = get_client()
+        state.init_state()
+        self.backend_urls = backend_urls(skin.backend_url)
+        pool = get_backend_pool(self.backend_urls)
+        if settings.TRANSPORT == "websocket":
+            # tornado's websocket client is only loaded when the transport is used
+            from . import socket_transport
+
+            self.backend = socket_transport.session_socket()
+            self.key_scope = (settings.SOCKET_URL,)
+        else:
+            self.backend = pool
+            self.key_scope = self.backend_urls
+        # Journaled answers are always sent over HTTP
+        self.journal = journal.get_journal()
+        self.journal.attach(self.backend_urls, self.client, pool)
+        self.finished_turn = state.collect_finished_turn() or state.collect_journaled_turn()
+        queued = st.session_state.queued_opening
+        if queued is not None and self.finished_turn is not None:
+            # The journal has sent an opening call that failed in the background
+            st.session_state.queued_opening = None
+            entry, self.finished_turn = self.finished_turn, None
+            self.settle_speculative_turn(opening.SpeculativeTurn(
+                entry, self.body(0), queued['field'], len(st.session_state.chat_history) - 1, queued['message_index'],
+            ))
+        speculative = st.session_state.speculative_turn
+        if speculative is not None and speculative.done():
+            self.settle_speculative_turn()
+
+    @property
+    def pending(self):
+        # A turn collected this rerun still holds its handle until it is applied
+        if self.finished_turn is not None:
+            return False
+        return st.session_state.pending_turn is not None or st.session_state.queued_turn is not None
+
+    def body(self, interview_id, candidate_answer=None, question=None):
+        return build_body(
+            st.session_state.chat_history, interview_id, candidate_answer, question, ids=st.session_state.candidate,
+        )
+
+    def turn_key(self, interview_id, question=None, candidate_answer=None):
+        return turn_key(self.key_scope, st.session_state.client_id, interview_id, st.session_state.turn,
+                        question, candidate_answer)
+
+    def start_interview(self):
+        self.settle_speculative_turn()
+        body = self.body(0)
+        key = self.turn_key(0)
+        greeting = opening.cached(body, 'greeting')
+        if greeting is not None:
+            # The backend still has to open the interview; that call runs on the pool
+            self.skin.show_greeting([greeting])
+            self.speculate(body, 'greeting', greeting, key)
+        else:
+            stream = get_registry().run(key, lambda: self.backend.stream_interview(
+                self.client, body, sync=st.session_state.history_sync, key=key,
+            ))
+            if stream:
+                st.session_state['interview_id'] = stream.meta['interview_id']
+                greeting = self.skin.show_greeting(stream) if stream.field == 'greeting' else ""
+                if greeting:
+                    st.session_state.messages.append({'role': 'assistant', 'content': greeting})
+                    state.add_history_entry({'greeting': greeting})
+                    opening.remember(body, 'greeting', greeting)
+                st.session_state.response = stream.data
+                state.persist()
+                instrumentation.record_call(stream)
+
+        if self.skin.rerun_after_turn:
+            instrumentation.rerun()
+
+    def submit_answer(self, candidate_answer):
+        # The next request needs the interview_id and acknowledged history of a
+        # call that may still be running in the background
+        self.settle_speculative_turn()
+        if st.session_state.queued_opening is not None:
+            # That call went to the journal: the answer can only follow it
+            return
+        interview_id = st.session_state.get('interview_id')
+        question = st.session_state.question or None
+        key = self.turn_key(interview_id, question, candidate_answer)
+        if key == st.session_state.turn_key:
+            # The same answer to the same turn again: a double submit, or a rerun
+            # that cut the first submission short. Nothing is recorded twice, and
+            # the backend call is shared with (or answered by) the first one.
+            if self.pending:
+                return
+        else:
+            st.session_state.turn_key = key
+            st.session_state.messages.append({'role': 'user', 'content': candidate_answer})
+            st.session_state.chat_history[-1]['answer'] = candidate_answer
+
+        body = st.session_state.evaluation_sync.prepare(
+            self.body(interview_id, candidate_answer=candidate_answer, question=question),
+        )
+        sync = st.session_state.history_sync
+        question = opening.cached(body, 'question') if body['question'] is None else None
+        if question is not None:
+            # Answering the greeting: the reply is the opening question
+            self.skin.show_question([question])
+            self.speculate(body, 'question', question, key)
+            if self.skin.rerun_after_turn:
+                instrumentation.rerun()
+            return
+
+        if settings.ASYNC_SUBMIT:
+            # Score the answer on the shared worker pool; wait_for_turn polls for the result
+            st.session_state.pending_turn = submit_turn(self.client, self.backend, worker_body(body), sync, key)
+            instrumentation.rerun()
+
+        self.apply_turn(lambda: get_registry().run(key, lambda: self.backend.stream_interview(
+            self.client, body, sync=sync, key=key,
+        )), key, body)
+        if self.skin.rerun_after_turn:
+            instrumentation.rerun()
+
+    def speculate(self, body, field, text, key):
+        body = worker_body(body)
+        if field == 'question':
+            st.session_state['question'] = text
+        st.session_state.messages.append({'role': 'assistant', 'content': text})
+        state.add_history_entry({field: text})
+        pending = submit_turn(self.client, self.backend, body, st.session_state.history_sync, key)
+        st.session_state.speculative_turn = opening.SpeculativeTurn(
+            pending, body, field, len(st.session_state.chat_history) - 1, len(st.session_state.messages) - 1,
+        )
+        state.persist()
+
+    def settle_speculative_turn(self, turn=None):
+        # Blocks until the background call is back; by the time the candidate has
+        # typed an answer it usually is
+        if turn is None:
+            turn = st.session_state.speculative_turn
+            if turn is None:
+                return
+            st.session_state.speculative_turn = None
+        try:
+            stream = turn.pending.result()
+            if not stream:
+                stream.res.raise_for_status()
+        except Exception as ex:
+            if self.queue_turn(turn.pending.key, turn.pending.body, ex):
+                st.session_state.queued_opening = {'field': turn.field, 'message_index': turn.message_index}
+            else:
+                self.drop_speculative_turn(turn, ex)
+            state.persist(turn.pending)
+            return
+
+        data = stream.data
+        st.session_state['interview_id'] = data.get('interview_id', st.session_state.get('interview_id'))
+        text = data.get(turn.field)
+        if text and text != st.session_state.chat_history[turn.history_index].get(turn.field):
+            # The cache was stale: show what the backend actually sent
+            st.session_state.chat_history[turn.history_index][turn.field] = text
+            message = st.session_state.messages[turn.message_index]
+            message['content'] = text
+            # The transcript cache holds the stale text under the old id
+            message['id'] = uuid.uuid4().hex
+            if turn.field == 'question':
+                st.session_state['question'] = text
+        opening.remember(turn.body, turn.field, text)
+        st.session_state.response = data
+        instrumentation.record_call(stream)
+        state.persist(turn.pending)
+
+    def drop_speculative_turn(self, turn, ex):
+        # The backend never took the opening call: take back the text shown
+        # from the cache, so the interview continues from before it
+        del st.session_state.chat_history[turn.history_index:]
+        del st.session_state.messages[turn.message_index:]
+        st.session_state.turn -= 1
+        if turn.field == 'question':
+            st.session_state['question'] = None
+        st.session_state.messages.append({'role': 'assistant', 'content': self.skin.exception_message.format(ex=ex)})
+
+    def apply_finished_turn(self):
+        if self.finished_turn is None:
+            return
+        turn, self.finished_turn = self.finished_turn, None
+        self.apply_turn(turn.result, turn.key, turn.body, finished=turn)
+        if self.skin.rerun_after_turn:
+            instrumentation.rerun()
+
+    def wait_for_turn(self):
+        if self.pending:
+            wait_for_turn()
+
+    def queue_turn(self, key, body, ex):
+        # Keep an answer the backend could not take in the journal; the flusher
+        # sends it once a backend is back and wait_for_turn polls for the result
+        if key is None or body is None or not self.journal.enabled or not journal.retryable(ex):
+            return False
+        session_id = st.session_state.get('interview_id') or st.session_state.client_id
+        self.journal.enqueue(key, session_id, self.backend_urls, body)
+        st.session_state.queued_turn = key
+        # The flusher sends the full history, so the next call must too
+        st.session_state.history_sync.reset()
+        return True
+
+    def refetch_evaluation(self, key, body):
+        # The backend diffed against results this session does not hold. The
+        # turn is asked for again in full under the same key: the backend
+        # replays its stored evaluation and encodes it for this request, so
+        # nothing is scored twice. The local copy of the diff is dropped first.
+        get_registry().forget(key)
+        body = dict(body, evaluation_mode='full', evaluation_base=None)
+        return body, get_registry().run(key, lambda: self.backend.stream_interview(
+            self.client, body, sync=st.session_state.history_sync, key=key,
+        ))
+
+    def apply_turn(self, fetch, key=None, body=None, finished=None):
+        try:
+            stream = fetch()
+            if not stream:
+                stream.res.raise_for_status()
+            response = st.session_state.response = stream.meta
+
+            if 'question' in response:
+                question = self.skin.show_question(stream)
+                if body is not None and body.get('question') is None:
+                    # The answer to the greeting: this is the opening question
+                    opening.remember(body, 'question', question)
+                st.session_state['question'] = question
+                st.session_state.messages.append({'role': 'assistant', 'content': question})
+                state.add_history_entry({'question': question})
+
+            elif isinstance(response, dict):
+                # Diff-encoded evaluation_results are expanded before anything reads them
+                evaluation_sync = st.session_state.evaluation_sync
+                try:
+                    evaluation_sync.apply(stream.meta)
+                except EvaluationGap:
+                    if key is None or body is None:
+                        raise
+                    body, stream = self.refetch_evaluation(key, body)
+                    if not stream:
+                        stream.res.raise_for_status()
+                    response = st.session_state.response = stream.meta
+                    evaluation_sync.apply(stream.meta)
+                hint_message = self.skin.show_evaluation(stream)
+                response = st.session_state.response = stream.data
+                evaluation_sync.apply(response)
+                state.add_history_entry(self.skin.hint_history_entry(response, hint_message))
+                st.session_state.messages.append({'role': 'assistant', 'content': hint_message})
+                state.record_evaluation(response['evaluation'])
+
+            else:
+                self.skin.show_error(self.skin.error_message)
+                st.session_state.messages.append({'role': 'assistant', 'content': self.skin.error_message})
+
+            instrumentation.record_call(stream)
+
+        except Exception as ex:
+            if not self.queue_turn(key, body, ex):
+                error_msg = self.skin.exception_message.format(ex=ex)
+                self.skin.show_error(error_msg)
+                st.session_state.messages.append({'role': 'assistant', 'content': error_msg})
+
+        state.persist(finished)
@@ -0,0 +1,64 @@
+from . import settings
+
+# Bounded chat_history: the last `size` entries are kept verbatim and everything
+# older is folded into a single summary record at the front of the list. The
+# backend receives the same list, so request size and prompt length are capped
+# along with the session's memory.
+
+SUMMARY_KEY = "summary"
+ANSWER_CHARS = 200
+
+
+def _clip(text, limit):
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def summarize_entry(entry):
+    if SUMMARY_KEY in entry:
+        return entry[SUMMARY_KEY].splitlines()
+    lines = []
+    if "greeting" in entry:
+        lines.append("Greeting")
+    elif "question" in entry:
+        lines.append(f"Q: {entry['question']}")
+    else:
+        hint = entry.get("hint") or entry.get("content")
+        if hint:
+            lines.append(f"Hint: {_clip(hint, ANSWER_CHARS)}")
+    if entry.get("answer"):
+        lines.append(f"A: {_clip(entry['answer'], ANSWER_CHARS)}")
+    return lines
+
+
+class HistoryWindow:
+    def __init__(self, size=settings.HISTORY_WINDOW, fold_batch=settings.HISTORY_FOLD_BATCH,
+                 summary_chars=settings.HISTORY_SUMMARY_CHARS):
+        self.size = size
+        self.fold_batch = max(1, fold_batch)
+        self.summary_chars = summary_chars
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    def fold(self, chat_history):
+        # Folds in place once `fold_batch` entries beyond the window have piled
+        # up, so the acknowledged delta history is not invalidated every turn.
+        # Returns True when the list was rewritten.
+        if not self.enabled:
+            return False
+        has_summary = bool(chat_history) and SUMMARY_KEY in chat_history[0]
+        raw = len(chat_history) - has_summary
+        if raw < self.size + self.fold_batch:
+            return False
+
+        cut = len(chat_history) - self.size
+        lines = [line for entry in chat_history[:cut] for line in summarize_entry(entry)]
+        folded = sum(entry.get("folded_entries", 1) for entry in chat_history[:cut])
+        # Oldest lines go first once the summary itself is full
+        while len(lines) > 1 and sum(len(line) + 1 for line in lines) > self.summary_chars:
+            lines.pop(0)
+        text = "\n".join(lines)[-self.summary_chars:]
+        chat_history[:] = [{SUMMARY_KEY: text, "folded_entries": folded}] + chat_history[cut:]
+        return True
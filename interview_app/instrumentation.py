@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+import streamlit as st
+
+from . import settings
+
+HISTORY_SIZE = 50
+
+
+class RerunMetrics:
+    def __init__(self, app):
+        self.started = time.perf_counter()
+        self.record = {"ts": time.time(), "app": app, "phases": {}}
+        self.finished = False
+
+    def add_phase(self, name, ms):
+        phases = self.record["phases"]
+        phases[name] = phases.get(name, 0.0) + ms
+
+    def finish(self):
+        self.record["phases"]["total_rerun"] = (time.perf_counter() - self.started) * 1000
+        self.finished = True
+        return self.record
+
+
+class _NullMetrics(RerunMetrics):
+    # Used outside a script run (worker threads, offline tools)
+    def __init__(self):
+        super().__init__(None)
+
+    def add_phase(self, name, ms):
+        pass
+
+
+@st.cache_resource
+def _metrics_logger():
+    logger = logging.getLogger("interview_metrics")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    if settings.METRICS_FILE:
+        directory = os.path.dirname(settings.METRICS_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(
+            settings.METRICS_FILE, maxBytes=settings.METRICS_MAX_BYTES, backupCount=settings.METRICS_BACKUPS
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    return logger
+
+
+def current():
+    try:
+        return st.session_state.get("_rerun_metrics") or _NullMetrics()
+    except Exception:
+        return _NullMetrics()
+
+
+def begin_rerun(app):
+    metrics = RerunMetrics(app)
+    st.session_state["_rerun_metrics"] = metrics
+    return metrics
+
+
+@contextmanager
+def phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        current().add_phase(name, (time.perf_counter() - started) * 1000)
+
+
+def note(**values):
+    current().record.update(values)
+
+
+def record_call(stream):
+    # Network-side numbers collected by TurnStream for the turn applied in this rerun
+    metrics = current()
+    for key, value in stream.metrics.items():
+        if key.endswith("_ms"):
+            metrics.add_phase(key[:-3], value)
+        else:
+            metrics.record[key] = value
+
+
+def deep_sizeof(obj, seen=None):
+    # Approximate retained size. Containers and this package's own objects are
+    # followed; anything else (responses, futures, clients) counts shallowly.
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):
+        return int(obj.memory_usage(deep=True).sum())
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif type(obj).__module__.startswith("interview_app") and hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def memory_report():
+    # Bytes held per session_state key; objects shared between keys count for each
+    report = {}
+    for key in list(st.session_state.keys()):
+        report[key] = deep_sizeof(st.session_state[key])
+    return dict(sorted(report.items(), key=lambda item: item[1], reverse=True))
+
+
+def finish_rerun():
+    metrics = st.session_state.get("_rerun_metrics")
+    if metrics is None or metrics.finished:
+        return
+    record = metrics.finish()
+    if "chat_history" in st.session_state:
+        record["chat_history_length"] = len(st.session_state.chat_history)
+    if settings.METRICS_FILE or sidebar_enabled():
+        record["session_memory"] = memory_report()
+        record["session_bytes"] = sum(record["session_memory"].values())
+
+    if "_metrics_history" not in st.session_state:
+        st.session_state["_metrics_history"] = deque(maxlen=HISTORY_SIZE)
+    st.session_state["_metrics_history"].append(record)
+    if settings.METRICS_FILE:
+        _metrics_logger().info(json.dumps(record))
+
+
+def rerun():
+    finish_rerun()
+    st.rerun()
+
+
+def sidebar_enabled():
+    return settings.METRICS_SIDEBAR or st.query_params.get("metrics") == "1"
+
+
+def render_sidebar(live_counts=None):
+    if not sidebar_enabled():
+        return
+    history = st.session_state.get("_metrics_history")
+    with st.sidebar:
+        st.markdown("### ⏱️ Instrumentation")
+        if live_counts is not None:
+            st.caption("Process")
+            st.table({name.replace("_", " "): [value] for name, value in live_counts().items()})
+        if not history:
+            st.caption("No completed reruns yet.")
+            return
+
+        last = history[-1]
+        st.caption("Last rerun (ms)")
+        st.table({name: [round(ms, 1)] for name, ms in last["phases"].items()})
+
+        last_call = next((r for r in reversed(history) if "request_bytes" in r), None)
+        if last_call:
+            st.caption("Last backend call")
+            st.table({
+                "request bytes": [last_call["request_bytes"]],
+                "response bytes": [last_call.get("response_bytes", 0)],
+                "chat_history": [last_call.get("chat_history_length", 0)],
+            })
+            if "backend" in last_call:
+                st.caption(f"Answered by {last_call['backend']}" + (" (hedged)" if last_call.get("hedged") else ""))
+
+        if "session_bytes" in last:
+            st.caption(f"Session memory: {last['session_bytes'] / 1024:.1f} KiB")
+            top = list(last["session_memory"].items())[:8]
+            st.table({key: [f"{size / 1024:.1f} KiB"] for key, size in top})
+
+        totals = [r["phases"]["total_rerun"] for r in history]
+        st.caption(f"Recent reruns: {len(totals)}, mean {sum(totals) / len(totals):.1f} ms, max {max(totals):.1f} ms")
@@ -0,0 +1,255 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+
+from . import settings
+from .backends import BackendUnavailable
+from .client import RETRY_STATUSES, STREAM_FIELDS, InterviewStreamError, TurnStream
+
+logger = logging.getLogger(__name__)
+
+# Answers whose backend call failed because no backend could be reached (or it
+# answered 5xx) are not lost: they are written to a local SQLite journal with
+# their idempotency key and full request body, and a background flusher sends
+# them, a batch at a time, once a backend is available again. The session waits
+# for its queued answer like for any other pending turn and applies the result
+# when it arrives, so a backend outage shows up as added latency.
+
+QUEUED = "queued"
+DONE = "done"
+FAILED = "failed"
+
+
+def retryable(ex):
+    # Failures that say nothing about the answer itself
+    if isinstance(ex, requests.HTTPError):
+        status = ex.response.status_code if ex.response is not None else None
+        return status is None or status in RETRY_STATUSES or status >= 500
+    return isinstance(ex, (BackendUnavailable, requests.ConnectionError, requests.Timeout, InterviewStreamError))
+
+
+class JournaledTurn(TurnStream):
+    # A turn the flusher already fetched; applied like a plain JSON response
+    def __init__(self, data):
+        self.res = None
+        self.ok = True
+        self.meta = self.data = data
+        self.field = next((f for f in STREAM_FIELDS if f in data), None)
+        self.received = []
+        self._events = None
+        self.metrics = {"journaled": True}
+
+
+class JournalEntry:
+    # Session-side handle for a journaled answer, shaped like PendingTurn
+    def __init__(self, key, status, result):
+        self.key = key
+        self.body = None
+        self.status = status
+        self._result = result
+
+    def result(self):
+        if self.status == FAILED:
+            raise InterviewStreamError(self._result)
+        return JournaledTurn(self._result)
+
+
+class AnswerJournal:
+    enabled = False
+
+    def attach(self, urls, client, backend):
+        pass
+
+    def enqueue(self, key, session_id, urls, body):
+        raise NotImplementedError
+
+    def finished(self, key):
+        return True
+
+    def collect(self, key):
+        return None
+
+    def discard(self, key):
+        pass
+
+    def snapshot(self):
+        return {}
+
+
+class NullAnswerJournal(AnswerJournal):
+    def enqueue(self, key, session_id, urls, body):
+        raise RuntimeError("The answer journal is disabled")
+
+
+class SQLiteAnswerJournal(AnswerJournal):
+    enabled = True
+
+    def __init__(self, path=settings.JOURNAL_DB, batch_size=settings.JOURNAL_BATCH_SIZE,
+                 flush_interval=settings.JOURNAL_FLUSH_INTERVAL, max_backoff=settings.JOURNAL_MAX_BACKOFF,
+                 retention=settings.JOURNAL_RETENTION):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.retention = retention
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Backends by their URL tuple, registered by the sessions that use them;
+        # entries left by an earlier process wait until a session attaches theirs
+        self._routes = {}
+        self._wake = threading.Event()
+        self.flushed = 0
+        self.retries = 0
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " key TEXT PRIMARY KEY,"
+                " session_id TEXT NOT NULL,"
+                " urls TEXT NOT NULL,"
+                " body TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " result TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " ts REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS answers_status ON answers (status, session_id)")
+
+        self._executor = ThreadPoolExecutor(max_workers=batch_size, thread_name_prefix="answer-journal-send")
+        self._flusher = threading.Thread(target=self._flush_forever, name="answer-journal-flusher", daemon=True)
+        self._flusher.start()
+
+    def _connect(self):
+        # One connection per thread; the script threads only run short statements
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def attach(self, urls, client, backend):
+        with self._lock:
+            self._routes[json.dumps(list(urls))] = (client, backend)
+
+    def enqueue(self, key, session_id, urls, body):
+        # Synchronous on purpose: the answer is on disk before the candidate is
+        # told it was saved
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO answers (key, session_id, urls, body, status, ts) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, str(session_id), json.dumps(list(urls)), json.dumps(body), QUEUED, time.time()),
+            )
+        self._wake.set()
+
+    def finished(self, key):
+        row = self._connect().execute("SELECT status FROM answers WHERE key = ?", (key,)).fetchone()
+        return row is None or row[0] != QUEUED
+
+    def collect(self, key):
+        # The finished entry for key, or None while it is queued. It stays in the
+        # journal until discard(), once the session has persisted its result.
+        row = self._connect().execute("SELECT status, result FROM answers WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return JournalEntry(key, FAILED, "The saved answer could not be found")
+        status, result = row
+        if status == QUEUED:
+            return None
+        return JournalEntry(key, status, json.loads(result) if status == DONE else result)
+
+    def discard(self, key):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+
+    def snapshot(self):
+        (queued,) = self._connect().execute("SELECT COUNT(*) FROM answers WHERE status = ?", (QUEUED,)).fetchone()
+        return {"answers_queued": queued, "answers_flushed": self.flushed, "journal_retries": self.retries}
+
+    # Flusher thread
+
+    def next_batch(self):
+        # Oldest queued answer of each session: a session's answers go out in order
+        return self._connect().execute(
+            "SELECT key, urls, body FROM answers WHERE rowid IN ("
+            " SELECT MIN(rowid) FROM answers WHERE status = ? GROUP BY session_id)"
+            " ORDER BY rowid LIMIT ?",
+            (QUEUED, self.batch_size),
+        ).fetchall()
+
+    def _send(self, entry):
+        key, urls, body = entry
+        with self._lock:
+            route = self._routes.get(urls)
+        if route is None:
+            return None
+        client, backend = route
+        if not backend.available():
+            return None
+        try:
+            turn = backend.stream_interview(client, json.loads(body), stream=False, key=key)
+            if not turn:
+                turn.res.raise_for_status()
+            return DONE, json.dumps(turn.data)
+        except Exception as ex:
+            if retryable(ex):
+                return None
+            return FAILED, str(ex)
+
+    def flush(self):
+        # One batch; returns (sent, still queued)
+        batch = self.next_batch()
+        outcomes = list(self._executor.map(self._send, batch))
+        conn = self._connect()
+        with conn:
+            for (key, _, _), outcome in zip(batch, outcomes):
+                if outcome is None:
+                    conn.execute("UPDATE answers SET attempts = attempts + 1 WHERE key = ?", (key,))
+                else:
+                    conn.execute("UPDATE answers SET status = ?, result = ? WHERE key = ?", (*outcome, key))
+        sent = sum(outcome is not None for outcome in outcomes)
+        self.flushed += sent
+        self.retries += len(batch) - sent
+        return sent, len(batch) - sent
+
+    def prune(self):
+        # Results nobody came back for
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM answers WHERE status != ? AND ts < ?", (QUEUED, time.time() - self.retention))
+
+    def _flush_forever(self):
+        delay = self.flush_interval
+        pruned = 0.0
+        while True:
+            self._wake.wait(delay)
+            self._wake.clear()
+            try:
+                sent, waiting = self.flush()
+                if time.monotonic() - pruned > 3600:
+                    self.prune()
+                    pruned = time.monotonic()
+            except Exception:
+                logger.exception("Answer journal flush failed")
+                sent, waiting = 0, 1
+            # Back off while no backend takes the answers; drain steadily otherwise
+            delay = min(delay * 2, self.max_backoff) if waiting and not sent else self.flush_interval
+
+
+BACKENDS = {
+    "sqlite": SQLiteAnswerJournal,
+    "none": NullAnswerJournal,
+}
+
+
+@st.cache_resource
+def get_journal():
+    return BACKENDS[settings.JOURNAL]()
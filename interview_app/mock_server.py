@@ -0,0 +1,496 @@
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import wire
+from .backends import IDEMPOTENCY_HEADER
+from .client import HISTORY_GAP_STATUS, HISTORY_SEQ_HEADER, SSE_CONTENT_TYPE, STREAM_FIELDS, results_digest
+
+# Local stand-in for the /begin_interview backend. It speaks the same payload
+# shapes as the real service (greeting -> question -> evaluation/hint) so the
+# apps can be exercised and measured offline.
+
+GREETING = "Hello and welcome! I'm NOHA, your interviewer today. Tell me a little about yourself."
+QUESTIONS = [
+    "Can you walk me through how you would design a URL shortening service?",
+    "Describe a time you had to debug a production incident under pressure.",
+    "How would you explain the difference between a process and a thread?",
+]
+SUBCRITERIA = [
+    "Problem Understanding",
+    "Solution Structure",
+    "Technical Depth",
+    "Trade-off Analysis",
+    "Communication Clarity",
+    "Use of Examples",
+    "Edge Cases",
+    "Scalability",
+    "Conciseness",
+    "Confidence",
+]
+CRITERIA_COUNT = 7
+
+
+def _seed(*parts):
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def build_evaluation(answer, attempt, previous=None):
+    # With the previous results of the interview, like the real grader, only
+    # the subcriteria a new answer touches (about a third) are scored again
+    seed = _seed(answer, attempt)
+    results = {}
+    for i, name in enumerate(SUBCRITERIA):
+        weight = round(1 / len(SUBCRITERIA), 2)
+        score = (seed >> (i * 3)) % 10 + 1
+        if previous and name in previous and (seed >> (i * 2 + 32)) % 3:
+            score = previous[name][1]
+        results[name] = [weight, score]
+    criteria_score = [((seed >> (i * 5)) % 10) + 1 for i in range(CRITERIA_COUNT)]
+    final_score = round(sum(criteria_score) / len(criteria_score), 2)
+    return {
+        "evaluation_results": results,
+        "criteria_score": criteria_score,
+        "final_score": final_score,
+    }
+
+
+def build_hint(answer, attempt):
+    if len(answer.split()) < 20:
+        return "Try to expand on your answer with a concrete example from your experience."
+    hints = [
+        "Good start. Consider discussing how your approach behaves under heavy load.",
+        "Think about the failure modes of your design and how you would detect them.",
+        "You covered the happy path well; what trade-offs did you make along the way?",
+    ]
+    return hints[attempt % len(hints)]
+
+
+class InterviewState:
+    def __init__(self, interview_id):
+        self.interview_id = interview_id
+        self.chat_history = []
+        self.attempts = 0
+        self.results = None
+        # Recently sent evaluation_results by digest, the bases a diff can refer to
+        self.evaluations = OrderedDict()
+
+
+class Reply:
+    def __init__(self):
+        self.ready = threading.Event()
+        self.result = None
+        self.finished = None
+
+
+class IdempotencyCache:
+    # Replies by Idempotency-Key. The first request with a key produces the
+    # reply; a request with the same key waits for it and gets the same answer
+    # instead of a second evaluation of the same turn.
+    def __init__(self, ttl=600.0, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.replies = OrderedDict()
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        while self.replies:
+            reply = next(iter(self.replies.values()))
+            if len(self.replies) <= self.max_entries and (reply.finished is None or reply.finished > cutoff):
+                break
+            self.replies.popitem(last=False)
+
+    def claim(self, key):
+        # The earlier (data, seq) for key, or None when the caller is the first
+        # and must call complete() or abandon()
+        if not key:
+            return None
+        while True:
+            with self.lock:
+                self._expire()
+                reply = self.replies.get(key)
+                if reply is None:
+                    self.replies[key] = Reply()
+                    return None
+            reply.ready.wait()
+            if reply.result is not None:
+                return reply.result
+            # The first request gave up (history gap); this one takes over
+
+    def complete(self, key, data, seq):
+        if key:
+            self._finish(key, (data, seq))
+
+    def abandon(self, key):
+        if key:
+            self._finish(key, None)
+
+    def _finish(self, key, result):
+        with self.lock:
+            reply = self.replies.get(key)
+            if reply is None:
+                return
+            if result is None:
+                del self.replies[key]
+            reply.result = result
+            reply.finished = time.monotonic()
+        reply.ready.set()
+
+
+class MockBackend:
+    def __init__(self, latency=0.0, stall_rate=0.0, stall_seconds=0.0):
+        self.latency = latency
+        # A share of calls stalls on top of the latency, like an overloaded LLM
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.lock = threading.Lock()
+        self.interviews = {}
+        self.ids = itertools.count(1)
+        self.replies = IdempotencyCache()
+        self.stats = {
+            "requests": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "full_requests": 0,
+            "delta_requests": 0,
+            "history_gaps": 0,
+            "history_entries_received": 0,
+            "compressed_requests": 0,
+            "msgpack_requests": 0,
+            "compressed_responses": 0,
+            "stalled_requests": 0,
+            "socket_connections": 0,
+            "socket_turns": 0,
+            "idempotent_replays": 0,
+            "full_evaluations": 0,
+            "diff_evaluations": 0,
+        }
+        # (history length, request bytes, response bytes) for recent requests
+        self.request_log = deque(maxlen=100000)
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def log_request(self, history_length, bytes_in, bytes_out):
+        with self.lock:
+            self.request_log.append((history_length, bytes_in, bytes_out))
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats, interviews=len(self.interviews))
+
+    def _interview(self, interview_id):
+        with self.lock:
+            if not interview_id:
+                interview_id = next(self.ids)
+            state = self.interviews.get(interview_id)
+            if state is None:
+                state = self.interviews[interview_id] = InterviewState(interview_id)
+            return state
+
+    def sync_history(self, body):
+        # Returns (state, None) on success or (None, seq) when the client must resync
+        interview_id = body.get("interview_id") or 0
+        if body.get("history_mode") == "delta":
+            with self.lock:
+                state = self.interviews.get(interview_id)
+            base = body.get("history_base", 0)
+            if state is None or base > len(state.chat_history):
+                self.count("history_gaps")
+                return None, len(state.chat_history) if state else 0
+            delta = body.get("chat_history_delta") or []
+            del state.chat_history[base:]
+            state.chat_history.extend(delta)
+            self.count("delta_requests")
+            self.count("history_entries_received", len(delta))
+            return state, None
+
+        state = self._interview(interview_id)
+        state.chat_history = list(body.get("chat_history") or [])
+        self.count("full_requests")
+        self.count("history_entries_received", len(state.chat_history))
+        return state, None
+
+    def respond(self, state, body):
+        if not body.get("interview_id"):
+            return {"interview_id": state.interview_id, "greeting": GREETING}
+
+        if not body.get("question"):
+            # Like the real question bank, the opening question follows question_id
+            question = QUESTIONS[(body.get("question_id") or 0) % len(QUESTIONS)]
+            return {"interview_id": state.interview_id, "question": question}
+
+        state.attempts += 1
+        answer = body.get("candidate_answer") or ""
+        evaluation = build_evaluation(answer, state.attempts, state.results)
+        state.results = evaluation["evaluation_results"]
+        return {
+            "interview_id": state.interview_id,
+            "evaluation": evaluation,
+            "hint": build_hint(answer, state.attempts),
+            "hint_type": "hint",
+        }
+
+    def encode_evaluation(self, body, data, keep=4):
+        # Sends evaluation_results as changes against the results the request
+        # names as its evaluation_base. Runs per request, after the idempotency
+        # cache, so a replayed turn is encoded for the client asking again.
+        evaluation = data.get("evaluation")
+        if not evaluation or "evaluation_results" not in evaluation:
+            return data
+        results = evaluation["evaluation_results"]
+        digest = results_digest(results)
+        with self.lock:
+            state = self.interviews.get(data.get("interview_id"))
+            if state is None:
+                return data
+            base = state.evaluations.get(body.get("evaluation_base")) if body.get("evaluation_mode") == "diff" else None
+            state.evaluations[digest] = results
+            state.evaluations.move_to_end(digest)
+            while len(state.evaluations) > keep:
+                state.evaluations.popitem(last=False)
+        if base is None:
+            self.count("full_evaluations")
+            return data
+
+        self.count("diff_evaluations")
+        diff = {"base": body["evaluation_base"], "digest": digest, "scores": {}, "results": {}, "removed": []}
+        for name, (weight, score) in results.items():
+            if name not in base or base[name][0] != weight:
+                diff["results"][name] = [weight, score]
+            elif base[name][1] != score:
+                diff["scores"][name] = score
+        diff["removed"] = [name for name in base if name not in results]
+        evaluation = {k: v for k, v in evaluation.items() if k != "evaluation_results"}
+        evaluation["evaluation_results_diff"] = diff
+        return dict(data, evaluation=evaluation)
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, keep-alive
+    # requests stall ~40 ms on the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _advertise(self):
+        # Tell the client which request bodies this server accepts
+        if self.server.negotiate:
+            self.send_header("Accept-Post", ", ".join(wire.body_types()))
+            self.send_header("Accept-Encoding", ", ".join(wire.content_encodings() + [wire.IDENTITY]))
+
+    def _send_payload(self, status, payload, headers=None):
+        content_type, encoding = wire.JSON_TYPE, None
+        if self.server.negotiate:
+            content_type = wire.choose(self.headers.get("Accept", ""), wire.body_types()) or wire.JSON_TYPE
+            encoding = wire.choose(self.headers.get("Accept-Encoding", ""), wire.content_encodings())
+        data = wire.encode(payload, content_type)
+        if encoding and len(data) >= self.server.min_bytes:
+            data = wire.compress(data, encoding)
+            self.server.backend.count("compressed_responses")
+        else:
+            encoding = None
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self._advertise()
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.backend.count("bytes_out", len(data))
+        return len(data)
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+        self.server.backend.count("bytes_out", len(data))
+        return len(data)
+
+    def _write_event(self, event, payload):
+        return self._write_chunk(f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode())
+
+    def _send_stream(self, data, headers, latency):
+        # Server-sent events over chunked encoding: meta, then one token event
+        # per word, then the complete payload. Events are not compressed: each
+        # one is flushed on its own and is too small for gzip/zstd to pay off.
+        field = next((f for f in STREAM_FIELDS if f in data), None)
+        tokens = re.findall(r"\S+\s*", data.get(field) or "") if field else []
+
+        self.send_response(200)
+        self.send_header("Content-Type", f"{SSE_CONTENT_TYPE}; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self._advertise()
+        for name, value in headers.items():
+            self.send_header(name, str(value))
+        self.end_headers()
+
+        meta = dict(data, stream_field=field)
+        if field:
+            meta[field] = ""
+        time.sleep(latency * 0.1)
+        sent = self._write_event("meta", meta)
+        for token in tokens:
+            time.sleep(latency * 0.9 / len(tokens))
+            sent += self._write_event("token", token)
+        sent += self._write_event("done", {"data": data})
+        self._write_chunk(b"")
+        return sent
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_payload(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_payload(200, self.server.backend.snapshot())
+        else:
+            self._send_payload(404, {"detail": "Not Found"})
+
+    def do_POST(self):
+        if self.path != "/begin_interview":
+            self._send_payload(404, {"detail": "Not Found"})
+            return
+
+        backend = self.server.backend
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        backend.count("requests")
+        backend.count("bytes_in", len(raw))
+        content_type = wire.media_type(self.headers.get("Content-Type"))
+        encoding = self.headers.get("Content-Encoding", wire.IDENTITY).strip().lower()
+        if not self.server.negotiate and (content_type != wire.JSON_TYPE or encoding != wire.IDENTITY):
+            self._send_payload(wire.UNSUPPORTED_MEDIA_STATUS, {"detail": "Only uncompressed JSON is accepted"})
+            return
+        try:
+            payload = wire.decompress(raw, encoding)
+        except ValueError:
+            self._send_payload(wire.UNSUPPORTED_MEDIA_STATUS, {"detail": f"Unsupported Content-Encoding: {encoding}"})
+            return
+        if content_type not in wire.body_types():
+            self._send_payload(wire.UNSUPPORTED_MEDIA_STATUS, {"detail": f"Unsupported Content-Type: {content_type}"})
+            return
+        if encoding != wire.IDENTITY:
+            backend.count("compressed_requests")
+        if content_type == wire.MSGPACK_TYPE:
+            backend.count("msgpack_requests")
+
+        try:
+            body = wire.decode(payload, content_type)
+        except ValueError:
+            self._send_payload(400, {"detail": "Invalid request body"})
+            return
+
+        key = self.headers.get(IDEMPOTENCY_HEADER)
+        replay = backend.replies.claim(key)
+        if replay is not None:
+            # A retried or duplicated turn: same answer, no second evaluation
+            backend.count("idempotent_replays")
+            (data, seq), latency = replay, 0.0
+        else:
+            if backend.stall_rate and random.random() < backend.stall_rate:
+                backend.count("stalled_requests")
+                time.sleep(backend.stall_seconds)
+
+            state, seq = backend.sync_history(body)
+            if state is None:
+                backend.replies.abandon(key)
+                self._send_payload(HISTORY_GAP_STATUS, {"detail": "history_gap"}, {HISTORY_SEQ_HEADER: seq})
+                return
+
+            data, seq, latency = backend.respond(state, body), len(state.chat_history), backend.latency
+            backend.replies.complete(key, data, seq)
+
+        data = backend.encode_evaluation(body, data)
+        headers = {HISTORY_SEQ_HEADER: seq}
+        if body.get("stream") and SSE_CONTENT_TYPE in self.headers.get("Accept", ""):
+            sent = self._send_stream(data, headers, latency)
+        else:
+            time.sleep(latency)
+            sent = self._send_payload(200, {"data": data}, headers)
+        backend.log_request(seq, len(raw), sent)
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=8000, latency=0.0, verbose=False, negotiate=True, min_bytes=1024,
+                 stall_rate=0.0, stall_seconds=10.0):
+        super().__init__((host, port), MockRequestHandler)
+        self.backend = MockBackend(latency=latency, stall_rate=stall_rate, stall_seconds=stall_seconds)
+        self.verbose = verbose
+        # negotiate=False behaves like a backend that only speaks plain JSON
+        self.negotiate = negotiate
+        self.min_bytes = min_bytes
+
+    def handle_error(self, request, client_address):
+        # Clients drop the losing request of a hedged pair mid-stream
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/begin_interview"
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the /begin_interview backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated LLM latency per call, in seconds")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--plain", action="store_true", help="Only accept and send uncompressed JSON")
+    parser.add_argument("--min-bytes", type=int, default=1024, help="Smallest response body that is compressed")
+    parser.add_argument("--socket-port", type=int, help="Also serve the WebSocket transport on this port")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Share of calls that stall (0-1)")
+    parser.add_argument("--stall-seconds", type=float, default=10.0, help="Extra delay of a stalled call")
+    args = parser.parse_args()
+
+    server = MockServer(
+        args.host,
+        args.port,
+        latency=args.latency,
+        verbose=args.verbose,
+        negotiate=not args.plain,
+        min_bytes=args.min_bytes,
+        stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds,
+    )
+    print(f"Mock backend listening on {server.url} (stats at /stats)")
+    if args.socket_port:
+        # Imported here: the socket server imports this module
+        from .socket_server import SocketServer
+
+        sockets = SocketServer(server.backend, args.host, args.socket_port).start()
+        print(f"Mock interview socket listening on {sockets.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+
+from . import settings
+
+# Opening content (the greeting and the first question) only depends on the
+# user/question ids, so it is cached process-wide. On a hit the text is shown
+# straight away and the real /begin_interview call runs on the worker pool as a
+# SpeculativeTurn; its response is reconciled before the next answer is sent.
+
+
+class TTLCache:
+    # LRU whose entries also expire `ttl` seconds after they were stored
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] < time.monotonic():
+                del self._items[key]
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+
+_opening_cache = TTLCache(settings.OPENING_CACHE_SIZE, settings.OPENING_CACHE_TTL)
+
+
+def _key(body, field):
+    return body.get("user_id"), body.get("question_type_id"), body.get("question_id"), field
+
+
+def cached(body, field):
+    if field not in settings.OPENING_CACHE:
+        return None
+    return _opening_cache.get(_key(body, field))
+
+
+def remember(body, field, text):
+    if field in settings.OPENING_CACHE and text:
+        _opening_cache.put(_key(body, field), text)
+
+
+class SpeculativeTurn:
+    # A turn whose text was rendered from the cache while the backend call is
+    # still running. Indexes point at the entries to correct if the backend
+    # answers with different text.
+    def __init__(self, pending, body, field, history_index, message_index):
+        self.pending = pending
+        self.body = body
+        self.field = field
+        self.history_index = history_index
+        self.message_index = message_index
+
+    def done(self):
+        return self.pending.done()
@@ -0,0 +1,263 @@
+import argparse
+import atexit
+import cProfile
+import glob
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+from . import settings
+
+# Optional cProfile of whole script reruns (NOHA_PROFILE=1). Each process adds
+# the stats of its profiled reruns to one aggregate and rewrites it to
+# <PROFILE_DIR>/reruns-<pid>.prof; the report page (profile_streamlit.py) and
+# `python -m interview_app.profiling report` merge the files of every process.
+#
+# Only one rerun per process is profiled at a time; reruns that start while
+# another is being profiled are skipped. With async submission the backend call
+# runs on the worker pool, so a rerun profile shows the time spent waiting for
+# it, not the call itself.
+
+ROOT = ("app.py", "_run")
+# Where a rerun's time goes: cumulative time of these functions
+CATEGORIES = {
+    "css": [("transcript.py", "inject_styles")],
+    "transcript": [("transcript.py", "render_transcript")],
+    "dataframe": [("state.py", "evaluation_table"), ("state.py", "patch_evaluation_table")],
+    "charts": [("charts.py", "final_score_chart"), ("charts.py", "criteria_score_chart")],
+    "network": [
+        ("backends.py", "stream_interview"),
+        ("socket_transport.py", "stream_interview"),
+        ("client.py", "__iter__"),
+        ("workers.py", "result"),
+    ],
+}
+
+
+def _matches(func, targets):
+    # targets are (module file in this package, function name)
+    filename, _, name = func
+    return any(
+        name == target_name and filename.endswith(os.path.join(os.sep + "interview_app", target_file))
+        for target_file, target_name in targets
+    )
+
+
+class RerunProfiles:
+    def __init__(self, directory=settings.PROFILE_DIR, dump_interval=settings.PROFILE_DUMP_INTERVAL):
+        self.directory = directory
+        self.dump_interval = dump_interval
+        self.path = os.path.join(directory, f"reruns-{os.getpid()}.prof")
+        self.busy = threading.Lock()
+        self._lock = threading.Lock()
+        self._stats = None
+        self._dumped = time.monotonic()
+        self.reruns = 0
+        atexit.register(self.dump)
+
+    def add(self, profile):
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.reruns += 1
+            due = time.monotonic() - self._dumped >= self.dump_interval
+        if due:
+            self.dump()
+
+    def dump(self):
+        with self._lock:
+            if self._stats is None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            temp = os.path.join(self.directory, f".reruns-{os.getpid()}.prof")
+            self._stats.dump_stats(temp)
+            os.replace(temp, self.path)
+            self._dumped = time.monotonic()
+
+
+@st.cache_resource
+def get_profiles():
+    return RerunProfiles()
+
+
+def wanted():
+    if not settings.PROFILE:
+        return False
+    return st.query_params.get("profile") == "1" or random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+@contextmanager
+def profile_rerun():
+    # Wraps a whole script run. st.rerun()/st.stop() leave through here as
+    # exceptions; nothing below touches Streamlit after they were raised.
+    if not wanted():
+        yield
+        return
+    profiles = get_profiles()
+    if not profiles.busy.acquire(blocking=False):
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profiles.busy.release()
+        profiles.add(profile)
+
+
+def load(directory=settings.PROFILE_DIR):
+    # Merged stats of every process, or None when nothing was profiled yet
+    paths = sorted(glob.glob(os.path.join(directory, "reruns-*.prof")))
+    return pstats.Stats(*paths) if paths else None
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == "~":
+        return name
+    package = os.sep + "interview_app" + os.sep
+    short = filename[filename.rindex(package) + 1:] if package in filename else os.path.basename(filename)
+    return f"{short}:{line} {name}"
+
+
+def _root(stats):
+    return next((func for func in stats.stats if _matches(func, [ROOT])), None)
+
+
+def summary(stats):
+    # (reruns, total ms per rerun, {category: ms per rerun})
+    root = _root(stats)
+    if root is None:
+        return 0, 0.0, {}
+    reruns = stats.stats[root][1]
+    total = stats.stats[root][3] * 1000 / reruns
+    categories = {}
+    for category, targets in CATEGORIES.items():
+        cumulative = sum(entry[3] for func, entry in stats.stats.items() if _matches(func, targets))
+        categories[category] = cumulative * 1000 / reruns
+    categories["other"] = max(0.0, total - sum(categories.values()))
+    return reruns, total, categories
+
+
+def flame_rows(stats, max_depth=14, min_share=0.01):
+    # Top-down call tree of the script run as (depth, function, calls, ms per rerun,
+    # share of the rerun) rows; branches under min_share are left out
+    root = _root(stats)
+    if root is None:
+        return []
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge))
+    reruns = stats.stats[root][1]
+    total = stats.stats[root][3]
+    rows = []
+
+    def visit(func, calls, cumulative, depth, path):
+        rows.append((depth, _label(func), round(calls), cumulative * 1000 / reruns, cumulative / total if total else 0.0))
+        if depth >= max_depth:
+            return
+        # pstats keeps a call graph, not a tree: a function's callees cover all
+        # of its calls, so they are scaled to the share reached along this path
+        overall = stats.stats[func][3]
+        scale = min(1.0, cumulative / overall) if overall else 0.0
+        children = sorted(callees.get(func, []), key=lambda child: child[1][3], reverse=True)
+        for child, (child_calls, _, _, child_cumulative) in children:
+            child_cumulative = min(child_cumulative * scale, cumulative)
+            if child in path or child_cumulative < total * min_share:
+                continue
+            visit(child, child_calls * scale, child_cumulative, depth + 1, path | {child})
+
+    visit(root, reruns, total, 0, {root})
+    return rows
+
+
+def run(directory=settings.PROFILE_DIR):
+    st.set_page_config(page_title="Rerun profile", page_icon="⏱️", layout="wide")
+    if settings.PROFILE_TOKEN and st.query_params.get("token") != settings.PROFILE_TOKEN:
+        st.error("Not found")
+        st.stop()
+    st.title("Rerun profile")
+
+    with st.sidebar:
+        st.button("Reload")
+        min_share = st.slider("Hide calls below (% of a rerun)", 0.0, 10.0, 1.0, 0.5) / 100
+        max_depth = st.slider("Depth", 2, 30, 14)
+
+    stats = load(directory)
+    if stats is None:
+        st.info(f"No profiles in `{directory}` yet. Run an app with `NOHA_PROFILE=1`.")
+        return
+    reruns, total, categories = summary(stats)
+    if not reruns:
+        st.info("The profiles hold no complete reruns yet.")
+        return
+
+    columns = st.columns(2)
+    columns[0].metric("Profiled reruns", f"{reruns:,}")
+    columns[1].metric("Mean rerun", f"{total:.1f} ms")
+    st.subheader("By area")
+    share = st.column_config.ProgressColumn("share", format="%.2f", min_value=0.0, max_value=1.0)
+    st.dataframe(
+        {
+            "area": list(categories),
+            "ms per rerun": [round(ms, 2) for ms in categories.values()],
+            "share": [ms / total if total else 0.0 for ms in categories.values()],
+        },
+        column_config={"share": share},
+        hide_index=True,
+    )
+
+    st.subheader("Call tree")
+    rows = flame_rows(stats, max_depth=max_depth, min_share=min_share)
+    st.dataframe(
+        {
+            "function": [" " * depth + label for depth, label, _, _, _ in rows],
+            "calls": [calls for _, _, calls, _, _ in rows],
+            "ms per rerun": [round(ms, 2) for _, _, _, ms, _ in rows],
+            "share": [share for _, _, _, _, share in rows],
+        },
+        column_config={"share": share},
+        hide_index=True,
+        use_container_width=True,
+        height=min(800, 35 * len(rows) + 40),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report on profiled script reruns")
+    parser.add_argument("command", choices=["report", "clear"])
+    parser.add_argument("--dir", default=settings.PROFILE_DIR)
+    parser.add_argument("--depth", type=int, default=14)
+    parser.add_argument("--min-share", type=float, default=1.0, help="Hide calls below this % of a rerun")
+    args = parser.parse_args()
+
+    if args.command == "clear":
+        for path in glob.glob(os.path.join(args.dir, "reruns-*.prof")):
+            os.remove(path)
+        return
+
+    stats = load(args.dir)
+    reruns, total, categories = summary(stats) if stats is not None else (0, 0.0, {})
+    if not reruns:
+        print(f"no profiled reruns in {args.dir}")
+        return
+    print(f"{reruns} reruns, {total:.1f} ms per rerun")
+    for name, ms in sorted(categories.items(), key=lambda item: item[1], reverse=True):
+        print(f"  {name:<12} {ms:9.2f} ms  {ms / total:6.1%}")
+    print()
+    for depth, label, calls, ms, share in flame_rows(stats, args.depth, args.min_share / 100):
+        print(f"{ms:9.2f} ms {share:6.1%} {calls:>7}  {'  ' * depth}{label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import settings
+from .client import HistorySync, InterviewClient
+from .core import build_body
+
+# Re-scores recorded interviews offline: every answered turn of every transcript
+# is sent to /begin_interview again, with the same request bodies the apps
+# build, and the resulting scores are written to CSV or Parquet.
+#
+#   python -m interview_app.replay transcripts.jsonl --out rescored.csv
+#
+# Each input line is one transcript: either a bare chat_history list or an
+# object with "chat_history" and optional "id", "interview_id", "user_id",
+# "question_type_id" and "question_id". Finished transcripts are listed in
+# <out>.checkpoint, so an interrupted run continues where it stopped when it is
+# started again with the same arguments.
+
+ID_FIELDS = ("user_id", "question_type_id", "question_id")
+COLUMNS = [
+    "transcript_id",
+    "turn",
+    "turns_scored",
+    "interview_id",
+    "final_score",
+    "criteria_score",
+    "evaluation_results",
+    "hint",
+]
+
+
+def read_transcripts(path):
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, list):
+                record = {"chat_history": record}
+            key = record.get("id") or record.get("interview_id") or f"line-{line_number}"
+            yield str(key), record
+
+
+def scored_turns(chat_history):
+    # (index, question, answer) for every answer given to an interview question:
+    # the answer on the question entry itself and the retries on the hint entries
+    # that follow it. The greeting's answer is not scored.
+    question = None
+    for index, entry in enumerate(chat_history):
+        if "question" in entry:
+            question = entry["question"]
+        if question is not None and entry.get("answer"):
+            yield index, question, entry["answer"]
+
+
+def replay_transcript(client, url, key, record, per_turn):
+    history = record.get("chat_history") or []
+    ids = {field: record[field] for field in ID_FIELDS if field in record}
+    sync = HistorySync()
+
+    stream = client.stream_interview(url, build_body([], 0, ids=ids), stream=False)
+    if not stream:
+        stream.res.raise_for_status()
+    interview_id = stream.data["interview_id"]
+
+    rows = []
+    for turn, (index, question, answer) in enumerate(scored_turns(history), 1):
+        # The backend sees the transcript exactly as it stood when the answer was given
+        body = build_body(history[:index + 1], interview_id, answer, question, ids=ids)
+        stream = client.stream_interview(url, body, sync=sync, stream=False)
+        if not stream:
+            stream.res.raise_for_status()
+        evaluation = stream.data.get("evaluation")
+        if evaluation is None:
+            continue
+        rows.append({
+            "transcript_id": key,
+            "turn": turn,
+            "interview_id": interview_id,
+            "final_score": evaluation.get("final_score"),
+            "criteria_score": evaluation.get("criteria_score"),
+            "evaluation_results": evaluation.get("evaluation_results"),
+            "hint": stream.data.get("hint"),
+        })
+
+    for row in rows:
+        row["turns_scored"] = len(rows)
+    return rows if per_turn else rows[-1:]
+
+
+class ReplayOutput:
+    # Buffers finished transcripts and writes them in batches. A transcript is
+    # added to the checkpoint only after its rows are on disk.
+    def __init__(self, path, fmt, batch_size):
+        self.path = path
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.checkpoint_path = path + ".checkpoint"
+        self.rows = []
+        self.keys = []
+        self._csv = None
+        self._parts = 0
+
+    def completed(self):
+        if not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path) as f:
+            return {line.rstrip("\n") for line in f if line.strip()}
+
+    def add(self, key, rows):
+        self.rows.extend(rows)
+        self.keys.append(key)
+        if len(self.keys) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows and self.fmt == "parquet":
+            self._write_parquet()
+        elif self.rows:
+            self._write_csv()
+        if self.keys:
+            with open(self.checkpoint_path, "a") as f:
+                f.writelines(f"{key}\n" for key in self.keys)
+                f.flush()
+                os.fsync(f.fileno())
+        self.rows, self.keys = [], []
+
+    def _write_csv(self):
+        if self._csv is None:
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, "a", newline="")
+            self._csv = csv.DictWriter(self._file, fieldnames=COLUMNS)
+            if new_file:
+                self._csv.writeheader()
+        for row in self.rows:
+            self._csv.writerow(dict(
+                row,
+                criteria_score=json.dumps(row["criteria_score"]),
+                evaluation_results=json.dumps(row["evaluation_results"]),
+            ))
+        self._file.flush()
+
+    def _write_parquet(self):
+        # pyarrow is only needed for Parquet output. Every batch is a complete part
+        # file in the `path` directory: a Parquet footer is only written on close,
+        # so one long-lived writer would leave checkpointed rows unreadable after
+        # a crash.
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist([
+            dict(row, evaluation_results=json.dumps(row["evaluation_results"])) for row in self.rows
+        ], schema=self._schema(pa))
+        os.makedirs(self.path, exist_ok=True)
+        self._parts += 1
+        name = f"part-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._parts:05d}.parquet"
+        pq.write_table(table, os.path.join(self.path, name))
+
+    def _schema(self, pa):
+        return pa.schema([
+            ("transcript_id", pa.string()),
+            ("turn", pa.int32()),
+            ("turns_scored", pa.int32()),
+            ("interview_id", pa.int64()),
+            ("final_score", pa.float64()),
+            ("criteria_score", pa.list_(pa.float64())),
+            ("evaluation_results", pa.string()),
+            ("hint", pa.string()),
+        ])
+
+    def close(self):
+        self.flush()
+        if self._csv is not None:
+            self._file.close()
+
+
+def replay(path, url, output, concurrency, per_turn, progress_every=100):
+    done = output.completed()
+    client = InterviewClient(pool_size=concurrency)
+    stats = {"replayed": 0, "skipped": 0, "failed": 0}
+    started = time.perf_counter()
+
+    def report():
+        rate = stats["replayed"] / max(time.perf_counter() - started, 1e-9)
+        print(f"replayed {stats['replayed']} ({rate:.1f}/s), skipped {stats['skipped']}, failed {stats['failed']}",
+              file=sys.stderr)
+
+    # At most `concurrency` transcripts run at once, and only twice that many are
+    # read ahead, so memory stays flat however large the input is
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as pool:
+        pending = {}
+
+        def collect(block):
+            if block:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            else:
+                finished = [future for future in pending if future.done()]
+            for future in finished:
+                key = pending.pop(future)
+                try:
+                    rows = future.result()
+                except Exception as ex:
+                    # Not checkpointed: a resumed run tries this transcript again
+                    stats["failed"] += 1
+                    print(f"{key}: {ex}", file=sys.stderr)
+                    continue
+                output.add(key, rows)
+                stats["replayed"] += 1
+                if stats["replayed"] % progress_every == 0:
+                    report()
+
+        for key, record in read_transcripts(path):
+            if key in done:
+                stats["skipped"] += 1
+                continue
+            while len(pending) >= concurrency * 2:
+                collect(block=True)
+            pending[pool.submit(replay_transcript, client, url, key, record, per_turn)] = key
+            collect(block=False)
+
+        while pending:
+            collect(block=True)
+
+    output.close()
+    client.close()
+    report()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score recorded interview transcripts against /begin_interview")
+    parser.add_argument("transcripts", help="JSONL file, one chat_history (or transcript object) per line")
+    parser.add_argument("--out", required=True, help="CSV file, or directory of Parquet part files")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="Defaults to the --out extension")
+    parser.add_argument("--url", default=settings.BACKEND_URL or settings.LOCAL_BACKEND_URL)
+    parser.add_argument("--concurrency", type=int, default=8, help="Transcripts replayed at the same time")
+    parser.add_argument("--batch-size", type=int, default=100, help="Transcripts per write and checkpoint")
+    parser.add_argument("--per-turn", action="store_true", help="One row per scored answer instead of per interview")
+    args = parser.parse_args()
+
+    fmt = args.format or ("parquet" if args.out.endswith(".parquet") else "csv")
+    output = ReplayOutput(args.out, fmt, args.batch_size)
+    stats = replay(args.transcripts, args.url, output, args.concurrency, args.per_turn)
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
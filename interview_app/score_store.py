@@ -0,0 +1,219 @@
+import argparse
+import datetime
+import logging
+import os
+import queue
+import threading
+import time
+
+import streamlit as st
+
+from . import settings
+
+logger = logging.getLogger(__name__)
+
+# Every evaluation the apps receive is appended to a Parquet dataset for the
+# analytics page. Three tables share a hive layout partitioned by day and question:
+#
+#   <root>/evaluations/date=2026-01-31/question_id=13/part-....parquet
+#   <root>/criteria/date=2026-01-31/question_id=13/part-....parquet
+#   <root>/subcriteria/date=2026-01-31/question_id=13/part-....parquet
+#
+# "evaluations" has one row per evaluation with the final score; "criteria" one
+# row per criteria_score entry (the backend decides how many there are) and
+# "subcriteria" one row per evaluation_results entry.
+
+TABLES = ("evaluations", "criteria", "subcriteria")
+
+
+def evaluation_rows(evaluation, interview_id, ids, ts=None):
+    # {table: rows} for one /begin_interview evaluation
+    ts = time.time() if ts is None else ts
+    ids = ids or {}
+    key = {
+        "ts": ts,
+        "date": datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).date().isoformat(),
+        "interview_id": str(interview_id) if interview_id is not None else None,
+        "user_id": ids.get("user_id"),
+        "question_type_id": ids.get("question_type_id"),
+        "question_id": ids.get("question_id"),
+    }
+    return {
+        "evaluations": [dict(key, final_score=evaluation.get("final_score"))],
+        "criteria": [
+            dict(key, criterion=i + 1, score=score)
+            for i, score in enumerate(evaluation.get("criteria_score") or [])
+        ],
+        "subcriteria": [
+            dict(key, subcriterion=name, weight=values[0], score=values[1])
+            for name, values in (evaluation.get("evaluation_results") or {}).items()
+        ],
+    }
+
+
+def schemas(pa):
+    key = [
+        ("ts", pa.float64()),
+        ("interview_id", pa.string()),
+        ("user_id", pa.int64()),
+        ("question_type_id", pa.int64()),
+    ]
+    return {
+        "evaluations": pa.schema(key + [("final_score", pa.float64())]),
+        "criteria": pa.schema(key + [
+            ("criterion", pa.int64()),
+            ("score", pa.float64()),
+        ]),
+        "subcriteria": pa.schema(key + [
+            ("subcriterion", pa.string()),
+            ("weight", pa.float64()),
+            ("score", pa.float64()),
+        ]),
+    }
+
+
+def partition_dir(root, table, date, question_id):
+    return os.path.join(root, table, f"date={date}", f"question_id={question_id}")
+
+
+class ScoreStore:
+    def append(self, evaluation, interview_id, ids):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullScoreStore(ScoreStore):
+    def append(self, evaluation, interview_id, ids):
+        pass
+
+
+class ParquetScoreStore(ScoreStore):
+    # Write-behind like the session store: rows are queued and a background
+    # thread writes one part file per partition and batch
+    def __init__(self, root=settings.SCORE_STORE_DIR, batch_size=settings.SCORE_BATCH_SIZE,
+                 flush_interval=settings.SCORE_FLUSH_INTERVAL):
+        self.root = root
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._closed = False
+        self._parts = 0
+        self._writer = threading.Thread(target=self._write_loop, name="score-store-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, evaluation, interview_id, ids):
+        self._queue.put(evaluation_rows(evaluation, interview_id, ids))
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            items = [item for item in batch if item is not None]
+            try:
+                if items:
+                    self._write(items)
+            except Exception:
+                logger.exception("Failed to store %d evaluations", len(items))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if None in batch and self._closed:
+                return
+
+    def _write(self, items):
+        # pyarrow ships with streamlit; it is imported on first write only
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = {table: [row for item in items for row in item[table]] for table in TABLES}
+        table_schemas = schemas(pa)
+        self._parts += 1
+        name = f"part-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._parts:05d}.parquet"
+        for table, table_rows in rows.items():
+            partitions = {}
+            for row in table_rows:
+                partitions.setdefault((row["date"], row["question_id"]), []).append(row)
+            for (date, question_id), partition_rows in partitions.items():
+                directory = partition_dir(self.root, table, date, question_id)
+                os.makedirs(directory, exist_ok=True)
+                # Dot-prefixed files are skipped by dataset readers, so a partial
+                # file is never scanned
+                temp = os.path.join(directory, "." + name)
+                pq.write_table(pa.Table.from_pylist(partition_rows, schema=table_schemas[table]), temp)
+                os.replace(temp, os.path.join(directory, name))
+
+
+BACKENDS = {
+    "parquet": ParquetScoreStore,
+    "none": NullScoreStore,
+}
+
+
+@st.cache_resource
+def get_score_store():
+    return BACKENDS[settings.SCORE_STORE]()
+
+
+def record(evaluation, interview_id, ids):
+    get_score_store().append(evaluation, interview_id, ids)
+
+
+def compact(root=settings.SCORE_STORE_DIR, min_files=2):
+    # Merges the part files of each partition into one, so scans over months of
+    # data open a few hundred files instead of one per writer batch. Run it from
+    # cron while the apps are up: only files present at the start are merged.
+    import pyarrow.parquet as pq
+
+    merged = 0
+    for table in TABLES:
+        table_root = os.path.join(root, table)
+        if not os.path.isdir(table_root):
+            continue
+        for directory, _, files in os.walk(table_root):
+            parts = sorted(f for f in files if f.endswith(".parquet") and not f.startswith("."))
+            if len(parts) < min_files:
+                continue
+            paths = [os.path.join(directory, f) for f in parts]
+            combined = pq.ParquetDataset(paths, partitioning=None).read()
+            name = f"compact-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.parquet"
+            pq.write_table(combined, os.path.join(directory, "." + name), row_group_size=128 * 1024)
+            os.replace(os.path.join(directory, "." + name), os.path.join(directory, name))
+            for path in paths:
+                os.remove(path)
+            merged += len(paths)
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the evaluation score store")
+    parser.add_argument("command", choices=["compact"])
+    parser.add_argument("--root", default=settings.SCORE_STORE_DIR)
+    args = parser.parse_args()
+    print(f"merged {compact(args.root)} part files")
+
+
+if __name__ == "__main__":
+    main()
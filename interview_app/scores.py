@@ -0,0 +1,118 @@
+import math
+import uuid
+
+# Score histories for the trend charts. Practice sessions run to hundreds of
+# attempts, so the scores live in one preallocated NumPy array per history
+# instead of a list of lists, and the charts read downsampled series that are
+# only recomputed when an attempt is added.
+
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: keeps the first and last point and, from
+    # each of threshold - 2 buckets, the point spanning the largest triangle
+    # with the previously kept point and the next bucket's average
+    import numpy as np
+
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    every = (n - 2) / (threshold - 2)
+    keep = np.empty(threshold, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(math.floor(i * every)) + 1
+        end = int(math.floor((i + 1) * every)) + 1
+        next_end = min(max(int(math.floor((i + 2) * every)) + 1, end + 1), n)
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+class ScoreHistory:
+    # Append-only attempts x scores in a float64 array that doubles when full.
+    # Rows may differ in length (the backend decides how many criteria there
+    # are): the array widens to the longest row and missing scores are NaN.
+    # A `scalar` history holds one score per attempt. Indexing and slicing
+    # return plain floats and lists, which is what the session store persists.
+    def __init__(self, rows=(), scalar=False, capacity=64):
+        self.scalar = scalar
+        # Identifies this history in the chart caches; with the length it
+        # names the content, so nothing has to be hashed per rerun
+        self.token = uuid.uuid4().hex
+        self._capacity = capacity
+        self._data = None
+        self._lengths = None
+        self._length = 0
+        self._series = None
+        for row in rows:
+            self.append(row)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return (self[i] for i in range(self._length))
+
+    @property
+    def width(self):
+        return 0 if self._data is None else self._data.shape[1]
+
+    def _reserve(self, width):
+        # numpy is imported with the first score, like pandas with the first table
+        import numpy as np
+
+        if self._data is None:
+            self._data = np.full((self._capacity, width), np.nan)
+            self._lengths = np.zeros(self._capacity, dtype=np.int16)
+            return
+        height, current = self._data.shape
+        if self._length < height and width <= current:
+            return
+        grown = np.full((height * 2 if self._length >= height else height, max(width, current)), np.nan)
+        grown[:self._length, :current] = self._data[:self._length]
+        lengths = np.zeros(grown.shape[0], dtype=np.int16)
+        lengths[:self._length] = self._lengths[:self._length]
+        self._data, self._lengths = grown, lengths
+
+    def append(self, row):
+        values = [row] if self.scalar else list(row)
+        self._reserve(max(len(values), 1))
+        self._data[self._length, :len(values)] = [math.nan if v is None else v for v in values]
+        self._lengths[self._length] = len(values)
+        self._length += 1
+
+    def array(self):
+        # (attempts, width) view of the stored scores
+        return self._data[:self._length] if self._data is not None else None
+
+    def _row(self, index):
+        values = [None if math.isnan(v) else float(v) for v in self._data[index, :self._lengths[index]]]
+        return values[0] if self.scalar else values
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("score history index out of range")
+        return self._row(index)
+
+    def series(self, points):
+        # One (attempts, scores) pair per column, NaNs dropped and downsampled
+        # to `points`; recomputed only when an attempt was added
+        if self._series is not None and self._series[:2] == (self._length, points):
+            return self._series[2]
+        import numpy as np
+
+        data = self.array()
+        attempts = np.arange(1, self._length + 1, dtype=np.float64)
+        series = []
+        for column in range(self.width):
+            present = ~np.isnan(data[:, column])
+            series.append(lttb(attempts[present], data[present, column], points))
+        self._series = (self._length, points, series)
+        return series
@@ -0,0 +1,187 @@
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+import streamlit as st
+
+from . import settings
+
+logger = logging.getLogger(__name__)
+
+# Sessions are keyed on a random per-session token, never on the backend's
+# interview_id: interview ids are sequential, and ?interview_id=<n+1> would
+# open someone else's interview
+QUERY_PARAM = "session"
+TOKEN_KEY = "client_id"
+
+
+class SessionStore:
+    # Append-only log of per-turn records, keyed by session token
+    def append(self, token, record):
+        raise NotImplementedError
+
+    def load(self, token):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class NullSessionStore(SessionStore):
+    def append(self, token, record):
+        pass
+
+    def load(self, token):
+        return []
+
+
+class SQLiteSessionStore(SessionStore):
+    # Writes are queued and committed by a background thread in batches
+    # (write-behind), so the script thread never waits on disk
+    def __init__(self, path=settings.SESSION_DB, batch_size=settings.SESSION_BATCH_SIZE,
+                 flush_interval=settings.SESSION_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._closed = False
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_turns ("
+                " token TEXT NOT NULL,"
+                " ts REAL NOT NULL,"
+                " record TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS session_turns_token ON session_turns (token)")
+
+        self._writer = threading.Thread(target=self._write_loop, name="session-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            rows = [item for item in batch if item is not None]
+            try:
+                if rows:
+                    with conn:
+                        conn.executemany("INSERT INTO session_turns (token, ts, record) VALUES (?, ?, ?)", rows)
+            except sqlite3.Error:
+                logger.exception("Failed to persist %d session records", len(rows))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if None in batch and self._closed:
+                conn.close()
+                return
+
+    def append(self, token, record):
+        self._queue.put((token, time.time(), json.dumps(record)))
+
+    def flush(self):
+        self._queue.join()
+
+    def load(self, token):
+        self.flush()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT record FROM session_turns WHERE token = ? ORDER BY rowid", (token,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+
+BACKENDS = {
+    "sqlite": SQLiteSessionStore,
+    "none": NullSessionStore,
+}
+
+
+@st.cache_resource
+def get_store():
+    return BACKENDS[settings.SESSION_STORE]()
+
+
+def persist_turn(list_keys, value_keys):
+    # Append what changed since the last record. Lists are append-only except
+    # for their last entry (chat_history[-1] gains the answer), so each record
+    # re-sends the previously persisted last entry. Nothing is kept before the
+    # backend has opened the interview.
+    if not st.session_state.get("interview_id"):
+        return
+    token = st.session_state.get(TOKEN_KEY)
+    if not token:
+        token = st.session_state[TOKEN_KEY] = uuid.uuid4().hex
+
+    persisted = st.session_state.setdefault("_persisted_lengths", {})
+    record = {"lists": {}, "values": {key: st.session_state.get(key) for key in value_keys}}
+    for key in list_keys:
+        items = st.session_state.get(key) or []
+        base = max(0, min(persisted.get(key, 0), len(items)) - 1)
+        record["lists"][key] = [base, items[base:]]
+        persisted[key] = len(items)
+
+    get_store().append(token, record)
+    st.query_params[QUERY_PARAM] = token
+
+
+def restore_session(list_keys, value_keys):
+    # Lazily rebuild a fresh session from the token in the URL, once per
+    # session. The session takes the token over as its own. No backend calls
+    # are replayed.
+    if st.session_state.get("_restore_checked"):
+        return False
+    st.session_state["_restore_checked"] = True
+
+    token = st.query_params.get(QUERY_PARAM)
+    if not token or st.session_state.get("interview_id"):
+        return False
+
+    records = get_store().load(token)
+    if not records:
+        return False
+
+    lists = {key: [] for key in list_keys}
+    values = {}
+    for record in records:
+        for key, (base, items) in record.get("lists", {}).items():
+            if key in lists:
+                del lists[key][base:]
+                lists[key].extend(items)
+        values.update(record.get("values", {}))
+
+    for key in list_keys:
+        st.session_state[key] = lists[key]
+    for key in value_keys:
+        if key in values:
+            st.session_state[key] = values[key]
+    st.session_state[TOKEN_KEY] = token
+    st.session_state["_persisted_lengths"] = {key: len(items) for key, items in lists.items()}
+    return True
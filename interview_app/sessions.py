@@ -0,0 +1,331 @@
+import csv
+import json
+import logging
+import os
+import threading
+import time
+
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from . import instrumentation, settings
+from .client import get_client
+from .journal import get_journal
+from .workers import get_pool, get_registry
+
+logger = logging.getLogger(__name__)
+
+# Which candidate a browser session belongs to, and a process-wide registry of
+# sessions so idle ones can be evicted before session state piles up.
+# The sweeper marks a session and has the Streamlit runtime close it, which
+# drops its state; the browser reconnects to a new session that is rebuilt
+# from the session store via its ?session= token. Without a runtime (bare
+# mode) a marked session clears its own state at the start of its next rerun.
+
+ID_FIELDS = ("user_id", "question_type_id", "question_id")
+IN_FLIGHT_KEYS = ("pending_turn", "speculative_turn", "queued_turn")
+
+
+class UnknownCandidate(Exception):
+    pass
+
+
+def _read_roster(path):
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            return {row["candidate"]: row for row in csv.DictReader(f)}
+    with open(path) as f:
+        return json.load(f)
+
+
+_roster_lock = threading.Lock()
+_roster = {"path": None, "mtime": None, "entries": {}}
+
+
+def load_roster(path=None):
+    # Re-read when the file changes so candidates can be added without a
+    # restart. A missing or unreadable roster admits no ?candidate= links.
+    path = path or settings.ROSTER_FILE
+    if not path:
+        return None
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        logger.warning("Roster file %s is missing", path)
+        return {}
+    with _roster_lock:
+        if _roster["path"] != path or _roster["mtime"] != mtime:
+            try:
+                entries = _read_roster(path)
+            except (OSError, ValueError, KeyError):
+                logger.exception("Could not read roster file %s", path)
+                entries = {}
+            if not isinstance(entries, dict):
+                logger.error("Roster file %s does not map candidates to ids", path)
+                entries = {}
+            _roster.update(path=path, mtime=mtime, entries=entries)
+        return _roster["entries"]
+
+
+def _ids_from(source):
+    return {field: int(source[field]) for field in ID_FIELDS if source.get(field) not in (None, "")}
+
+
+def resolve_candidate():
+    # Ids for this browser session, from ?candidate= (roster) or the explicit
+    # id query params, falling back to the configured defaults
+    ids = {
+        "user_id": settings.DEFAULT_USER_ID,
+        "question_type_id": settings.DEFAULT_QUESTION_TYPE_ID,
+        "question_id": settings.DEFAULT_QUESTION_ID,
+    }
+    params = st.query_params
+    roster = load_roster()
+    key = params.get("candidate")
+    if key is not None and roster is not None:
+        if key not in roster:
+            raise UnknownCandidate(key)
+        try:
+            ids.update(_ids_from(roster[key]))
+        except (AttributeError, TypeError, ValueError):
+            logger.error("Roster entry %r does not hold integer ids", key)
+            raise UnknownCandidate(key)
+    elif settings.QUERY_IDS:
+        try:
+            ids.update(_ids_from(params))
+        except ValueError:
+            pass
+    return ids
+
+
+def _session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+class SessionRecord:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.candidate = None
+        self.last_seen = time.monotonic()
+        self.running = 0
+        self.memory_bytes = 0
+        self.memory_sampled = 0.0
+        # A backend call or journaled answer was outstanding at the last rerun
+        self.in_flight = False
+        # Connections the session holds open, closed with it
+        self.resources = []
+
+
+class SessionManager:
+    def __init__(
+        self,
+        idle_timeout=settings.SESSION_IDLE_TIMEOUT,
+        memory_budget=settings.SESSION_MEMORY_BUDGET,
+        sweep_interval=settings.SESSION_SWEEP_INTERVAL,
+    ):
+        self.idle_timeout = idle_timeout
+        self.memory_budget = memory_budget
+        self._lock = threading.Lock()
+        self._sessions = {}
+        # Sessions picked by the sweeper that have not rerun since
+        self._marked = set()
+        self.evicted = 0
+        self._sweeper = threading.Thread(target=self._sweep_forever, args=(sweep_interval,), daemon=True,
+                                         name="interview-session-sweeper")
+        self._sweeper.start()
+
+    def begin(self, session_id, candidate=None, memory_bytes=None, in_flight=False):
+        with self._lock:
+            self._marked.discard(session_id)
+            record = self._sessions.get(session_id)
+            if record is None:
+                record = self._sessions[session_id] = SessionRecord(session_id)
+            record.candidate = candidate
+            record.running += 1
+            record.last_seen = time.monotonic()
+            record.in_flight = in_flight
+            if memory_bytes is not None:
+                record.memory_bytes = memory_bytes
+                record.memory_sampled = record.last_seen
+            return record
+
+    def attach(self, session_id, resource):
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is not None:
+                record.resources.append(resource)
+
+    def _close_resources(self, records):
+        # Outside the lock: closing a socket waits for its event loop
+        resources = []
+        with self._lock:
+            for record in records:
+                resources += record.resources
+                record.resources = []
+        for resource in resources:
+            try:
+                resource.close()
+            except Exception:
+                logger.exception("Could not close a resource of an evicted session")
+
+    def marked(self, session_id):
+        with self._lock:
+            return session_id in self._marked
+
+    def end(self, session_id):
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None:
+                return
+            record.running = max(0, record.running - 1)
+            record.last_seen = time.monotonic()
+
+    def memory_due(self, session_id, interval=settings.SESSION_MEMORY_SAMPLE_INTERVAL):
+        # Sizing session state walks all of it, so it is sampled, not measured every rerun
+        with self._lock:
+            record = self._sessions.get(session_id)
+            return record is not None and time.monotonic() - record.memory_sampled > interval
+
+    def snapshot(self):
+        with self._lock:
+            records = list(self._sessions.values())
+            marked = len(self._marked)
+            evicted = self.evicted
+        return {
+            "sessions": len(records),
+            "running": sum(1 for r in records if r.running),
+            "memory_bytes": sum(r.memory_bytes for r in records),
+            "marked": marked,
+            "evicted": evicted,
+        }
+
+    def sweep(self, now=None):
+        # Idle sessions past the timeout go first, then the least recently seen
+        # ones while tracked memory is over budget. Marked sessions still count
+        # towards it until they are gone, but are not picked again.
+        now = time.monotonic() if now is None else now
+        self.prune()
+        with self._lock:
+            records = sorted(self._sessions.values(), key=lambda r: r.last_seen)
+            marked = set(self._marked)
+        total = sum(r.memory_bytes for r in records)
+        for record in records:
+            if record.running or record.in_flight or record.session_id in marked:
+                continue
+            if now - record.last_seen > self.idle_timeout or total > self.memory_budget:
+                if self.evict(record.session_id):
+                    total -= record.memory_bytes
+
+    def prune(self):
+        # Forgets sessions the runtime no longer has: closed tabs and the
+        # sessions evict() closed, whose memory is freed with them
+        if not Runtime.exists():
+            return
+        runtime = Runtime.instance()
+        gone = []
+        with self._lock:
+            for session_id in [s for s in self._sessions if not runtime.is_active_session(s)]:
+                gone.append(self._sessions.pop(session_id))
+                if session_id in self._marked:
+                    self.evicted += 1
+            self._marked &= self._sessions.keys()
+        self._close_resources(gone)
+
+    def evict(self, session_id):
+        # Marks the session and closes it; its memory keeps counting against
+        # the budget until it has been cleared or pruned
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None or record.running or record.in_flight or session_id in self._marked:
+                return False
+            self._marked.add(session_id)
+        self._close_resources([record])
+        _close_session(session_id)
+        return True
+
+    def cleared(self, session_id):
+        with self._lock:
+            self._marked.discard(session_id)
+            record = self._sessions.get(session_id)
+            if record is not None:
+                # Sized again on its next rerun
+                record.memory_bytes = 0
+                record.memory_sampled = 0.0
+            self.evicted += 1
+        if record is not None:
+            self._close_resources([record])
+
+    def _sweep_forever(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Session sweep failed")
+
+
+def _close_session(session_id):
+    # Runtime.close_session drops the session's state for good and must run on
+    # the runtime's event loop, which Streamlit exposes no public handle for
+    if not Runtime.exists():
+        return
+    runtime = Runtime.instance()
+    try:
+        loop = runtime._get_async_objs().eventloop
+    except RuntimeError:
+        # Not started yet
+        return
+    loop.call_soon_threadsafe(runtime.close_session, session_id)
+
+
+@st.cache_resource
+def get_manager():
+    return SessionManager()
+
+
+def close_with_session(resource):
+    # `resource.close()` runs when this session is evicted, cleared or gone
+    session_id = _session_id()
+    if session_id is not None:
+        get_manager().attach(session_id, resource)
+
+
+def _in_flight():
+    return any(st.session_state.get(key) is not None for key in IN_FLIGHT_KEYS)
+
+
+def begin_session():
+    # Runs first thing in a rerun, on the script thread: a session the sweeper
+    # marked but the runtime has not closed yet drops its state here, unless a backend call or a journaled answer
+    # is still outstanding. Memory is sampled here too, since the end of a
+    # rerun is often st.rerun()/st.stop(), after which session_state raises.
+    session_id = _session_id()
+    if session_id is None:
+        return None
+    manager = get_manager()
+    in_flight = _in_flight()
+    if manager.marked(session_id) and not in_flight:
+        st.session_state.clear()
+        manager.cleared(session_id)
+    memory_bytes = sum(instrumentation.memory_report().values()) if manager.memory_due(session_id) else None
+    manager.begin(session_id, st.session_state.get("candidate"), memory_bytes, in_flight)
+    return manager, session_id
+
+
+def end_session(token):
+    # Runs in a finally block, so no Streamlit calls
+    if token is not None:
+        manager, session_id = token
+        manager.end(session_id)
+
+
+def live_counts():
+    # Process-wide numbers for the metrics sidebar and log
+    counts = get_manager().snapshot()
+    counts["backend_calls_in_flight"] = get_client().in_flight
+    counts["submissions_in_flight"] = get_pool().in_flight
+    counts.update(get_registry().snapshot())
+    counts.update(get_journal().snapshot())
+    return counts
@@ -0,0 +1,183 @@
+import os
+
+# Backend endpoints
+LOCAL_BACKEND_URL = "http://127.0.0.1:8000/begin_interview"
+REMOTE_BACKEND_URL = "http://51.21.161.137:4050/begin_interview"
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_str(name, default):
+    value = os.environ.get(name)
+    return value if value not in (None, "") else default
+
+
+# HTTP client
+POOL_SIZE = env_int("NOHA_POOL_SIZE", 32)
+CONNECT_TIMEOUT = env_float("NOHA_CONNECT_TIMEOUT", 3.05)
+READ_TIMEOUT = env_float("NOHA_READ_TIMEOUT", 120.0)
+MAX_RETRIES = env_int("NOHA_MAX_RETRIES", 2)
+BACKOFF_BASE = env_float("NOHA_BACKOFF_BASE", 0.25)
+BACKOFF_MAX = env_float("NOHA_BACKOFF_MAX", 4.0)
+
+# Candidate profile used when neither the URL nor the roster names one
+DEFAULT_USER_ID = env_int("NOHA_USER_ID", 4)
+DEFAULT_QUESTION_TYPE_ID = env_int("NOHA_QUESTION_TYPE_ID", 1)
+DEFAULT_QUESTION_ID = env_int("NOHA_QUESTION_ID", 13)
+
+# Per-session candidates: ?candidate=<key> looks the ids up in the roster file
+# (JSON object or CSV keyed by "candidate"); ?user_id=&question_type_id=&question_id=
+# are accepted directly unless QUERY_IDS is off. An unknown candidate key is
+# refused when a roster is configured.
+ROSTER_FILE = env_str("NOHA_ROSTER_FILE", None)
+QUERY_IDS = env_bool("NOHA_QUERY_IDS", True)
+
+# Session manager: sessions idle for longer than the timeout are marked for
+# eviction, and the least recently used idle sessions go first once tracked
+# session memory exceeds the budget. A marked session is closed by the
+# runtime and resumes from the session store via ?session= on reconnect.
+SESSION_IDLE_TIMEOUT = env_float("NOHA_SESSION_IDLE_TIMEOUT", 1800.0)
+SESSION_MEMORY_BUDGET = env_int("NOHA_SESSION_MEMORY_BUDGET", 512 * 1024 * 1024)
+SESSION_SWEEP_INTERVAL = env_float("NOHA_SESSION_SWEEP_INTERVAL", 30.0)
+SESSION_MEMORY_SAMPLE_INTERVAL = env_float("NOHA_SESSION_MEMORY_SAMPLE_INTERVAL", 10.0)
+
+# Overrides the per-app default endpoint when set
+BACKEND_URL = env_str("NOHA_BACKEND_URL", None)
+
+# Backend pool: comma-separated URLs ("local" and "remote" name the two known
+# endpoints) in priority order; replaces BACKEND_URL when set. A turn is hedged
+# to the next backend once the current one is slower than its recent
+# HEDGE_PERCENTILE latency (HEDGE_INITIAL_DELAY until HEDGE_MIN_SAMPLES calls
+# have been seen), unless HEDGE_MAX_IN_FLIGHT hedges are already running or
+# every pool thread is busy. A backend's circuit opens after BREAKER_FAILURES consecutive
+# failed calls or health checks and is retried after BREAKER_RESET_TIMEOUT.
+BACKENDS = [url.strip() for url in env_str("NOHA_BACKENDS", "").split(",") if url.strip()]
+HEDGE = env_bool("NOHA_HEDGE", True)
+HEDGE_PERCENTILE = env_float("NOHA_HEDGE_PERCENTILE", 95.0)
+HEDGE_MIN_DELAY = env_float("NOHA_HEDGE_MIN_DELAY", 0.5)
+HEDGE_INITIAL_DELAY = env_float("NOHA_HEDGE_INITIAL_DELAY", 10.0)
+HEDGE_MIN_SAMPLES = env_int("NOHA_HEDGE_MIN_SAMPLES", 20)
+HEDGE_MAX_IN_FLIGHT = env_int("NOHA_HEDGE_MAX_IN_FLIGHT", 4)
+BREAKER_FAILURES = env_int("NOHA_BREAKER_FAILURES", 3)
+BREAKER_RESET_TIMEOUT = env_float("NOHA_BREAKER_RESET_TIMEOUT", 30.0)
+BACKEND_HEALTH_PATH = env_str("NOHA_BACKEND_HEALTH_PATH", "/health")
+HEALTH_INTERVAL = env_float("NOHA_HEALTH_INTERVAL", 10.0)
+
+# Transport: "http" posts every turn (through the backend pool), "websocket"
+# keeps one connection per interview open to SOCKET_URL and receives turns as
+# pushed events. Idle connections are closed and reopened on the next turn.
+TRANSPORT = env_str("NOHA_TRANSPORT", "http")
+SOCKET_URL = env_str("NOHA_SOCKET_URL", "ws://127.0.0.1:8765/interview")
+SOCKET_IDLE_TIMEOUT = env_float("NOHA_SOCKET_IDLE_TIMEOUT", 300.0)
+SOCKET_PING_INTERVAL = env_float("NOHA_SOCKET_PING_INTERVAL", 30.0)
+
+# chat_history sync: "delta" sends only new entries once the backend acknowledges
+# a sequence number, "full" always resends the whole transcript
+HISTORY_SYNC = env_str("NOHA_HISTORY_SYNC", "delta")
+
+# Evaluation payloads: "diff" asks the backend to send evaluation_results as
+# changes against the previous evaluation of the interview (weights once, then
+# only the scores that moved); "full" always takes the whole mapping
+EVALUATION_SYNC = env_str("NOHA_EVALUATION_SYNC", "diff")
+
+# Wire format: request bodies are compressed ("auto" picks zstd, then gzip) and
+# optionally msgpack-encoded, but only once the backend has advertised support
+# in its Accept / Accept-Encoding response headers. Bodies below the threshold
+# are sent as they are.
+WIRE_COMPRESSION = env_str("NOHA_WIRE_COMPRESSION", "auto")
+WIRE_FORMAT = env_str("NOHA_WIRE_FORMAT", "json")
+WIRE_MIN_BYTES = env_int("NOHA_WIRE_MIN_BYTES", 1024)
+
+# chat_history window: keep the last N entries verbatim and fold older ones into
+# one summary entry (0 keeps the full history). Folding happens in batches so
+# delta sync only resends the whole window every HISTORY_FOLD_BATCH entries.
+HISTORY_WINDOW = env_int("NOHA_HISTORY_WINDOW", 0)
+HISTORY_FOLD_BATCH = env_int("NOHA_HISTORY_FOLD_BATCH", 4)
+HISTORY_SUMMARY_CHARS = env_int("NOHA_HISTORY_SUMMARY_CHARS", 2000)
+
+# Ask the backend to stream greeting/question/hint text as server-sent events
+STREAMING = env_bool("NOHA_STREAMING", True)
+
+# Opening content cache: the greeting and the first question are rendered from a
+# process-wide TTL+LRU cache keyed on the user/question ids while the real call
+# runs in the background. "none" disables it.
+OPENING_CACHE = [f.strip() for f in env_str("NOHA_OPENING_CACHE", "greeting,question").split(",") if f.strip() != "none"]
+OPENING_CACHE_TTL = env_float("NOHA_OPENING_CACHE_TTL", 3600.0)
+OPENING_CACHE_SIZE = env_int("NOHA_OPENING_CACHE_SIZE", 1024)
+
+# Trend charts: "matplotlib" renders cached PNGs, "native" uses st.line_chart
+# and never imports matplotlib
+CHART_BACKEND = env_str("NOHA_CHART_BACKEND", "matplotlib")
+CHART_CACHE_SIZE = env_int("NOHA_CHART_CACHE_SIZE", 256)
+# Trend lines with more attempts than this are downsampled (LTTB) to this many points
+CHART_POINTS = env_int("NOHA_CHART_POINTS", 200)
+
+# Answer submission: dispatch backend calls to a shared worker pool and poll
+# for the result instead of blocking the script thread
+ASYNC_SUBMIT = env_bool("NOHA_ASYNC_SUBMIT", True)
+WORKER_THREADS = env_int("NOHA_WORKER_THREADS", 16)
+POLL_INTERVAL = env_float("NOHA_POLL_INTERVAL", 0.5)
+
+# Answer journal: answers whose backend call fails for lack of a backend
+# (connection error, timeout, 5xx) are queued in SQLite and sent by a
+# background flusher once a backend is available, at most JOURNAL_BATCH_SIZE
+# every JOURNAL_FLUSH_INTERVAL seconds (backing off to JOURNAL_MAX_BACKOFF
+# while none is). "none" shows the error instead.
+JOURNAL = env_str("NOHA_JOURNAL", "sqlite")
+JOURNAL_DB = env_str("NOHA_JOURNAL_DB", "interview_journal.db")
+JOURNAL_BATCH_SIZE = env_int("NOHA_JOURNAL_BATCH_SIZE", 8)
+JOURNAL_FLUSH_INTERVAL = env_float("NOHA_JOURNAL_FLUSH_INTERVAL", 1.0)
+JOURNAL_MAX_BACKOFF = env_float("NOHA_JOURNAL_MAX_BACKOFF", 10.0)
+JOURNAL_RETENTION = env_float("NOHA_JOURNAL_RETENTION", 86400.0)
+
+# Finished turns are kept for TURN_CACHE_TTL seconds so a duplicate submission
+# of the same answer is answered without another backend call
+TURN_CACHE_TTL = env_float("NOHA_TURN_CACHE_TTL", 120.0)
+TURN_CACHE_SIZE = env_int("NOHA_TURN_CACHE_SIZE", 4096)
+
+# Instrumentation: sidebar panel (also enabled per session with ?metrics=1) and
+# an optional rotating JSONL file with one record per script rerun
+METRICS_SIDEBAR = env_bool("NOHA_METRICS_SIDEBAR", False)
+METRICS_FILE = env_str("NOHA_METRICS_FILE", None)
+METRICS_MAX_BYTES = env_int("NOHA_METRICS_MAX_BYTES", 10 * 1024 * 1024)
+METRICS_BACKUPS = env_int("NOHA_METRICS_BACKUPS", 5)
+
+# Profiling: cProfile a share of script reruns (every rerun of a session opened
+# with ?profile=1) and aggregate them per process into PROFILE_DIR, rewritten
+# every PROFILE_DUMP_INTERVAL seconds. profile_streamlit.py shows the result;
+# with PROFILE_TOKEN set it only answers to ?token=<PROFILE_TOKEN>.
+PROFILE = env_bool("NOHA_PROFILE", False)
+PROFILE_SAMPLE_RATE = env_float("NOHA_PROFILE_SAMPLE_RATE", 1.0)
+PROFILE_DIR = env_str("NOHA_PROFILE_DIR", "interview_profiles")
+PROFILE_DUMP_INTERVAL = env_float("NOHA_PROFILE_DUMP_INTERVAL", 30.0)
+PROFILE_TOKEN = env_str("NOHA_PROFILE_TOKEN", None)
+
+# Durable sessions: "sqlite" persists every turn (write-behind), "none" disables it
+SESSION_STORE = env_str("NOHA_SESSION_STORE", "sqlite")
+SESSION_DB = env_str("NOHA_SESSION_DB", "interview_sessions.db")
+SESSION_BATCH_SIZE = env_int("NOHA_SESSION_BATCH_SIZE", 64)
+SESSION_FLUSH_INTERVAL = env_float("NOHA_SESSION_FLUSH_INTERVAL", 0.5)
+
+# Score store: every evaluation is appended to a Parquet dataset partitioned by
+# date and question_id (write-behind); "none" disables it. The analytics page
+# reads it and caches query results for ANALYTICS_CACHE_TTL seconds.
+SCORE_STORE = env_str("NOHA_SCORE_STORE", "parquet")
+SCORE_STORE_DIR = env_str("NOHA_SCORE_STORE_DIR", "interview_scores")
+SCORE_BATCH_SIZE = env_int("NOHA_SCORE_BATCH_SIZE", 256)
+SCORE_FLUSH_INTERVAL = env_float("NOHA_SCORE_FLUSH_INTERVAL", 5.0)
+ANALYTICS_CACHE_TTL = env_float("NOHA_ANALYTICS_CACHE_TTL", 60.0)
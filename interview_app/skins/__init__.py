@@ -0,0 +1,10 @@
+from .bar_riser import BarRiserSkin
+from .classic import ClassicSkin
+from .noha import NohaSkin
+
+# Entry scripts pick a skin by name: run("noha")
+SKINS = {
+    "classic": ClassicSkin,
+    "noha": NohaSkin,
+    "bar_riser": BarRiserSkin,
+}
@@ -0,0 +1,105 @@
+import streamlit as st
+
+from .. import instrumentation, settings
+from ..charts import criteria_score_chart, final_score_chart
+from .base import ColumnSkin
+
+CSS = """
+        .chat-container {
+            padding: 15px;
+            border-radius: 10px;
+            max-height: 500px;
+            overflow-y: auto;
+            box-shadow: 2px 2px 10px rgba(0,0,0,0.1);
+        }
+        .message-box {
+            padding: 10px;
+            border-radius: 10px;
+            margin: 5px 0;
+            max-width: 75%;
+            font-size: 18px;
+            font-weight: bold;
+            word-wrap: break-word;
+        }
+        .user-message {
+            background-color: #40dec7;
+            color: black;
+            text-align: left;
+            margin-left: auto;
+        }
+        .assistant-message {
+            background-color: #d59253;
+            color: black;
+            text-align: left;
+            margin-right: auto;
+        }
+        .start-btn-container {
+            text-align: center;
+            margin-bottom: 15px;
+        }
+        .start-btn {
+            background-color: #28a745;
+            color: white;
+            padding: 10px 20px;
+            border-radius: 8px;
+            border: none;
+            cursor: pointer;
+            width: 100%;
+            font-size: 48px;
+        }
+        .start-btn:hover {
+            background-color: #218838;
+        }
+        .score-box {
+            background-color: #e8f4f8;
+            padding: 8px;
+            border-radius: 10px;
+            text-align: center;
+            color: #007BFF;
+            font-size: 24px;
+            font-weight: bold;
+        }
+        /* Fix input field width to match messages box */
+        .chat-input-container {
+            width: 60%;
+            max-width: 600px;  /* Ensures it doesn't stretch too much */
+            margin: auto;
+            padding-top: 10px;
+        }
+        /* Adjust Streamlit's chat input width */
+        [data-testid="stChatInput"] {
+            width: 100% !important;
+        }
+"""
+
+
+class BarRiserSkin(ColumnSkin):
+    name = "main_streamlit_03"
+    page_title = 'Bar Riser'
+    title = '🤖 Bar Riser - AI Interview Assistant'
+    backend_url = settings.REMOTE_BACKEND_URL
+    css = CSS
+
+    def render_scores(self):
+        st.markdown("### 🏆 Final Score Trend")
+        if st.session_state['final_score_history']:
+            with instrumentation.phase("charts"):
+                final_score_chart(st.session_state['final_score_history'])
+        else:
+            st.markdown("<div class='score-box'>Final Score Not Available.</div>", unsafe_allow_html=True)
+
+        st.markdown("<div style='margin-top: 10px;'></div>", unsafe_allow_html=True)
+        st.markdown("### 📊 Criteria Score Trend")
+        if st.session_state['criteria_score_history']:
+            with instrumentation.phase("charts"):
+                criteria_score_chart(st.session_state['criteria_score_history'])
+        else:
+            st.markdown("<div class='score-box'>No criteria score data available.</div>", unsafe_allow_html=True)
+
+        st.markdown("<div style='margin-top: 10px;'></div>", unsafe_allow_html=True)
+        st.markdown("### 📈 Evaluation Results")
+        table = st.session_state['evaluation_results']
+        if table is not None and not table.empty:
+            st.dataframe(table, height=220, use_container_width=True)
+        else:
+            st.markdown("<div class='score-box'>No evaluation results available.</div>", unsafe_allow_html=True)
@@ -0,0 +1,95 @@
+import streamlit as st
+
+from .. import instrumentation, settings
+from ..transcript import inject_styles, render_transcript
+
+
+class Skin:
+    # Presentation for one app. InterviewSession calls the show_* hooks while a
+    # turn streams in; render() lays out the page and drives the session.
+    name = None
+    backend_url = settings.LOCAL_BACKEND_URL
+    rerun_after_turn = True
+    error_message = "⚠️ Error in generating response"
+    exception_message = "❌ Error: {ex}"
+
+    def configure_page(self):
+        pass
+
+    def render(self, session):
+        raise NotImplementedError
+
+    def show_greeting(self, stream):
+        return st.write_stream(stream)
+
+    def show_question(self, stream):
+        return st.write_stream(stream)
+
+    def show_evaluation(self, stream):
+        return st.write_stream(stream.prefixed("**💡 Hint:** "))
+
+    def hint_history_entry(self, response, hint_message):
+        return {'role': 'assistant', 'content': hint_message}
+
+    def show_error(self, message):
+        pass
+
+
+class ColumnSkin(Skin):
+    # Wide layout shared by the NOHA and Bar Riser apps: chat on the left,
+    # scores on the right
+    page_title = None
+    title = None
+    css = ""
+
+    def configure_page(self):
+        st.set_page_config(page_title=self.page_title, page_icon='🤖', layout='wide')
+        st.title(self.title)
+
+    def render(self, session):
+        inject_styles(self.css)
+
+        # Layout: Chat on Left, Scores on Right
+        self.chat, scores = st.columns([3, 1])
+
+        with self.chat:
+            start_button = st.button("🚀 Start Interview", key="start_interview", use_container_width=True)
+            st.markdown("### 💬 Chat History")
+
+            with st.container():
+                with instrumentation.phase("transcript"):
+                    render_transcript()
+                session.wait_for_turn()
+
+            if start_button:
+                session.start_interview()
+
+        # Ensure chat input is always at the bottom and has fixed width
+        st.markdown("<div class='chat-input-container'>", unsafe_allow_html=True)
+        candidate_answer = st.chat_input("✍️ Enter Your Answer", disabled=session.pending)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+        if candidate_answer:
+            with self.chat:
+                st.markdown(f"<div class='message-box user-message'>{candidate_answer}</div>", unsafe_allow_html=True)
+            session.submit_answer(candidate_answer)
+
+        session.apply_finished_turn()
+
+        with scores:
+            self.render_scores()
+
+    def render_scores(self):
+        raise NotImplementedError
+
+    def show_greeting(self, stream):
+        with self.chat:
+            return super().show_greeting(stream)
+
+    def show_question(self, stream):
+        with self.chat:
+            return super().show_question(stream)
+
+    def show_evaluation(self, stream):
+        with self.chat:
+            return super().show_evaluation(stream)
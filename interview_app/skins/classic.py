@@ -0,0 +1,65 @@
+import streamlit as st
+
+from .base import Skin
+
+
+class ClassicSkin(Skin):
+    # The original single-column chat app
+    name = "main_streamlit"
+    rerun_after_turn = False
+    error_message = "Error in generating response"
+    exception_message = "Error in generating response: {ex}"
+
+    def configure_page(self):
+        st.title('NOHA - AI')
+
+    def render(self, session):
+        if st.button("Start Interview"):
+            session.start_interview()
+
+        for message in st.session_state.messages:
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
+
+        candidate_answer = st.chat_input("Enter Your Answer", disabled=session.pending)
+
+        if candidate_answer:
+            with st.chat_message("user"):
+                st.markdown(candidate_answer)
+            session.submit_answer(candidate_answer)
+
+        session.apply_finished_turn()
+        session.wait_for_turn()
+
+    def show_greeting(self, stream):
+        # Render the greeting while it streams; the transcript below takes over afterwards
+        placeholder = st.empty()
+        with placeholder.container():
+            with st.chat_message("assistant"):
+                greeting = st.write_stream(stream)
+        placeholder.empty()
+        return greeting
+
+    def show_question(self, stream):
+        with st.chat_message("assistant"):
+            return st.write_stream(stream)
+
+    def show_evaluation(self, stream):
+        evaluation = stream.meta['evaluation']
+        formatted_response = "**Evaluation Results:**\n\n"
+        for result, (weight, score) in evaluation['evaluation_results'].items():
+            formatted_response += f"{result}: {weight} , {score}\n\n"
+
+        formatted_response += f"**Criteria Scores:**\n\n{evaluation['criteria_score']}\n\n"
+        formatted_response += f"**Final Score:**\n\n{evaluation['final_score']}\n\n"
+        formatted_response += "**Hint:**\n\n"
+
+        with st.chat_message("assistant"):
+            return st.write_stream(stream.prefixed(formatted_response))
+
+    def hint_history_entry(self, response, hint_message):
+        return {f"{response['hint_type']}": f"{response['hint']}"}
+
+    def show_error(self, message):
+        with st.chat_message("assistant"):
+            st.markdown(message)
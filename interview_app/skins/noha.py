@@ -0,0 +1,95 @@
+import streamlit as st
+
+from .base import ColumnSkin
+
+CSS = """
+        .chat-container {
+            padding: 15px;
+            border-radius: 10px;
+            max-height: 500px;
+            overflow-y: auto;
+            box-shadow: 2px 2px 10px rgba(0,0,0,0.1);
+        }
+        .message-box {
+            padding: 10px;
+            border-radius: 10px;
+            margin: 5px 0;
+            max-width: 80%;
+            word-wrap: break-word;
+        }
+        .user-message {
+            background-color: #007BFF;
+            color: white;
+            text-align: right;
+            margin-left: auto;
+        }
+        .assistant-message {
+            background-color: #f0f0f0;
+            color: black;
+            text-align: left;
+            margin-right: auto;
+        }
+        .start-btn-container {
+            text-align: center;
+            margin-bottom: 15px;
+        }
+        .start-btn {
+            background-color: #28a745;
+            color: white;
+            font-size: 18px;
+            padding: 10px 20px;
+            border-radius: 8px;
+            border: none;
+            cursor: pointer;
+            width: 100%;
+        }
+        .start-btn:hover {
+            background-color: #218838;
+        }
+        .score-box {
+            background-color: #e8f4f8;
+            padding: 20px;
+            border-radius: 10px;
+            text-align: center;
+            color: #007BFF;
+            font-size: 24px;
+            font-weight: bold;
+        }
+        /* Fix input field width to match messages box */
+        .chat-input-container {
+            width: 60%;
+            max-width: 600px;  /* Ensures it doesn't stretch too much */
+            margin: auto;
+            padding-top: 10px;
+        }
+        /* Adjust Streamlit's chat input width */
+        [data-testid="stChatInput"] {
+            width: 100% !important;
+        }
+"""
+
+
+class NohaSkin(ColumnSkin):
+    name = "main_streamlit_02"
+    page_title = 'NOHA - AI'
+    title = '🤖 NOHA - AI Interview Assistant'
+    css = CSS
+
+    def render_scores(self):
+        st.markdown("### 🏆 Final Score")
+        st.markdown(f"<div class='score-box'>{st.session_state['final_score']}</div>", unsafe_allow_html=True)
+
+        criteria_scores = "0"
+        response = st.session_state.response
+        if response and "evaluation" in response and "criteria_score" in response["evaluation"]:
+            criteria_scores = ', '.join(map(str, response["evaluation"]["criteria_score"]))
+
+        st.markdown("### 📈 Criteria Scores")
+        st.markdown(f"<div class='score-box'>{criteria_scores}</div>", unsafe_allow_html=True)
+
+        st.markdown("### 📊 Evaluation Results")
+        table = st.session_state['evaluation_results']
+        if table is not None and not table.empty:
+            st.dataframe(table, height=220, use_container_width=True)
+        else:
+            st.markdown("No evaluation results available.")
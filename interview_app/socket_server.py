@@ -0,0 +1,141 @@
+import argparse
+import asyncio
+import json
+import re
+import threading
+
+import tornado.httpserver
+import tornado.netutil
+import tornado.web
+import tornado.websocket
+
+from .client import HISTORY_GAP_STATUS, STREAM_FIELDS
+from .mock_server import MockBackend
+
+# WebSocket stand-in for the interview backend, speaking the protocol of
+# socket_transport.InterviewSocket on /interview. It shares MockBackend with the
+# HTTP mock, so `python -m interview_app.mock_server --socket-port 8765` serves
+# the same interviews over both transports.
+
+
+class InterviewSocketHandler(tornado.websocket.WebSocketHandler):
+    def initialize(self, backend):
+        self.backend = backend
+
+    def check_origin(self, origin):
+        return True
+
+    def get_compression_options(self):
+        return {}
+
+    def open(self):
+        self.backend.count("socket_connections")
+
+    async def _send(self, message):
+        data = json.dumps(message)
+        self.backend.count("bytes_out", len(data))
+        await self.write_message(data)
+        return len(data)
+
+    async def on_message(self, message):
+        # tornado delivers the next message only once this coroutine returns,
+        # so turns on one connection are handled in order
+        backend = self.backend
+        backend.count("requests")
+        backend.count("socket_turns")
+        backend.count("bytes_in", len(message))
+        try:
+            turn = json.loads(message)
+        except ValueError:
+            turn = None
+        turn_id = turn.get("id") if isinstance(turn, dict) else None
+        body = turn.get("body") if isinstance(turn, dict) else None
+        if turn_id is None or not isinstance(body, dict):
+            # Echo the id when there is one; the client fails an id-less error
+            # on whatever turn it is waiting for
+            await self._send({"type": "error", "id": turn_id, "status": 400, "detail": "Invalid turn"})
+            return
+
+        key = turn.get("key")
+        replay = await asyncio.get_running_loop().run_in_executor(None, backend.replies.claim, key)
+        if replay is not None:
+            backend.count("idempotent_replays")
+            (data, seq), latency = replay, 0.0
+        else:
+            state, seq = backend.sync_history(body)
+            if state is None:
+                backend.replies.abandon(key)
+                await self._send({"type": "error", "id": turn_id, "status": HISTORY_GAP_STATUS,
+                                  "detail": "history_gap", "history_seq": seq})
+                return
+
+            data, seq, latency = backend.respond(state, body), len(state.chat_history), backend.latency
+            backend.replies.complete(key, data, seq)
+
+        data = backend.encode_evaluation(body, data)
+        field = next((f for f in STREAM_FIELDS if f in data), None)
+        text = (data.get(field) or "") if field else ""
+        # Without streaming the text still comes as one token event
+        tokens = re.findall(r"\S+\s*", text) if turn.get("stream") else [text] if text else []
+
+        meta = dict(data, stream_field=field)
+        if field:
+            meta[field] = ""
+        await asyncio.sleep(latency * (0.1 if tokens else 1.0))
+        sent = await self._send({"type": "meta", "id": turn_id, "data": meta, "history_seq": seq})
+        for token in tokens:
+            await asyncio.sleep(latency * 0.9 / len(tokens))
+            sent += await self._send({"type": "token", "id": turn_id, "data": token})
+        sent += await self._send({"type": "done", "id": turn_id, "data": {"data": data}})
+        backend.log_request(seq, len(message), sent)
+
+
+class SocketServer:
+    def __init__(self, backend=None, host="127.0.0.1", port=8765, latency=0.0):
+        self.backend = backend or MockBackend(latency=latency)
+        self.host = host
+        self.port = port
+        self._started = threading.Event()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/interview"
+
+    async def _serve(self):
+        app = tornado.web.Application(
+            [(r"/interview", InterviewSocketHandler, {"backend": self.backend})],
+            log_function=lambda handler: None,
+        )
+        sockets = tornado.netutil.bind_sockets(self.port, self.host)
+        # Port 0 picks a free port
+        self.port = sockets[0].getsockname()[1]
+        tornado.httpserver.HTTPServer(app).add_sockets(sockets)
+        self._started.set()
+        await asyncio.Event().wait()
+
+    def serve_forever(self):
+        asyncio.run(self._serve())
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        self._started.wait()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket stand-in for the interview backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated LLM latency per turn, in seconds")
+    args = parser.parse_args()
+
+    server = SocketServer(host=args.host, port=args.port, latency=args.latency)
+    print(f"Mock interview socket listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
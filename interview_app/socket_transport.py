@@ -0,0 +1,195 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+
+import streamlit as st
+from tornado.websocket import WebSocketClosedError, websocket_connect
+
+from . import sessions, settings
+from .client import HISTORY_GAP_STATUS, HISTORY_SEQ_HEADER, InterviewStreamError, TurnStream
+
+# Optional WebSocket transport (NOHA_TRANSPORT=websocket): one long-lived
+# connection per interview instead of one POST per turn. A turn is sent as
+#
+#   {"type": "turn", "id": n, "key": <idempotency key>, "stream": true, "body": <the /begin_interview body>}
+#
+# and the server pushes {"type": "meta" | "token" | "done", "id": n, "data": ...}
+# events for it, or a single {"type": "error", "id": n, "status": 409, ...}. An
+# error without an id (a message the server could not read) ends the turn
+# being waited for.
+# Bodies still go through HistorySync, so after the first turn only the new
+# chat_history entries travel; the server keeps the interview in memory. tornado
+# comes with streamlit, so the transport needs no extra dependency.
+
+
+class SocketLoop:
+    # tornado's websocket client runs on an event loop; one loop thread serves
+    # every InterviewSocket in the process
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True, name="interview-sockets")
+        self._thread.start()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+
+@st.cache_resource
+def get_socket_loop():
+    return SocketLoop()
+
+
+class SocketResponse:
+    # Stands in for requests.Response where TurnStream, HistorySync and the
+    # skins look at one
+    def __init__(self, status_code, headers=None, events=None, metrics=None, detail=None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers or {}
+        self.events = events
+        self.metrics = metrics or {}
+        self.detail = detail
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise InterviewStreamError(f"{self.status_code}: {self.detail}")
+
+    def close(self):
+        # Unread events of this turn are skipped by the next one
+        pass
+
+
+class InterviewSocket:
+    # Same stream_interview() interface as BackendPool. Turns on one socket must
+    # not overlap, which holds for a session: the next turn is only sent once
+    # the previous one has been applied.
+    def __init__(
+        self,
+        url=settings.SOCKET_URL,
+        idle_timeout=settings.SOCKET_IDLE_TIMEOUT,
+        connect_timeout=settings.CONNECT_TIMEOUT,
+        read_timeout=settings.READ_TIMEOUT,
+        loop=None,
+    ):
+        self.url = url
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._loop = loop or get_socket_loop()
+        self._conn = None
+        self._idle_timer = None
+        self._ids = itertools.count(1)
+        self.connects = 0
+
+    # Coroutines below run on the socket loop
+
+    async def _connect(self):
+        self._conn = await websocket_connect(
+            self.url,
+            connect_timeout=self.connect_timeout,
+            compression_options={},
+            ping_interval=settings.SOCKET_PING_INTERVAL or None,
+        )
+        self.connects += 1
+
+    async def _send(self, message):
+        if self._conn is None or self._conn.close_code is not None:
+            await self._connect()
+        try:
+            await self._conn.write_message(message)
+        except WebSocketClosedError:
+            # The server dropped an idle connection since the last turn
+            await self._connect()
+            await self._conn.write_message(message)
+        self._touch()
+
+    async def _receive(self):
+        try:
+            message = await asyncio.wait_for(self._conn.read_message(), self.read_timeout)
+        except asyncio.TimeoutError:
+            self._close()
+            raise InterviewStreamError("Timed out waiting for the interview backend")
+        if message is None:
+            self._conn = None
+            raise InterviewStreamError("The interview connection was closed")
+        self._touch()
+        return message
+
+    def _touch(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+        self._idle_timer = self._loop.loop.call_later(self.idle_timeout, self._close)
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def _close_async(self):
+        self._close()
+
+    # Called from the script thread or a submission worker
+
+    def _next(self, turn_id, metrics=None):
+        while True:
+            raw = self._loop.run(self._receive())
+            message = json.loads(raw)
+            if metrics is not None:
+                metrics["response_bytes"] += len(raw)
+            if message.get("id") == turn_id or (message.get("type") == "error" and message.get("id") is None):
+                return message
+
+    def send_turn(self, prepared, stream=True, key=None):
+        turn_id = next(self._ids)
+        message = json.dumps({"type": "turn", "id": turn_id, "key": key, "stream": stream, "body": prepared})
+        started = time.perf_counter()
+        self._loop.run(self._send(message))
+        first = self._next(turn_id)
+        metrics = {
+            "transport": "websocket",
+            "socket_connects": self.connects,
+            "request_bytes": len(message),
+            "network_ms": (time.perf_counter() - started) * 1000,
+        }
+        headers = {HISTORY_SEQ_HEADER: str(first.get("history_seq", 0))}
+        if first["type"] == "error":
+            return SocketResponse(first.get("status", 500), headers, metrics=metrics, detail=first.get("detail"))
+
+        def events(turn_metrics):
+            yield "meta", first["data"]
+            while True:
+                event = self._next(turn_id, turn_metrics)
+                yield event["type"], event.get("data")
+                if event["type"] in ("done", "error"):
+                    return
+
+        return SocketResponse(200, headers, events=events, metrics=metrics)
+
+    def stream_interview(self, client, body, sync=None, stream=settings.STREAMING, key=None):
+        # `client` is the HTTP client BackendPool would use; not needed here
+        prepared = sync.prepare(body) if sync is not None else body
+        res = self.send_turn(prepared, stream, key)
+        if prepared is not body and res.status_code == HISTORY_GAP_STATUS:
+            # The server no longer has this interview (restart); send it in full
+            res = self.send_turn(body, stream, key)
+        if sync is not None:
+            if res.ok:
+                sync.acknowledge(res, body)
+            else:
+                sync.reset()
+        return TurnStream(res)
+
+    def close(self):
+        self._loop.run(self._close_async())
+
+
+def session_socket():
+    # One connection per browser session, i.e. per interview
+    socket = st.session_state.get("interview_socket")
+    if socket is None:
+        socket = st.session_state["interview_socket"] = InterviewSocket()
+        # Not left to the idle timeout once the session is evicted or cleared
+        sessions.close_with_session(socket)
+    return socket
@@ -0,0 +1,158 @@
+import uuid
+
+import streamlit as st
+
+from . import instrumentation, score_store
+from .client import EvaluationSync, HistorySync
+from .history import HistoryWindow
+from .journal import JournalEntry, get_journal
+from .scores import ScoreHistory
+from .session_store import persist_turn, restore_session
+from .sessions import resolve_candidate
+
+# Session state shared by every skin. Callables are factories for mutable defaults.
+DEFAULTS = {
+    "final_score": 0,
+    "final_score_history": lambda: ScoreHistory(scalar=True),
+    "criteria_score_history": ScoreHistory,
+    "messages": list,
+    "chat_history": list,
+    # Entries ever added to chat_history; the list itself shrinks when folded
+    "turn": 0,
+    "question": None,
+    "response": None,
+    "evaluation_results": None,
+    "history_sync": HistorySync,
+    "evaluation_sync": EvaluationSync,
+    "pending_turn": None,
+    # Key of an answer waiting in the answer journal for a backend
+    "queued_turn": None,
+    "speculative_turn": None,
+    # A journaled opening call: the field it fetches and its transcript message
+    "queued_opening": None,
+    "candidate": None,
+    "interview_socket": None,
+    # Idempotency: this session's id, and the key of the last answer submitted
+    "client_id": lambda: uuid.uuid4().hex,
+    "turn_key": None,
+}
+
+# What the durable session store records per turn
+LIST_KEYS = ["messages", "chat_history", "final_score_history", "criteria_score_history"]
+VALUE_KEYS = [
+    "interview_id", "question", "final_score", "response", "candidate", "queued_turn", "queued_opening", "turn",
+]
+
+
+def evaluation_table(evaluation_results):
+    # pandas is only imported the first time a results table is needed
+    import pandas as pd
+
+    return pd.DataFrame([
+        {"Subcriteria": k, "Weight": v[0], "Score": v[1]}
+        for k, v in evaluation_results.items()
+    ])
+
+
+def patch_evaluation_table(table, evaluation_results, changed):
+    # Rewrites the rows of the subcriteria a diff-encoded evaluation touched;
+    # None when the rows themselves changed and the table has to be rebuilt
+    if table is None or changed is None or len(table) != len(evaluation_results):
+        return None
+    rows = {name: i for i, name in enumerate(table["Subcriteria"])}
+    if rows.keys() != evaluation_results.keys():
+        return None
+    for name in changed:
+        weight, score = evaluation_results[name]
+        table.loc[rows[name], ["Weight", "Score"]] = [weight, score]
+    return table
+
+
+def init_state():
+    for key, default in DEFAULTS.items():
+        if key not in st.session_state:
+            st.session_state[key] = default() if callable(default) else default
+
+    # Durable session: rebuild from ?session= after a refresh or server restart
+    if restore_session(LIST_KEYS, VALUE_KEYS):
+        # The store hands back plain lists
+        st.session_state["final_score_history"] = ScoreHistory(st.session_state["final_score_history"], scalar=True)
+        st.session_state["criteria_score_history"] = ScoreHistory(st.session_state["criteria_score_history"])
+        evaluation = (st.session_state.response or {}).get("evaluation", {})
+        if "evaluation_results" in evaluation:
+            st.session_state["evaluation_results"] = evaluation_table(evaluation["evaluation_results"])
+            # The next evaluation can be diffed against the restored one
+            st.session_state.evaluation_sync.apply(st.session_state.response)
+
+    # Which user/question ids this browser session interviews for
+    if st.session_state.candidate is None:
+        st.session_state.candidate = resolve_candidate()
+
+
+def collect_finished_turn():
+    # A submission that finished on the worker pool; the caller applies it once
+    # the layout exists. It stays in pending_turn until persist() releases it,
+    # so a rerun cut short before then collects it again.
+    pending = st.session_state.pending_turn
+    if pending is not None and pending.done():
+        return pending
+    return None
+
+
+def collect_journaled_turn():
+    # An answer the journal flusher has sent since the last rerun; released by
+    # persist() like a finished submission
+    key = st.session_state.queued_turn
+    if key is None:
+        return None
+    return get_journal().collect(key)
+
+
+def add_history_entry(entry):
+    st.session_state.chat_history.append(entry)
+    st.session_state.turn += 1
+
+
+def record_evaluation(evaluation):
+    score_store.record(evaluation, st.session_state.get("interview_id"), st.session_state.candidate)
+    st.session_state["final_score"] = evaluation["final_score"]
+    st.session_state["final_score_history"].append(evaluation["final_score"])
+
+    if "criteria_score" in evaluation:
+        st.session_state["criteria_score_history"].append(evaluation["criteria_score"])
+
+    if "evaluation_results" in evaluation:
+        with instrumentation.phase("dataframe"):
+            results = evaluation["evaluation_results"]
+            table = patch_evaluation_table(
+                st.session_state["evaluation_results"], results, st.session_state.evaluation_sync.changed,
+            )
+            st.session_state["evaluation_results"] = table if table is not None else evaluation_table(results)
+    else:
+        st.session_state["evaluation_results"] = None
+
+
+def fold_history():
+    # Never while a call is in flight: its HistorySync acknowledgement refers to
+    # the list as it was sent
+    if st.session_state.pending_turn is not None or st.session_state.speculative_turn is not None:
+        return
+    if HistoryWindow().fold(st.session_state.chat_history):
+        # Entries moved: the backend needs the new window in full, and the
+        # session store a fresh copy of the list
+        st.session_state.history_sync.reset()
+        st.session_state.get("_persisted_lengths", {}).pop("chat_history", None)
+
+
+def persist(finished=None):
+    # `finished` is the collected turn whose result is being saved: its handle
+    # goes with the same write, and its journal row only after it
+    journaled = isinstance(finished, JournalEntry) and st.session_state.queued_turn == finished.key
+    if finished is not None and finished is st.session_state.pending_turn:
+        st.session_state.pending_turn = None
+    if journaled:
+        st.session_state.queued_turn = None
+    fold_history()
+    persist_turn(LIST_KEYS, VALUE_KEYS)
+    if journaled:
+        get_journal().discard(finished.key)
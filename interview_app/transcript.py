@@ -0,0 +1,83 @@
+import functools
+import re
+import uuid
+
+import streamlit as st
+
+from .opening import TTLCache
+
+# Messages are rendered in pages; a full page never changes again, so its
+# markdown element is byte-for-byte identical across reruns
+PAGE_SIZE = 25
+PAGE_CACHE_SIZE = 2048
+PAGE_CACHE_TTL = 3600.0
+
+
+@functools.lru_cache(maxsize=8)
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{}:;,])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def inject_styles(css):
+    st.markdown(f"<style>{minify_css(css)}</style>", unsafe_allow_html=True)
+
+
+def render_message(message):
+    role_class = "user-message" if message["role"] == "user" else "assistant-message"
+    return f"<div class='message-box {role_class}'>{message['content']}</div>"
+
+
+# Rendered pages, shared by every session of the process and keyed by the ids
+# of a page's first and last message. Ids are never reused and a corrected
+# message gets a new one, so a key always names the same HTML.
+_pages = TTLCache(maxsize=PAGE_CACHE_SIZE, ttl=PAGE_CACHE_TTL)
+
+
+class TranscriptCache:
+    # Per-session bookkeeping for the transcript: the message count and last id
+    # seen, and the page keys. Messages are append-only; only the last one may
+    # change in place, and then under a new id. A shorter transcript or a
+    # different last id (cleared, rehydrated or corrected) recomputes the keys.
+    # A rerun still looks up one key per page and sends one markdown element
+    # per page; the HTML is only built for pages the shared cache misses.
+    def __init__(self):
+        self.count = 0
+        self.last_id = None
+        self.keys = []
+
+    def sync(self, messages):
+        known = self.count
+        if len(messages) < known or (known and messages[known - 1].get("id") != self.last_id):
+            known = 0
+        for message in messages[known:]:
+            if "id" not in message:
+                message["id"] = uuid.uuid4().hex
+        # Pages from the one holding the first new message on are keyed again
+        del self.keys[known // PAGE_SIZE:]
+        for start in range(len(self.keys) * PAGE_SIZE, len(messages), PAGE_SIZE):
+            page = messages[start:start + PAGE_SIZE]
+            self.keys.append((page[0]["id"], page[-1]["id"]))
+        self.count = len(messages)
+        self.last_id = messages[-1]["id"] if messages else None
+
+        pages = []
+        for n, key in enumerate(self.keys):
+            html = _pages.get(key)
+            if html is None:
+                html = "".join(render_message(m) for m in messages[n * PAGE_SIZE:(n + 1) * PAGE_SIZE])
+                _pages.put(key, html)
+            pages.append(html)
+        return pages
+
+
+@st.fragment
+def render_transcript():
+    # Runs as a fragment so reruns scoped to other fragments leave the transcript untouched
+    if "transcript_cache" not in st.session_state:
+        st.session_state.transcript_cache = TranscriptCache()
+
+    for page in st.session_state.transcript_cache.sync(st.session_state.messages):
+        st.markdown(page, unsafe_allow_html=True)
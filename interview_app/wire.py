@@ -0,0 +1,94 @@
+import gzip
+import json
+
+try:
+    import msgpack
+except ImportError:  # optional: bodies stay JSON without it
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip is always available
+    zstandard = None
+
+# Body encodings and transport compression shared by the client and the mock
+# backend. Both sides list what they support in preference order and pick the
+# first entry the peer also offers; plain JSON without compression always works.
+
+JSON_TYPE = "application/json"
+MSGPACK_TYPE = "application/msgpack"
+IDENTITY = "identity"
+UNSUPPORTED_MEDIA_STATUS = 415
+
+# gzip level 6 is the usual size/CPU balance; zstd level 3 is its default
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+DECOMPRESS_ERRORS = (OSError, EOFError) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+
+def body_types():
+    return [MSGPACK_TYPE, JSON_TYPE] if msgpack is not None else [JSON_TYPE]
+
+
+def content_encodings():
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+def parse_header(value):
+    # "zstd, gzip;q=0.5" -> ["zstd", "gzip"]; entries with q=0 are refused
+    items = []
+    for part in (value or "").split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if token and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            items.append(token)
+    return items
+
+
+def media_type(content_type):
+    return (content_type or JSON_TYPE).split(";")[0].strip().lower()
+
+
+def choose(offered, supported):
+    # First entry of `supported` (our preference) that the peer offered
+    offered = parse_header(offered) if isinstance(offered, str) else offered
+    return next((item for item in supported if item in offered), None)
+
+
+def encode(payload, content_type=JSON_TYPE):
+    if media_type(content_type) == MSGPACK_TYPE:
+        return msgpack.packb(payload, use_bin_type=True)
+    return json.dumps(payload).encode()
+
+
+def decode(data, content_type=JSON_TYPE):
+    content_type = media_type(content_type)
+    if content_type == MSGPACK_TYPE:
+        if msgpack is None:
+            raise ValueError("msgpack body received but msgpack is not installed")
+        return msgpack.unpackb(data, raw=False)
+    return json.loads(data)
+
+
+def compress(data, encoding):
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def decompress(data, encoding):
+    # Raises ValueError for unknown encodings and corrupt bodies alike
+    encoding = (encoding or IDENTITY).strip().lower()
+    try:
+        if encoding == "gzip":
+            return gzip.decompress(data)
+        if encoding == "zstd" and zstandard is not None:
+            return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    except DECOMPRESS_ERRORS as ex:
+        raise ValueError(f"Corrupt {encoding} body: {ex}") from ex
+    if encoding == IDENTITY:
+        return data
+    raise ValueError(f"Unsupported Content-Encoding: {encoding}")
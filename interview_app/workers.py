@@ -0,0 +1,198 @@
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import streamlit as st
+
+from . import settings
+from .journal import get_journal
+from .opening import TTLCache
+
+
+class SubmissionPool:
+    # Bounded thread pool shared by every session in the process
+    def __init__(self, max_workers=settings.WORKER_THREADS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="interview-submit")
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def _done(self, future):
+        with self._lock:
+            self.in_flight -= 1
+
+    def submit(self, fn, *args, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+        future = self.executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._done)
+        return future
+
+
+@st.cache_resource
+def get_pool():
+    return SubmissionPool()
+
+
+class PendingTurn:
+    # Session-side handle for a submission running on the pool. `stream` is set
+    # by the worker as soon as the response starts so partial text can be shown.
+    # `key` and `body` let a failed submission be journaled.
+    def __init__(self, key=None, body=None):
+        self.key = key
+        self.body = body
+        self.stream = None
+        self.future = None
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        return self.future.result()
+
+    def partial_text(self):
+        return "".join(self.stream.received) if self.stream is not None else ""
+
+
+def _run_turn(pending, client, backend, body, sync, key):
+    # Runs on a worker thread: no Streamlit calls or session_state access here
+    stream = backend.stream_interview(client, body, sync=sync, key=key)
+    pending.stream = stream
+    if stream:
+        for _ in stream:
+            pass
+    return stream
+
+
+def _complete(stream):
+    # A stream a later duplicate can be answered with: successful and read to the end
+    return stream is not None and stream.ok and stream.data is not None
+
+
+class TurnRegistry:
+    # Turns by idempotency key, process-wide. A duplicate of a turn that is
+    # still running shares its PendingTurn; a duplicate of a finished one is
+    # answered from a short-lived cache. Either way no second backend call
+    # (and LLM evaluation) is made.
+    def __init__(self, cache_size=settings.TURN_CACHE_SIZE, ttl=settings.TURN_CACHE_TTL):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._finished = TTLCache(cache_size, ttl)
+        self.coalesced = 0
+        self.replayed = 0
+
+    def _cached(self, key):
+        stream = self._finished.get(key)
+        if _complete(stream):
+            self.replayed += 1
+            return stream
+        return None
+
+    def _finish(self, key, pending):
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if not pending.future.cancelled() and pending.future.exception() is None and _complete(pending.future.result()):
+            self._finished.put(key, pending.future.result())
+
+    def submit(self, key, client, backend, body, sync=None):
+        with self._lock:
+            pending = self._in_flight.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                return pending
+            stream = self._cached(key)
+            pending = PendingTurn(key, body)
+            if stream is not None:
+                pending.stream = stream
+                pending.future = Future()
+                pending.future.set_result(stream)
+                return pending
+            self._in_flight[key] = pending
+        pending.future = get_pool().submit(_run_turn, pending, client, backend, body, sync, key)
+        pending.future.add_done_callback(lambda _: self._finish(key, pending))
+        return pending
+
+    def run(self, key, fetch, timeout=settings.READ_TIMEOUT):
+        # Blocking variant for the script thread, registered in flight like
+        # submit(). The caller gets the stream unread and renders it as it
+        # arrives; a duplicate waits until that reader is done and shares the
+        # stream. If the reader was cut short by a rerun, the duplicate fetches
+        # again under the same key, and the backend answers without re-scoring.
+        with self._lock:
+            pending = self._in_flight.get(key)
+            if pending is None:
+                stream = self._cached(key)
+                if stream is not None:
+                    return stream
+                pending = self._in_flight[key] = PendingTurn(key)
+                pending.future = Future()
+            else:
+                self.coalesced += 1
+                stream, pending = pending, None
+        if pending is None:
+            try:
+                stream = stream.future.result(timeout)
+            except Exception:
+                stream = None
+            return stream if _complete(stream) else fetch()
+
+        try:
+            stream = fetch()
+        except BaseException:
+            self._release(key, pending, None)
+            raise
+        if stream:
+            stream.when_finished(lambda finished: self._release(key, pending, finished))
+            # A stream dropped without being read releases its key as well
+            weakref.finalize(stream, self._release, key, pending, None)
+        else:
+            self._release(key, pending, stream)
+        return stream
+
+    def _release(self, key, pending, stream):
+        with self._lock:
+            if pending.future.done():
+                return
+            if self._in_flight.get(key) is pending:
+                del self._in_flight[key]
+            if _complete(stream):
+                self._finished.put(key, stream)
+            pending.future.set_result(stream)
+
+    def forget(self, key):
+        # A finished turn that must not answer its duplicates
+        self._finished.discard(key)
+
+    def snapshot(self):
+        with self._lock:
+            return {"turns_in_flight": len(self._in_flight), "turns_coalesced": self.coalesced,
+                    "turns_replayed": self.replayed}
+
+
+@st.cache_resource
+def get_registry():
+    return TurnRegistry()
+
+
+def submit_turn(client, backend, body, sync=None, key=None):
+    if key is not None:
+        return get_registry().submit(key, client, backend, body, sync)
+    pending = PendingTurn(body=body)
+    pending.future = get_pool().submit(_run_turn, pending, client, backend, body, sync, None)
+    return pending
+
+
+@st.fragment(run_every=settings.POLL_INTERVAL)
+def wait_for_turn():
+    if st.session_state.get("queued_turn") is not None:
+        # Checked by the next full rerun, which applies the journaled result
+        if get_journal().finished(st.session_state.queued_turn):
+            st.rerun()
+        st.markdown("⏳ The evaluator is not reachable right now. Your answer is saved and will be "
+                    "scored as soon as it is back.")
+        return
+    pending = st.session_state.get("pending_turn")
+    if pending is None:
+        return
+    if pending.done():
+        st.rerun()
+    st.markdown(pending.partial_text() or "⏳ Evaluating…")
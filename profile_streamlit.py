@@ -0,0 +1,3 @@
+from interview_app.profiling import run
+
+run()
@@ -0,0 +1,152 @@
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Settings are read at import: keep the stores the apps write out of the repo
+STATE_DIR = tempfile.mkdtemp(prefix="noha-tests-")
+os.environ.setdefault("NOHA_SESSION_DB", os.path.join(STATE_DIR, "sessions.db"))
+os.environ.setdefault("NOHA_JOURNAL_DB", os.path.join(STATE_DIR, "journal.db"))
+os.environ.setdefault("NOHA_SCORE_STORE_DIR", os.path.join(STATE_DIR, "scores"))
+
+from interview_app import settings  # noqa: E402
+from interview_app.client import InterviewClient  # noqa: E402
+from interview_app.mock_server import MockServer  # noqa: E402
+from interview_app.workers import get_registry  # noqa: E402
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.ports.add(self.client_address[1])
+            status = server.statuses.pop(0) if server.statuses else 200
+        data = b'{"data": {"greeting": "Hello"}}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class ScriptedServer(ThreadingHTTPServer):
+    # Answers POSTs with the queued statuses, then 200
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ScriptedHandler)
+        self.lock = threading.Lock()
+        self.statuses = []
+        self.requests = 0
+        self.ports = set()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/begin_interview"
+
+
+@pytest.fixture
+def scripted():
+    server = ScriptedServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def start_server(**kwargs):
+    return MockServer(port=0, **kwargs).start()
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def server():
+    server = start_server()
+    yield server
+    stop_server(server)
+
+
+@pytest.fixture
+def client():
+    client = InterviewClient(max_retries=0)
+    yield client
+    client.close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_turns():
+    # Every test starts its own mock, which numbers interviews from 1 again
+    get_registry.clear()
+
+
+def build_body(chat_history, interview_id=None, candidate_answer=None, question=None):
+    # A /begin_interview request body like the apps send
+    return {
+        "user_id": 1,
+        "question_type_id": 1,
+        "question_id": 1,
+        "question": question,
+        "chat_history": chat_history,
+        "interview_id": interview_id,
+        "candidate_answer": candidate_answer,
+    }
+
+
+def turn(client, url, body, sync=None):
+    # One turn; returns the response data
+    res = client.begin_interview(url, body, sync=sync)
+    res.raise_for_status()
+    return res.json()["data"]
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    # A mock backend the apps talk to
+    server = start_server()
+    monkeypatch.setattr(settings, "BACKEND_URL", server.url)
+    yield server
+    stop_server(server)
+
+
+def run_app(app="main_streamlit.py", **query):
+    at = AppTest.from_file(os.path.join(ROOT, app), default_timeout=30)
+    at.query_params.update(query)
+    at.run()
+    return at
+
+
+def answer(at, text):
+    # Submit an answer and rerun until its turn has been applied
+    at.chat_input[0].set_value(text).run()
+    while at.session_state["pending_turn"] is not None:
+        at.run()
+    assert not at.exception
+    return at
+
+
+def interview(app="main_streamlit.py", answers=("Hello",)):
+    # Start an interview and answer it; the first answer replies to the greeting
+    at = run_app(app)
+    at.button[0].click().run()
+    for text in answers:
+        answer(at, text)
+    return at
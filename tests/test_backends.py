@@ -0,0 +1,189 @@
+import socket
+import time
+
+import pytest
+from conftest import start_server, stop_server
+
+from interview_app.backends import BackendPool, BackendUnavailable, CircuitBreaker
+from interview_app.core import build_body
+from interview_app.mock_server import MockRequestHandler
+
+
+@pytest.fixture
+def slow_server():
+    server = start_server(latency=1.0)
+    yield server
+    stop_server(server)
+
+
+def dead_url():
+    # A port nothing listens on
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/begin_interview"
+
+
+def pool(*urls, **kwargs):
+    return BackendPool(urls, **dict({"health_interval": 0, "hedge": False}, **kwargs))
+
+
+def test_breaker_opens_at_the_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_breaker_success_resets_the_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_breaker_decides_on_the_next_call():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_probe_success_half_opens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    breaker.probe_succeeded()
+    assert breaker.state == "half_open"
+
+
+def test_breaker_remembers_the_last_success():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    assert not breaker.succeeded_within(60)
+
+    breaker.record_success()
+
+    assert breaker.succeeded_within(60)
+    assert not breaker.succeeded_within(0)
+
+
+def test_failed_probes_count_as_failures(server, monkeypatch):
+    monkeypatch.setattr(MockRequestHandler, "do_GET", lambda self: self._send_payload(503, {"detail": "down"}))
+    backends = pool(server.url)
+    breaker = backends.backends[0].breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    backends.check_health(timeout=1)
+    assert (breaker.failures, breaker.state) == (1, "closed")
+    backends.check_health(timeout=1)
+    assert breaker.state == "open"
+
+
+def test_probe_timeout_is_ignored_while_calls_succeed(server, monkeypatch):
+    def busy(self):
+        time.sleep(0.5)
+        self._send_payload(200, {"status": "ok"})
+
+    monkeypatch.setattr(MockRequestHandler, "do_GET", busy)
+    backends = pool(server.url, health_interval=10)
+    breaker = backends.backends[0].breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+    breaker.record_success()
+    backends.check_health(timeout=0.1)
+    assert breaker.state == "closed"
+
+    breaker.succeeded_at = None
+    backends.check_health(timeout=0.1)
+    assert breaker.state == "open"
+
+
+def test_dead_backend_fails_over(server, client):
+    backends = pool(dead_url(), server.url)
+
+    turn = backends.stream_interview(client, build_body([], None), stream=False)
+
+    assert turn.data["greeting"]
+    assert turn.metrics["backend"] == server.url
+    assert backends.snapshot()["failovers"] == 1
+    assert backends.backends[0].breaker.failures == 1
+
+
+def test_open_breakers_are_skipped(server, client):
+    backends = pool(dead_url(), server.url)
+    backends.backends[0].breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    backends.backends[0].breaker.record_failure()
+
+    turn = backends.stream_interview(client, build_body([], None), stream=False)
+
+    assert turn.metrics["backend"] == server.url
+    assert backends.snapshot()["failovers"] == 0
+
+
+def test_no_available_backend_raises(server, client):
+    backends = pool(server.url)
+    backends.backends[0].breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    backends.backends[0].breaker.record_failure()
+
+    with pytest.raises(BackendUnavailable):
+        backends.stream_interview(client, build_body([], None), stream=False)
+
+
+def test_slow_primary_is_hedged(slow_server, server, client):
+    backends = pool(slow_server.url, server.url, hedge=True, hedge_initial_delay=0.1, hedge_min_samples=100)
+
+    started = time.perf_counter()
+    turn = backends.stream_interview(client, build_body([], None), stream=False)
+
+    assert time.perf_counter() - started < 0.9
+    assert turn.metrics["backend"] == server.url
+    assert turn.metrics["hedged"]
+    assert backends.snapshot()["hedged"] == 1
+    assert backends.snapshot()["hedge_wins"] == 1
+
+    # The losing request gives its thread and connection back once it returns
+    deadline = time.monotonic() + 5
+    while backends.attempts_in_flight or backends.hedges_in_flight:
+        assert time.monotonic() < deadline, "the losing request was never released"
+        time.sleep(0.05)
+
+
+def test_hedges_are_capped(slow_server, server, client):
+    backends = pool(slow_server.url, server.url, hedge=True, hedge_initial_delay=0.1, hedge_min_samples=100,
+                    hedge_max_in_flight=0)
+
+    turn = backends.stream_interview(client, build_body([], None), stream=False)
+
+    assert turn.metrics["backend"] == slow_server.url
+    assert not turn.metrics["hedged"]
+    assert backends.snapshot()["hedges_skipped"] == 1
+    assert server.backend.snapshot()["requests"] == 0
+
+
+def test_saturated_pool_does_not_hedge(slow_server, server, client):
+    backends = pool(slow_server.url, server.url, hedge=True, hedge_initial_delay=0.1, hedge_min_samples=100,
+                    max_workers=1)
+
+    turn = backends.stream_interview(client, build_body([], None), stream=False)
+
+    assert not turn.metrics["hedged"]
+    assert backends.snapshot()["hedges_skipped"] == 1
+
+
+def test_fast_primary_is_not_hedged(server, slow_server, client):
+    backends = pool(server.url, slow_server.url, hedge=True, hedge_initial_delay=0.5, hedge_min_samples=100)
+
+    turn = backends.stream_interview(client, build_body([], None), stream=False)
+
+    assert turn.metrics["backend"] == server.url
+    assert not turn.metrics["hedged"]
+    assert slow_server.backend.snapshot()["requests"] == 0
+
+
+def test_hedging_needs_a_second_backend(slow_server):
+    assert not pool(slow_server.url, hedge=True).hedge
@@ -0,0 +1,40 @@
+from interview_app import charts
+from interview_app.charts import PngCache, criteria_columns
+from interview_app.scores import ScoreHistory
+
+
+def test_png_cache_evicts_least_recently_used():
+    cache = PngCache(2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    cache.get("a")
+    cache.put("c", b"3")
+
+    assert cache.get("a") == b"1"
+    assert cache.get("b") is None
+    assert cache.get("c") == b"3"
+
+
+def test_criteria_columns_follow_the_longest_row():
+    assert criteria_columns(ScoreHistory([[1, 2], [1, 2, 3]])) == ["Criteria 1", "Criteria 2", "Criteria 3"]
+
+
+def test_png_is_rendered_once_per_history(monkeypatch):
+    rendered, shown = [], []
+    monkeypatch.setattr(charts, "_png_cache", PngCache(8))
+    monkeypatch.setattr(charts, "_render_png", lambda draw, history, points: rendered.append(history[:]) or b"png")
+    monkeypatch.setattr(charts.st, "image", lambda png, **kwargs: shown.append(png))
+    history = ScoreHistory([5.0, 6.0], scalar=True)
+
+    charts.final_score_chart(history, backend="matplotlib")
+    charts.final_score_chart(history, backend="matplotlib")
+    history.append(7.0)
+    charts.final_score_chart(history, backend="matplotlib")
+
+    assert rendered == [[5.0, 6.0], [5.0, 6.0, 7.0]]
+    assert shown == [b"png"] * 3
+
+
+def test_rendered_png():
+    png = charts._render_png(charts._draw_criteria, ScoreHistory([[1, 2], [3]]), 100)
+    assert png.startswith(b"\x89PNG")
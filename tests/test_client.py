@@ -0,0 +1,80 @@
+import socket
+
+import pytest
+import requests
+
+from interview_app.client import InterviewClient, LatencyStats
+
+
+def client(**kwargs):
+    return InterviewClient(**dict({"backoff_base": 0.001, "backoff_max": 0.001}, **kwargs))
+
+
+def test_connections_are_kept_alive(scripted):
+    session = client()
+    for _ in range(5):
+        session.begin_interview(scripted.url, {}).raise_for_status()
+
+    assert scripted.requests == 5
+    assert len(scripted.ports) == 1
+
+
+def test_retries_transient_statuses(scripted):
+    scripted.statuses = [503, 502]
+    session = client(max_retries=2)
+
+    res = session.begin_interview(scripted.url, {})
+
+    assert res.status_code == 200
+    assert scripted.requests == 3
+    stats = session.stats.snapshot()
+    assert (stats["calls"], stats["errors"], stats["retries"]) == (3, 2, 2)
+
+
+def test_gives_up_after_max_retries(scripted):
+    scripted.statuses = [503, 503, 503]
+    session = client(max_retries=1)
+
+    assert session.begin_interview(scripted.url, {}).status_code == 503
+    assert scripted.requests == 2
+
+
+def test_client_errors_are_not_retried(scripted):
+    scripted.statuses = [400]
+    session = client()
+
+    assert session.begin_interview(scripted.url, {}).status_code == 400
+    assert scripted.requests == 1
+
+
+def test_connection_errors_are_retried_then_raised():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    session = client(max_retries=2)
+
+    with pytest.raises(requests.ConnectionError):
+        session.begin_interview(f"http://127.0.0.1:{port}/begin_interview", {})
+    assert session.stats.snapshot()["retries"] == 2
+
+
+def test_read_timeouts_are_not_retried():
+    # Accepts the connection but never answers
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        sock.listen()
+        session = client(read_timeout=0.2)
+        with pytest.raises(requests.ReadTimeout):
+            session.begin_interview(f"http://127.0.0.1:{sock.getsockname()[1]}/begin_interview", {})
+    stats = session.stats.snapshot()
+    assert (stats["calls"], stats["retries"]) == (1, 0)
+
+
+def test_latency_percentiles():
+    stats = LatencyStats(window=100)
+    for ms in range(1, 101):
+        stats.record(ms / 1000)
+
+    assert stats.percentile(50) == pytest.approx(0.050, abs=0.001)
+    assert stats.percentile(95) == pytest.approx(0.095, abs=0.001)
+    assert stats.snapshot()["max_ms"] == pytest.approx(100)
@@ -0,0 +1,155 @@
+import pytest
+from conftest import answer, interview, turn
+
+from interview_app.client import EvaluationGap, EvaluationSync, results_digest
+from interview_app.core import build_body
+from interview_app.state import evaluation_table, patch_evaluation_table
+
+
+def answers(client, url, evaluations, texts):
+    # Opens an interview and answers it; yields each expanded evaluation
+    data = turn(client, url, build_body([], None))
+    interview_id = data["interview_id"]
+    history = [{"greeting": data["greeting"]}]
+    history.append({"question": turn(client, url, build_body(history, interview_id))["question"]})
+    for text in texts:
+        history[-1]["answer"] = text
+        body = evaluations.prepare(build_body(history, interview_id, text, history[1]["question"]))
+        data = turn(client, url, body)
+        evaluations.apply(data)
+        history.append({"hint": data["hint"]})
+        yield interview_id, data["evaluation"]
+
+
+def test_diffs_expand_to_the_backend_results(server, client):
+    evaluations = EvaluationSync(mode="diff")
+    for interview_id, evaluation in answers(client, server.url, evaluations, ["one", "two", "three", "four"]):
+        results = server.backend.interviews[interview_id].results
+        assert evaluation["evaluation_results"] == results
+        assert evaluations.digest == results_digest(results)
+
+    stats = server.backend.snapshot()
+    assert stats["full_evaluations"] == 1
+    assert stats["diff_evaluations"] == 3
+    assert evaluations.changed is not None
+
+
+def test_full_mode_never_diffs(server, client):
+    evaluations = EvaluationSync(mode="full")
+    for _ in answers(client, server.url, evaluations, ["one", "two"]):
+        assert evaluations.changed is None
+
+    assert server.backend.snapshot()["diff_evaluations"] == 0
+
+
+def test_unknown_base_gets_a_full_evaluation(server, client):
+    evaluations = EvaluationSync(mode="diff")
+    turns = answers(client, server.url, evaluations, ["one", "two"])
+    interview_id, _ = next(turns)
+    # The backend forgot the results this session holds
+    server.backend.interviews[interview_id].evaluations.clear()
+    _, evaluation = next(turns)
+
+    assert evaluation["evaluation_results"] == server.backend.interviews[interview_id].results
+    assert server.backend.snapshot()["full_evaluations"] == 2
+
+
+def base(results):
+    sync = EvaluationSync(mode="diff")
+    sync.apply({"evaluation": {"evaluation_results": results}})
+    return sync
+
+
+def diff(sync, **changes):
+    return {"evaluation": {"evaluation_results_diff": dict(
+        {"base": sync.digest, "digest": "next", "scores": {}, "results": {}, "removed": []}, **changes)}}
+
+
+def test_diff_against_other_results_is_a_gap():
+    sync = base({"Clarity": [0.5, 3], "Depth": [0.5, 4]})
+
+    with pytest.raises(EvaluationGap):
+        sync.apply(diff(sync, base="someone else's", scores={"Clarity": 5}))
+    assert sync.results is None and sync.digest is None
+
+
+def test_score_for_an_unseen_subcriterion_is_a_gap():
+    sync = base({"Clarity": [0.5, 3]})
+
+    with pytest.raises(EvaluationGap):
+        sync.apply(diff(sync, scores={"Depth": 5}))
+    assert sync.results is None
+
+
+def test_diff_without_any_results_is_a_gap():
+    sync = EvaluationSync(mode="diff")
+
+    with pytest.raises(EvaluationGap):
+        sync.apply(diff(sync, scores={"Clarity": 5}))
+
+
+def test_diff_applies_scores_results_and_removals():
+    sync = base({"Clarity": [0.5, 3], "Depth": [0.25, 4], "Style": [0.25, 2]})
+    data = diff(sync, scores={"Clarity": 5}, results={"Depth": [0.5, 4], "Focus": [0.1, 7]}, removed=["Style"])
+
+    sync.apply(data)
+
+    expected = {"Clarity": [0.5, 5], "Depth": [0.5, 4], "Focus": [0.1, 7]}
+    assert data["evaluation"]["evaluation_results"] == expected
+    assert sync.results == expected
+    assert sorted(sync.changed) == ["Clarity", "Depth", "Focus", "Style"]
+
+
+def test_repeated_diff_is_a_no_op():
+    # Streamed turns carry the evaluation in meta and again in the final data
+    sync = base({"Clarity": [0.5, 3]})
+    sync.apply(diff(sync, scores={"Clarity": 5}))
+    results = sync.results
+
+    again = {"evaluation": {"evaluation_results_diff": {"base": "stale", "digest": "next", "scores": {}}}}
+    sync.apply(again)
+
+    assert again["evaluation"]["evaluation_results"] is results
+
+
+def test_patched_table_matches_a_rebuilt_one():
+    sync = base({"Clarity": [0.5, 3], "Depth": [0.5, 4]})
+    table = evaluation_table(sync.results)
+    sync.apply(diff(sync, scores={"Depth": 9}))
+
+    patched = patch_evaluation_table(table, sync.results, sync.changed)
+
+    assert patched.equals(evaluation_table(sync.results))
+
+
+def test_changed_rows_rebuild_the_table():
+    sync = base({"Clarity": [0.5, 3]})
+    table = evaluation_table(sync.results)
+    sync.apply(diff(sync, results={"Depth": [0.5, 4]}))
+
+    assert patch_evaluation_table(table, sync.results, sync.changed) is None
+
+
+def test_app_table_follows_the_backend(backend):
+    at = interview("main_streamlit_02.py", answers=("Hello", "one", "two", "three"))
+
+    results = backend.backend.interviews[at.session_state["interview_id"]].results
+    assert at.session_state["evaluation_results"].equals(evaluation_table(results))
+    assert backend.backend.snapshot()["diff_evaluations"] == 2
+
+
+def test_app_refetches_the_full_evaluation_on_a_gap(backend):
+    at = interview("main_streamlit_02.py", answers=("Hello", "one"))
+    # The session loses the results the backend diffs against
+    at.session_state["evaluation_sync"].results = {}
+
+    answer(at, "A longer second answer")
+
+    results = backend.backend.interviews[at.session_state["interview_id"]].results
+    assert at.session_state["evaluation_results"].equals(evaluation_table(results))
+    snapshot = backend.backend.snapshot()
+    assert snapshot["full_evaluations"] == 2
+    # Asked again under the same key: replayed by the backend, not scored twice
+    assert snapshot["idempotent_replays"] == 1
+    assert backend.backend.interviews[at.session_state["interview_id"]].attempts == 2
+    assert not any("Error" in message["content"] for message in at.session_state["messages"])
@@ -0,0 +1,97 @@
+from conftest import interview, run_app
+
+from interview_app import instrumentation, state
+from interview_app.history import SUMMARY_KEY, HistoryWindow
+from interview_app.session_store import QUERY_PARAM
+
+
+def entries(n):
+    history = [{"greeting": "Hi", "answer": "hello"}, {"question": "Why?", "answer": "because"}]
+    history += [{"hint": f"hint {i}", "answer": f"answer {i}"} for i in range(n - 2)]
+    return history
+
+
+def test_short_histories_are_left_alone():
+    history = entries(5)
+
+    assert not HistoryWindow(size=2, fold_batch=4).fold(history)
+    assert history == entries(5)
+
+
+def test_fold_keeps_the_window_verbatim():
+    history = entries(6)
+
+    assert HistoryWindow(size=2, fold_batch=4).fold(history)
+
+    assert history[1:] == entries(6)[-2:]
+    summary = history[0]
+    assert summary["folded_entries"] == 4
+    assert summary[SUMMARY_KEY].splitlines()[:3] == ["Greeting", "A: hello", "Q: Why?"]
+
+
+def test_refolding_merges_the_previous_summary():
+    history = entries(6)
+    window = HistoryWindow(size=2, fold_batch=2)
+    window.fold(history)
+    history += [{"hint": "late", "answer": "late answer"}, {"hint": "later", "answer": "later answer"}]
+
+    assert window.fold(history)
+
+    assert history[0]["folded_entries"] == 6
+    assert "Greeting" in history[0][SUMMARY_KEY]
+    assert history[1:] == [{"hint": "late", "answer": "late answer"}, {"hint": "later", "answer": "later answer"}]
+
+
+def test_summary_drops_oldest_lines_past_the_cap():
+    history = entries(10)
+
+    HistoryWindow(size=1, fold_batch=1, summary_chars=60).fold(history)
+
+    summary = history[0][SUMMARY_KEY]
+    assert len(summary) <= 60
+    assert "answer 6" in summary
+    assert "Greeting" not in summary
+
+
+def test_disabled_window_never_folds():
+    history = entries(50)
+
+    assert not HistoryWindow(size=0).fold(history)
+    assert len(history) == 50
+
+
+def test_deep_sizeof_follows_containers():
+    text = "x" * 10_000
+
+    assert instrumentation.deep_sizeof({"a": [text]}) > 10_000
+    # Shared objects count once
+    assert instrumentation.deep_sizeof([text, text]) < 20_000
+
+
+def test_app_sends_the_folded_history(backend, monkeypatch):
+    monkeypatch.setattr(state, "HistoryWindow", lambda: HistoryWindow(size=2, fold_batch=1))
+
+    at = interview(answers=("Hello", "first", "second", "third"))
+
+    history = at.session_state["chat_history"]
+    assert SUMMARY_KEY in history[0]
+    assert len(history) <= 4
+    # The backend was sent the bounded list, folded as of the last request
+    sent = backend.backend.interviews[at.session_state["interview_id"]].chat_history
+    assert SUMMARY_KEY in sent[0]
+    assert len(sent) <= 4
+    # The displayed transcript keeps every message
+    assert len(at.session_state["messages"]) == 9
+
+
+def test_turns_keep_counting_after_a_fold(backend, monkeypatch):
+    monkeypatch.setattr(state, "HistoryWindow", lambda: HistoryWindow(size=2, fold_batch=1))
+    at = interview(answers=("Hello", "first", "second", "third"))
+
+    # Greeting, question and three hints, although the list holds fewer entries
+    assert at.session_state["turn"] == 5
+    assert len(at.session_state["chat_history"]) < 5
+
+    token = at.query_params[QUERY_PARAM]
+    restored = run_app(**{QUERY_PARAM: token[0] if isinstance(token, list) else token})
+    assert restored.session_state["turn"] == 5
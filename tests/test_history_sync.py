@@ -0,0 +1,77 @@
+from conftest import build_body, turn
+
+from interview_app.client import HistorySync
+
+
+def interview(client, url, sync, answers):
+    # Greeting, opening question, then one evaluated turn per answer
+    history = []
+    data = turn(client, url, build_body(history), sync)
+    interview_id = data["interview_id"]
+    history.append({"greeting": data["greeting"]})
+    data = turn(client, url, build_body(history, interview_id), sync)
+    history.append({"question": data["question"]})
+    for answer in answers:
+        history[-1]["answer"] = answer
+        data = turn(client, url, build_body(history, interview_id, answer, history[1]["question"]), sync)
+        history.append({"hint": data["hint"]})
+    return interview_id, history
+
+
+def test_later_turns_send_deltas(server, client):
+    sync = HistorySync(mode="delta")
+    interview_id, history = interview(client, server.url, sync, ["first", "second"])
+
+    # The greeting carries no interview_id yet, so the opening question goes in full too
+    stats = server.backend.snapshot()
+    assert stats["full_requests"] == 2
+    assert stats["delta_requests"] == 2
+    assert stats["history_gaps"] == 0
+    assert server.backend.interviews[interview_id].chat_history == history[:-1]
+    assert sync.acked == len(history) - 1
+
+
+def test_answer_in_place_resends_acknowledged_tail(server, client):
+    sync = HistorySync(mode="delta")
+    interview_id, history = interview(client, server.url, sync, [])
+
+    history[-1]["answer"] = "mutated in place"
+    prepared = sync.prepare(build_body(history, interview_id, "mutated in place", history[-1]["question"]))
+    assert prepared["history_base"] == len(history) - 1
+    assert prepared["chat_history_delta"] == [history[-1]]
+    assert "chat_history" not in prepared
+
+
+def test_history_gap_resyncs_with_full_transcript(server, client):
+    sync = HistorySync(mode="delta")
+    interview_id, history = interview(client, server.url, sync, ["first"])
+    # The backend restarted and lost the end of the transcript
+    del server.backend.interviews[interview_id].chat_history[1:]
+
+    history[-1]["answer"] = "second"
+    data = turn(client, server.url, build_body(history, interview_id, "second", history[1]["question"]), sync)
+
+    assert server.backend.snapshot()["history_gaps"] == 1
+    assert data["hint"]
+    assert server.backend.interviews[interview_id].chat_history == history
+    assert sync.acked == len(history)
+
+
+def test_unknown_interview_resyncs(server, client):
+    sync = HistorySync(mode="delta")
+    interview_id, history = interview(client, server.url, sync, [])
+    server.backend.interviews.clear()
+
+    history[-1]["answer"] = "first"
+    turn(client, server.url, build_body(history, interview_id, "first", history[1]["question"]), sync)
+
+    assert server.backend.snapshot()["history_gaps"] == 1
+    assert server.backend.interviews[interview_id].chat_history == history
+
+
+def test_full_mode_never_sends_deltas(server, client):
+    interview(client, server.url, HistorySync(mode="full"), ["first", "second"])
+
+    stats = server.backend.snapshot()
+    assert stats["delta_requests"] == 0
+    assert stats["full_requests"] == 4
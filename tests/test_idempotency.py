@@ -0,0 +1,156 @@
+import threading
+import time
+
+from conftest import interview, start_server, stop_server, turn
+
+from interview_app import settings
+from interview_app.backends import IDEMPOTENCY_HEADER, BackendPool
+from interview_app.core import build_body, turn_key
+from interview_app.workers import TurnRegistry
+
+
+def opened(client, url):
+    # An interview at its opening question; returns (interview_id, history)
+    data = turn(client, url, build_body([], None))
+    history = [{"greeting": data["greeting"]}]
+    interview_id = data["interview_id"]
+    history.append({"question": turn(client, url, build_body(history, interview_id))["question"]})
+    return interview_id, history
+
+
+def answer(client, url, key, interview_id, history, text="my answer"):
+    history = [dict(entry) for entry in history]
+    history[-1]["answer"] = text
+    body = build_body(history, interview_id, text, history[1]["question"])
+    res = client.post(url, body, headers={IDEMPOTENCY_HEADER: key})
+    res.raise_for_status()
+    return res.json()["data"]
+
+
+def test_same_key_is_replayed_without_rescoring(server, client):
+    interview_id, history = opened(client, server.url)
+
+    first = answer(client, server.url, "turn-1", interview_id, history)
+    second = answer(client, server.url, "turn-1", interview_id, history)
+
+    assert second == first
+    assert server.backend.snapshot()["idempotent_replays"] == 1
+    assert server.backend.interviews[interview_id].attempts == 1
+
+
+def test_new_key_is_scored_again(server, client):
+    interview_id, history = opened(client, server.url)
+
+    answer(client, server.url, "turn-1", interview_id, history)
+    answer(client, server.url, "turn-2", interview_id, history)
+
+    assert server.backend.snapshot()["idempotent_replays"] == 0
+    assert server.backend.interviews[interview_id].attempts == 2
+
+
+def test_turn_keys_are_scoped():
+    key = turn_key(("http://a",), "session-1", 7, 3, "q", "a")
+    assert key == turn_key(("http://a",), "session-1", 7, 3, "q", "a")
+    assert key != turn_key(("http://b",), "session-1", 7, 3, "q", "a")
+    assert key != turn_key(("http://a",), "session-2", 7, 3, "q", "a")
+    assert key != turn_key(("http://a",), "session-1", 7, 4, "q", "a")
+
+
+def test_run_replays_a_finished_stream(server, client):
+    interview_id, history = opened(client, server.url)
+    history[-1]["answer"] = "my answer"
+    body = build_body(history, interview_id, "my answer", history[1]["question"])
+    registry = TurnRegistry()
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return client.stream_interview(server.url, body, stream=True)
+
+    first = registry.run("turn-1", fetch)
+    first.text()
+
+    assert registry.run("turn-1", fetch) is first
+    assert len(fetches) == 1
+    assert registry.snapshot()["turns_replayed"] == 1
+
+
+def test_run_coalesces_a_duplicate_onto_the_running_stream(server, client):
+    interview_id, history = opened(client, server.url)
+    history[-1]["answer"] = "my answer"
+    body = build_body(history, interview_id, "my answer", history[1]["question"])
+    registry = TurnRegistry()
+    fetches = []
+
+    def fetch():
+        fetches.append(threading.current_thread().name)
+        return client.stream_interview(server.url, body, stream=True)
+
+    owner = registry.run("turn-1", fetch)
+    duplicates = []
+    waiter = threading.Thread(target=lambda: duplicates.append(registry.run("turn-1", fetch)), name="duplicate")
+    waiter.start()
+    while registry.snapshot()["turns_coalesced"] == 0:
+        waiter.join(0.01)
+    owner.text()
+    waiter.join(10)
+
+    assert duplicates == [owner]
+    assert len(fetches) == 1
+    assert registry.snapshot()["turns_in_flight"] == 0
+    assert registry.run("turn-1", fetch) is owner
+    assert registry.snapshot()["turns_replayed"] == 1
+
+
+def test_run_fetches_again_after_a_cut_short_owner(server, client):
+    interview_id, history = opened(client, server.url)
+    history[-1]["answer"] = "my answer"
+    body = build_body(history, interview_id, "my answer", history[1]["question"])
+    registry = TurnRegistry()
+
+    def fetch():
+        return client.stream_interview(server.url, body, stream=True)
+
+    owner = registry.run("turn-1", fetch)
+    next(iter(owner))
+    del owner
+    stream = registry.run("turn-1", fetch)
+
+    assert stream.text()
+    assert registry.snapshot()["turns_in_flight"] == 0
+
+
+def test_submit_shares_one_backend_call(server, client):
+    interview_id, history = opened(client, server.url)
+    history[-1]["answer"] = "my answer"
+    body = build_body(history, interview_id, "my answer", history[1]["question"])
+    pool = BackendPool((server.url,), health_interval=0)
+    registry = TurnRegistry()
+
+    first = registry.submit("turn-1", client, pool, body)
+    second = registry.submit("turn-1", client, pool, body)
+    first.result()
+    while registry.snapshot()["turns_in_flight"]:
+        # The registry moves the turn to its cache in the future's done callback
+        time.sleep(0.01)
+    third = registry.submit("turn-1", client, pool, body)
+
+    assert second is first
+    assert third.result() is first.result()
+    assert registry.snapshot() == {"turns_in_flight": 0, "turns_coalesced": 1, "turns_replayed": 1}
+    assert server.backend.interviews[interview_id].attempts == 1
+
+
+def test_a_fresh_backend_does_not_get_earlier_answers(backend, monkeypatch):
+    interview(answers=("Hello", "An answer"))
+    other = start_server()
+    try:
+        # Same interview ids, turns and answers, but another backend
+        monkeypatch.setattr(settings, "BACKEND_URL", other.url)
+        at = interview(answers=("Hello", "An answer"))
+        stats = other.backend.snapshot()
+    finally:
+        stop_server(other)
+
+    assert stats["requests"] == backend.backend.snapshot()["requests"]
+    assert at.session_state["final_score_history"]
@@ -0,0 +1,37 @@
+from conftest import build_body
+
+from interview_app import instrumentation
+from interview_app.instrumentation import RerunMetrics
+
+
+def test_phases_accumulate():
+    metrics = RerunMetrics("app")
+    metrics.add_phase("render", 1.5)
+    metrics.add_phase("render", 2.0)
+
+    record = metrics.finish()
+
+    assert record["phases"]["render"] == 3.5
+    assert record["phases"]["total_rerun"] >= 0
+    assert metrics.finished
+
+
+def test_calls_are_merged_into_the_rerun(server, client, monkeypatch):
+    metrics = RerunMetrics("app")
+    monkeypatch.setattr(instrumentation, "current", lambda: metrics)
+    stream = client.stream_interview(server.url, build_body([]), stream=True)
+    stream.text()
+
+    instrumentation.record_call(stream)
+
+    assert metrics.record["request_bytes"] == stream.metrics["request_bytes"] > 0
+    assert metrics.record["attempts"] == 1
+    assert metrics.record["response_bytes"] > 0
+    for phase in ("serialize", "network", "first_token", "stream", "decode"):
+        assert phase in metrics.record["phases"]
+
+
+def test_phase_outside_a_script_run_is_not_recorded():
+    with instrumentation.phase("render"):
+        pass
+    assert isinstance(instrumentation.current(), instrumentation._NullMetrics)
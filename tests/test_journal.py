@@ -0,0 +1,170 @@
+import time
+
+import pytest
+import requests
+from conftest import answer, interview
+
+from interview_app import settings, state
+from interview_app.backends import BackendPool, BackendUnavailable
+from interview_app.client import InterviewStreamError
+from interview_app.core import build_body
+from interview_app.journal import DONE, FAILED, SQLiteAnswerJournal, get_journal, retryable
+from interview_app.mock_server import MockRequestHandler
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return SQLiteAnswerJournal(path=str(tmp_path / "journal.db"), flush_interval=0.05, max_backoff=0.1)
+
+
+def settled(journal, key, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not journal.finished(key):
+        assert time.monotonic() < deadline, "the journal never sent the answer"
+        time.sleep(0.02)
+    return journal.collect(key)
+
+
+def test_queued_answer_is_sent_once_a_backend_attaches(server, client, journal):
+    urls = (server.url,)
+    journal.enqueue("turn-1", "session-1", urls, build_body([], None))
+    time.sleep(0.2)
+
+    # Nobody has registered a backend for these URLs yet
+    assert not journal.finished("turn-1")
+    assert journal.collect("turn-1") is None
+    assert journal.snapshot()["answers_queued"] == 1
+
+    journal.attach(urls, client, BackendPool(urls, health_interval=0))
+    entry = settled(journal, "turn-1")
+
+    assert entry.status == DONE
+    assert entry.result().data["greeting"]
+    assert journal.snapshot()["answers_queued"] == 0
+    assert journal.snapshot()["answers_flushed"] == 1
+    assert journal.snapshot()["journal_retries"] > 0
+
+
+def test_answers_are_sent_with_their_key(server, client, journal):
+    urls = (server.url,)
+    body = build_body([], None)
+    journal.attach(urls, client, BackendPool(urls, health_interval=0))
+
+    journal.enqueue("turn-1", "session-1", urls, body)
+    settled(journal, "turn-1")
+    journal.enqueue("turn-1", "session-1", urls, body)
+    settled(journal, "turn-1")
+
+    assert server.backend.snapshot()["idempotent_replays"] == 1
+
+
+def test_entries_leave_the_journal_once_discarded(server, client, journal):
+    urls = (server.url,)
+    journal.attach(urls, client, BackendPool(urls, health_interval=0))
+    journal.enqueue("turn-1", "session-1", urls, build_body([], None))
+    settled(journal, "turn-1")
+
+    # Until the session has saved the result, it can be collected again
+    assert journal.collect("turn-1").status == DONE
+    journal.discard("turn-1")
+
+    entry = journal.collect("turn-1")
+    assert entry.status == FAILED
+    with pytest.raises(InterviewStreamError):
+        entry.result()
+
+
+def test_rejected_answer_fails(server, client, journal):
+    urls = (server.url.replace("/begin_interview", "/missing"),)
+    journal.attach(urls, client, BackendPool(urls, health_interval=0))
+    journal.enqueue("turn-1", "session-1", urls, build_body([], None))
+
+    entry = settled(journal, "turn-1")
+
+    assert entry.status == FAILED
+    with pytest.raises(InterviewStreamError):
+        entry.result()
+
+
+def test_sessions_flush_in_order(journal):
+    urls = ("http://nowhere/begin_interview",)
+    for key, session in [("a-1", "a"), ("a-2", "a"), ("b-1", "b")]:
+        journal.enqueue(key, session, urls, {})
+
+    assert [key for key, _, _ in journal.next_batch()] == ["a-1", "b-1"]
+
+
+def test_prune_keeps_queued_answers(journal):
+    urls = ("http://nowhere/begin_interview",)
+    journal.enqueue("turn-1", "session-1", urls, {})
+    journal.retention = -1
+
+    journal.prune()
+
+    assert not journal.finished("turn-1")
+
+
+def http_error(status):
+    res = requests.Response()
+    res.status_code = status
+    return requests.HTTPError(response=res)
+
+
+def test_retryable_failures():
+    assert retryable(BackendUnavailable())
+    assert retryable(requests.ConnectionError())
+    assert retryable(requests.Timeout())
+    assert retryable(InterviewStreamError())
+    assert retryable(http_error(503))
+    assert retryable(http_error(500))
+    assert not retryable(http_error(404))
+    assert not retryable(ValueError())
+
+
+def test_app_applies_an_answer_once_the_backend_is_back(backend, monkeypatch):
+    # Every call is made in the foreground until the backend goes down
+    monkeypatch.setattr(settings, "OPENING_CACHE", [])
+    at = interview()
+    down = {"on": True}
+    do_post = MockRequestHandler.do_POST
+    monkeypatch.setattr(MockRequestHandler, "do_POST",
+                        lambda self: self.send_error(503) if down["on"] else do_post(self))
+
+    answer(at, "An answer")
+    assert at.session_state["queued_turn"] is not None
+    assert not at.session_state["final_score_history"]
+
+    down["on"] = False
+    deadline = time.monotonic() + 20
+    while at.session_state["queued_turn"] is not None:
+        assert time.monotonic() < deadline, "the queued answer was never applied"
+        time.sleep(0.1)
+        at.run()
+
+    assert not at.exception
+    assert len(at.session_state["final_score_history"]) == 1
+    assert not any("Error" in message["content"] for message in at.session_state["messages"])
+
+
+def test_app_keeps_the_journal_row_until_the_turn_is_saved(backend, monkeypatch):
+    monkeypatch.setattr(settings, "OPENING_CACHE", [])
+    at = interview()
+    down = {"on": True}
+    do_post = MockRequestHandler.do_POST
+    monkeypatch.setattr(MockRequestHandler, "do_POST",
+                        lambda self: self.send_error(503) if down["on"] else do_post(self))
+    answer(at, "An answer")
+    key = at.session_state["queued_turn"]
+    down["on"] = False
+    settled(get_journal(), key)
+
+    persist_turn = state.persist_turn
+    monkeypatch.setattr(state, "persist_turn", lambda *args: (_ for _ in ()).throw(OSError("disk full")))
+    at.run()
+    assert at.exception
+    # The session store still names the answer, and the journal still holds it
+    assert get_journal().collect(key).status == DONE
+
+    monkeypatch.setattr(state, "persist_turn", persist_turn)
+    at.run()
+    assert len(at.session_state["final_score_history"]) == 1
@@ -0,0 +1,23 @@
+import pytest
+
+from benchmarks.load_test import APPS, bench_app, percentile
+from interview_app import settings
+
+
+@pytest.mark.parametrize("app", APPS)
+def test_apps_run_a_short_interview(app, monkeypatch):
+    monkeypatch.setattr(settings, "BACKEND_URL", settings.BACKEND_URL)
+
+    result = bench_app(app, candidates=2, turns=2, words=5, latency=0.0, poll=0.01, timeout=30)
+
+    assert result["errors"] == []
+    assert len([s for s in result["turn_ms"].values() if s > 0]) == 3
+    # Per candidate: the greeting, the reply that brings the question, one scored answer
+    assert result["backend"]["requests"] == 6
+    assert result["bytes_per_turn"]["request_first"] > 0
+
+
+def test_percentile():
+    assert percentile([], 50) == 0.0
+    assert percentile([3, 1, 2], 50) == 2
+    assert percentile(list(range(101)), 95) == 95
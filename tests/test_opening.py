@@ -0,0 +1,148 @@
+import time
+
+import pytest
+from conftest import answer, interview, run_app
+
+from interview_app import core, opening, settings
+from interview_app.mock_server import GREETING, QUESTIONS, MockRequestHandler
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = opening.TTLCache(settings.OPENING_CACHE_SIZE, settings.OPENING_CACHE_TTL)
+    monkeypatch.setattr(opening, "_opening_cache", cache)
+    return cache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = opening.TTLCache(maxsize=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_ttl_cache_expires_entries():
+    cache = opening.TTLCache(maxsize=2, ttl=-1)
+    cache.put("a", 1)
+
+    assert cache.get("a") is None
+    assert cache.misses == 1
+
+
+def test_disabled_fields_are_not_cached(cache, monkeypatch):
+    monkeypatch.setattr(settings, "OPENING_CACHE", ["question"])
+    body = core.build_body([], 0)
+    opening.remember(body, "greeting", "Hi")
+    opening.remember(body, "question", "Why?")
+
+    assert opening.cached(body, "greeting") is None
+    assert opening.cached(body, "question") == "Why?"
+
+
+def test_second_interview_opens_from_the_cache(backend, cache):
+    first = interview(answers=("Hello", "An answer"))
+    requests = backend.backend.snapshot()["requests"]
+
+    second = interview(answers=("Hello", "An answer"))
+
+    assert cache.hits == 2
+    # The background calls still open the interview and register the greeting answer
+    assert backend.backend.snapshot()["requests"] == 2 * requests
+    assert second.session_state["interview_id"] != first.session_state["interview_id"]
+    assert second.session_state["chat_history"][:2] == first.session_state["chat_history"][:2]
+    assert second.session_state["final_score_history"]
+
+
+def test_stale_cache_is_corrected_by_the_backend(backend, cache):
+    opening.remember(core.build_body([], 0), "greeting", "An outdated greeting")
+
+    at = run_app()
+    at.button[0].click().run()
+    assert at.session_state["chat_history"] == [{"greeting": "An outdated greeting"}]
+
+    answer(at, "Hello")
+
+    assert at.session_state["chat_history"][0]["greeting"] == GREETING
+    assert opening.cached(core.build_body([], 0), "greeting") == GREETING
+
+
+def test_corrected_greeting_replaces_the_cached_one_on_screen(backend, cache):
+    opening.remember(core.build_body([], 0), "greeting", "An outdated greeting")
+
+    at = run_app("main_streamlit_02.py")
+    at.button[0].click().run()
+    answer(at, "Hello")
+
+    transcript = "".join(element.value for element in at.markdown)
+    assert GREETING in transcript
+    assert "An outdated greeting" not in transcript
+
+
+@pytest.fixture
+def outage(monkeypatch):
+    # Makes the mock backend answer every POST with the given status while set
+    outage = {"status": None}
+    do_post = MockRequestHandler.do_POST
+    monkeypatch.setattr(MockRequestHandler, "do_POST",
+                        lambda self: self.send_error(outage["status"]) if outage["status"] else do_post(self))
+    return outage
+
+
+def settle(at):
+    while at.session_state["speculative_turn"] is not None:
+        time.sleep(0.05)
+        at.run()
+
+
+def test_failed_opening_call_is_journaled(backend, cache, outage):
+    opening.remember(core.build_body([], 0), "greeting", GREETING)
+    outage["status"] = 503
+
+    at = run_app()
+    at.button[0].click().run()
+    settle(at)
+
+    assert at.session_state["queued_turn"] is not None
+    assert at.session_state["chat_history"] == [{"greeting": GREETING}]
+
+    outage["status"] = None
+    deadline = time.monotonic() + 20
+    while at.session_state["queued_turn"] is not None:
+        assert time.monotonic() < deadline, "the journaled opening call was never applied"
+        time.sleep(0.1)
+        at.run()
+
+    assert at.session_state["interview_id"] is not None
+    assert at.session_state["queued_opening"] is None
+    assert at.session_state["chat_history"] == [{"greeting": GREETING}]
+    assert not any("Error" in message["content"] for message in at.session_state["messages"])
+    answer(at, "Hello")
+    assert at.session_state["question"] in QUESTIONS
+
+
+def test_failed_opening_call_is_taken_back(backend, cache, outage):
+    at = run_app()
+    at.button[0].click().run()
+    question = QUESTIONS[core.build_body([], 0)["question_id"] % len(QUESTIONS)]
+    opening.remember(core.build_body([], 0), "question", question)
+    # Not something the journal retries
+    outage["status"] = 404
+
+    at.chat_input[0].set_value("Hello").run()
+    settle(at)
+
+    assert at.session_state["chat_history"] == [{"greeting": GREETING, "answer": "Hello"}]
+    assert at.session_state["turn"] == 1
+    assert at.session_state["question"] is None
+    assert at.session_state["queued_turn"] is None
+    assert [m["content"] for m in at.session_state["messages"]][:2] == [GREETING, "Hello"]
+    assert "Error" in at.session_state["messages"][-1]["content"]
+
+    outage["status"] = None
+    answer(at, "Hello again")
+    assert at.session_state["question"] == question
+    assert at.session_state["turn"] == 2
@@ -0,0 +1,35 @@
+from conftest import interview
+
+from interview_app import profiling, settings
+
+
+def test_profiled_reruns_are_aggregated(backend, tmp_path, monkeypatch):
+    profiles = profiling.RerunProfiles(directory=str(tmp_path), dump_interval=0)
+    monkeypatch.setattr(settings, "PROFILE", True)
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(profiling, "get_profiles", lambda: profiles)
+
+    # This skin draws the styled transcript and the charts
+    interview("main_streamlit_03.py", answers=("Hello", "An answer"))
+
+    stats = profiling.load(str(tmp_path))
+    reruns, total, categories = profiling.summary(stats)
+    assert reruns == profiles.reruns > 0
+    assert total > 0
+    assert categories["transcript"] > 0
+    assert categories["charts"] > 0
+
+    rows = profiling.flame_rows(stats)
+    assert rows[0][0] == 0
+    assert rows[0][1].endswith("_run")
+    assert all(share <= 1.0 for *_, share in rows)
+
+
+def test_reruns_are_not_profiled_when_off(backend, tmp_path, monkeypatch):
+    profiles = profiling.RerunProfiles(directory=str(tmp_path), dump_interval=0)
+    monkeypatch.setattr(profiling, "get_profiles", lambda: profiles)
+
+    interview()
+
+    assert profiles.reruns == 0
+    assert profiling.load(str(tmp_path)) is None
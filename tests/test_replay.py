@@ -0,0 +1,101 @@
+import csv
+import json
+
+from interview_app import replay
+
+TRANSCRIPT = [
+    {"greeting": "Hi", "answer": "hello"},
+    {"question": "Explain a hash map.", "answer": "buckets and a hash"},
+    {"hint": "What about collisions?", "answer": "chaining or open addressing"},
+]
+
+
+def write_transcripts(path, records):
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_scored_turns_skip_the_greeting():
+    turns = list(replay.scored_turns(TRANSCRIPT))
+
+    assert [(index, answer) for index, _, answer in turns] == [
+        (1, "buckets and a hash"), (2, "chaining or open addressing"),
+    ]
+    assert {question for _, question, _ in turns} == {"Explain a hash map."}
+
+
+def test_replay_scores_every_transcript(server, tmp_path):
+    source = tmp_path / "transcripts.jsonl"
+    write_transcripts(source, [{"id": "a", "chat_history": TRANSCRIPT}, TRANSCRIPT])
+    out = str(tmp_path / "rescored.csv")
+
+    stats = replay.replay(str(source), server.url, replay.ReplayOutput(out, "csv", 10), 2, per_turn=True)
+
+    assert stats == {"replayed": 2, "skipped": 0, "failed": 0}
+    rows = read_rows(out)
+    assert sorted((row["transcript_id"], row["turn"]) for row in rows) == [
+        ("a", "1"), ("a", "2"), ("line-2", "1"), ("line-2", "2"),
+    ]
+    assert {row["turns_scored"] for row in rows} == {"2"}
+    assert all(json.loads(row["criteria_score"]) for row in rows)
+
+
+def test_last_turn_only_by_default(server, tmp_path):
+    source = tmp_path / "transcripts.jsonl"
+    write_transcripts(source, [{"id": "a", "chat_history": TRANSCRIPT}])
+    out = str(tmp_path / "rescored.csv")
+
+    replay.replay(str(source), server.url, replay.ReplayOutput(out, "csv", 10), 1, per_turn=False)
+
+    assert [(row["transcript_id"], row["turn"]) for row in read_rows(out)] == [("a", "2")]
+
+
+def test_rerun_skips_checkpointed_transcripts(server, tmp_path):
+    source = tmp_path / "transcripts.jsonl"
+    write_transcripts(source, [{"id": "a", "chat_history": TRANSCRIPT}])
+    out = str(tmp_path / "rescored.csv")
+    replay.replay(str(source), server.url, replay.ReplayOutput(out, "csv", 1), 1, per_turn=False)
+    requests = server.backend.snapshot()["requests"]
+
+    write_transcripts(source, [{"id": "a", "chat_history": TRANSCRIPT}, {"id": "b", "chat_history": TRANSCRIPT}])
+    stats = replay.replay(str(source), server.url, replay.ReplayOutput(out, "csv", 1), 1, per_turn=False)
+
+    assert stats == {"replayed": 1, "skipped": 1, "failed": 0}
+    # Only "b" was sent again: its greeting and two answers
+    assert server.backend.snapshot()["requests"] == requests + 3
+    assert [row["transcript_id"] for row in read_rows(out)] == ["a", "b"]
+    with open(out + ".checkpoint") as f:
+        assert f.read().split() == ["a", "b"]
+
+
+def test_failed_transcripts_are_not_checkpointed(tmp_path):
+    source = tmp_path / "transcripts.jsonl"
+    write_transcripts(source, [{"id": "a", "chat_history": TRANSCRIPT}])
+    out = str(tmp_path / "rescored.csv")
+    output = replay.ReplayOutput(out, "csv", 1)
+
+    # Nothing listens on port 9 (discard)
+    stats = replay.replay(str(source), "http://127.0.0.1:9", output, 1, per_turn=False)
+
+    assert stats["failed"] == 1
+    assert output.completed() == set()
+
+
+def test_parquet_output_is_one_part_per_batch(server, tmp_path):
+    import pyarrow.parquet as pq
+
+    source = tmp_path / "transcripts.jsonl"
+    write_transcripts(source, [{"id": key, "chat_history": TRANSCRIPT} for key in "abc"])
+    out = str(tmp_path / "rescored")
+
+    replay.replay(str(source), server.url, replay.ReplayOutput(out, "parquet", 2), 1, per_turn=False)
+
+    table = pq.read_table(out)
+    assert sorted(table.column("transcript_id").to_pylist()) == ["a", "b", "c"]
+    assert len(list((tmp_path / "rescored").iterdir())) == 2
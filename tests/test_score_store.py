@@ -0,0 +1,102 @@
+import datetime
+
+import pytest
+from conftest import interview
+
+from interview_app import analytics, score_store, settings
+
+TS = datetime.datetime(2026, 1, 31, 12, tzinfo=datetime.timezone.utc).timestamp()
+DAY = datetime.date(2026, 1, 31)
+IDS = {"user_id": 4, "question_type_id": 1, "question_id": 13}
+
+
+def evaluation(final_score, criteria):
+    return {
+        "final_score": final_score,
+        "criteria_score": criteria,
+        "evaluation_results": {"Clarity": [0.5, final_score], "Depth": [0.5, final_score - 1]},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = score_store.ParquetScoreStore(root=str(tmp_path), batch_size=2, flush_interval=0.01)
+    yield store
+    store.close()
+
+
+def test_rows_keep_every_criterion():
+    rows = score_store.evaluation_rows(evaluation(7.0, [1.0] * 9), 5, IDS, ts=TS)
+
+    assert rows["evaluations"][0]["date"] == "2026-01-31"
+    assert [row["criterion"] for row in rows["criteria"]] == list(range(1, 10))
+    assert {row["subcriterion"] for row in rows["subcriteria"]} == {"Clarity", "Depth"}
+
+
+def write(store, count, question_id=13):
+    for n in range(count):
+        store.append(evaluation(float(n % 10), [float(n % 10), 5.0]), n, dict(IDS, question_id=question_id))
+    store.flush()
+
+
+def test_writes_hive_partitions(store, tmp_path):
+    write(store, 3)
+
+    partition = tmp_path / "evaluations" / f"date={datetime.date.today().isoformat()}" / "question_id=13"
+    files = sorted(p.name for p in partition.iterdir())
+    # One part file per writer batch
+    assert len(files) >= 2
+    assert not any(name.startswith(".") for name in files)
+
+
+def test_compact_merges_part_files(store, tmp_path):
+    write(store, 5)
+    today = datetime.date.today()
+    before = analytics.query.__wrapped__(str(tmp_path), today, today, ())
+
+    assert score_store.compact(str(tmp_path)) > 0
+
+    for table in score_store.TABLES:
+        partition = tmp_path / table / f"date={today.isoformat()}" / "question_id=13"
+        assert len(list(partition.iterdir())) == 1
+    after = analytics.query.__wrapped__(str(tmp_path), today, today, ())
+    assert after["evaluations"] == before["evaluations"] == 5
+    assert after["criteria"].equals(before["criteria"])
+
+
+def test_query_aggregates_the_selected_partitions(store, tmp_path):
+    write(store, 4, question_id=13)
+    write(store, 2, question_id=14)
+    today = datetime.date.today()
+
+    result = analytics.query.__wrapped__(str(tmp_path), today, today, (14,))
+
+    assert result["evaluations"] == 2
+    assert list(result["criteria"].index) == ["Criteria 1", "Criteria 2"]
+    assert result["criteria"].loc["Criteria 2", "mean"] == 5.0
+    assert set(result["subcriteria"].index) == {"Clarity", "Depth"}
+    assert analytics.query.__wrapped__(str(tmp_path), DAY, DAY, ()) is None
+
+
+def test_partitions_come_from_directory_names(store, tmp_path):
+    write(store, 1, question_id=13)
+    write(store, 1, question_id=21)
+
+    dates, question_ids = analytics.partitions.__wrapped__(str(tmp_path))
+
+    assert dates == [datetime.date.today().isoformat()]
+    assert question_ids == [13, 21]
+
+
+def test_app_records_evaluations(backend, tmp_path, monkeypatch):
+    store = score_store.ParquetScoreStore(root=str(tmp_path), flush_interval=0.01)
+    monkeypatch.setattr(score_store, "get_score_store", lambda: store)
+    try:
+        interview(answers=("Hello", "An answer"))
+        store.flush()
+    finally:
+        store.close()
+
+    today = datetime.date.today()
+    result = analytics.query.__wrapped__(str(tmp_path), today, today, (settings.DEFAULT_QUESTION_ID,))
+    assert result["evaluations"] == 1
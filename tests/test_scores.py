@@ -0,0 +1,114 @@
+import math
+
+import numpy as np
+import pytest
+
+from interview_app.scores import ScoreHistory, lttb
+
+
+def test_history_grows_past_its_capacity():
+    history = ScoreHistory(capacity=2)
+    for i in range(5):
+        history.append([i, i + 1])
+
+    assert len(history) == 5
+    assert history[-1] == [4.0, 5.0]
+    assert list(history) == [[float(i), float(i + 1)] for i in range(5)]
+
+
+def test_rows_keep_their_own_length():
+    history = ScoreHistory([[1, 2], [3, 4, 5], [6]])
+
+    assert history.width == 3
+    assert history[:] == [[1.0, 2.0], [3.0, 4.0, 5.0], [6.0]]
+    assert math.isnan(history.array()[0, 2])
+    assert np.isnan(history.array()[2, 1:]).all()
+
+
+def test_missing_scores_round_trip_as_none():
+    history = ScoreHistory([[1, None, 3]])
+    assert history[0] == [1.0, None, 3.0]
+
+
+def test_slices_and_indexing():
+    history = ScoreHistory([[i] for i in range(6)])
+
+    assert history[1:5:2] == [[1.0], [3.0]]
+    assert history[-2:] == [[4.0], [5.0]]
+    with pytest.raises(IndexError):
+        history[6]
+    with pytest.raises(IndexError):
+        history[-7]
+
+
+def test_scalar_history():
+    history = ScoreHistory([7.5, None, 9], scalar=True)
+
+    assert list(history) == [7.5, None, 9.0]
+    assert history.array().shape == (3, 1)
+
+
+def test_empty_history():
+    history = ScoreHistory()
+
+    assert len(history) == 0
+    assert history.width == 0
+    assert history.array() is None
+    assert history[:] == []
+
+
+def test_series_drop_missing_scores():
+    history = ScoreHistory([[1, 2], [3], [5, 6]])
+
+    (x0, y0), (x1, y1) = history.series(100)
+
+    assert x0.tolist() == [1.0, 2.0, 3.0] and y0.tolist() == [1.0, 3.0, 5.0]
+    assert x1.tolist() == [1.0, 3.0] and y1.tolist() == [2.0, 6.0]
+
+
+def test_series_are_recomputed_after_an_append():
+    history = ScoreHistory([[1], [2]])
+    first = history.series(100)
+    assert history.series(100) is first
+
+    history.append([3])
+
+    assert history.series(100)[0][1].tolist() == [1.0, 2.0, 3.0]
+
+
+def noisy(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(n, dtype=np.float64), rng.normal(size=n).cumsum()
+
+
+@pytest.mark.parametrize("n, threshold", [(10, 3), (100, 10), (1000, 37), (1001, 500)])
+def test_lttb_keeps_ends_and_threshold_points(n, threshold):
+    x, y = noisy(n)
+
+    sx, sy = lttb(x, y, threshold)
+
+    assert len(sx) == len(sy) == threshold
+    assert (sx[0], sx[-1]) == (x[0], x[-1])
+    assert (sy[0], sy[-1]) == (y[0], y[-1])
+    assert (np.diff(sx) > 0).all()
+    # Every kept point is one of the input points
+    assert (y[sx.astype(int)] == sy).all()
+
+
+def test_lttb_keeps_the_extremes_of_a_spike():
+    x = np.arange(100, dtype=np.float64)
+    y = np.zeros(100)
+    y[41] = 50.0
+
+    _, sy = lttb(x, y, 10)
+
+    assert 50.0 in sy
+
+
+@pytest.mark.parametrize("threshold", [100, 150, 2, 0])
+def test_lttb_returns_short_series_unchanged(threshold):
+    x, y = noisy(100)
+
+    sx, sy = lttb(x, y, threshold)
+
+    assert sx is x and sy is y
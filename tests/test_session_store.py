@@ -0,0 +1,53 @@
+import pytest
+from conftest import interview, run_app
+
+from interview_app.session_store import QUERY_PARAM, SQLiteSessionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteSessionStore(path=str(tmp_path / "sessions.db"), flush_interval=0.01)
+    yield store
+    store.close()
+
+
+def test_records_load_in_order_per_token(store):
+    store.append("a", {"n": 1})
+    store.append("b", {"n": 2})
+    store.append("a", {"n": 3})
+
+    assert store.load("a") == [{"n": 1}, {"n": 3}]
+    assert store.load("missing") == []
+
+
+def test_records_survive_a_new_store(store):
+    store.append("a", {"n": 1})
+    store.flush()
+
+    assert SQLiteSessionStore(path=store.path).load("a") == [{"n": 1}]
+
+
+@pytest.mark.parametrize("app", ["main_streamlit.py", "main_streamlit_02.py", "main_streamlit_03.py"])
+def test_refresh_resumes_from_the_session_token(backend, app):
+    at = interview(app)
+    token = at.query_params[QUERY_PARAM]
+    token = token[0] if isinstance(token, list) else token
+
+    assert token == at.session_state["client_id"]
+    assert token != str(at.session_state["interview_id"])
+
+    restored = run_app(app, **{QUERY_PARAM: token})
+    assert restored.session_state["interview_id"] == at.session_state["interview_id"]
+    assert restored.session_state["chat_history"] == at.session_state["chat_history"]
+    assert restored.session_state["client_id"] == token
+    assert backend.backend.snapshot()["requests"] == 2
+
+
+def test_interview_ids_in_the_url_open_nothing(backend):
+    at = interview()
+
+    guessed = run_app(interview_id=str(at.session_state["interview_id"]))
+    assert not guessed.session_state["chat_history"]
+
+    guessed = run_app(**{QUERY_PARAM: str(at.session_state["interview_id"])})
+    assert not guessed.session_state["chat_history"]
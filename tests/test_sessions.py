@@ -0,0 +1,236 @@
+import json
+import os
+
+import pytest
+from conftest import interview, run_app
+
+from interview_app import sessions, settings
+
+
+@pytest.fixture
+def roster(tmp_path, monkeypatch):
+    path = tmp_path / "roster.json"
+    path.write_text(json.dumps({"alice": {"user_id": 7, "question_type_id": 2, "question_id": 21}}))
+    monkeypatch.setattr(settings, "ROSTER_FILE", str(path))
+    return path
+
+
+def test_candidate_comes_from_the_roster(backend, roster):
+    at = run_app(candidate="alice")
+
+    assert at.session_state["candidate"] == {"user_id": 7, "question_type_id": 2, "question_id": 21}
+
+
+def test_unknown_candidate_is_refused(backend, roster):
+    at = run_app(candidate="mallory")
+
+    assert not at.exception
+    assert "not valid" in at.error[0].value
+    assert backend.backend.snapshot()["requests"] == 0
+
+
+def test_roster_is_reread_when_it_changes(roster):
+    assert set(sessions.load_roster()) == {"alice"}
+
+    roster.write_text(json.dumps({"bob": {"user_id": 8}}))
+    os.utime(roster, (0, 0))
+
+    assert set(sessions.load_roster()) == {"bob"}
+
+
+@pytest.mark.parametrize("content", [None, "[1, 2]", '{"alice": {"user_id": "seven"}}', "{broken"])
+def test_bad_rosters_refuse_candidate_links(backend, roster, content):
+    if content is None:
+        roster.unlink()
+    else:
+        roster.write_text(content)
+
+    at = run_app(candidate="alice")
+
+    assert not at.exception
+    assert "not valid" in at.error[0].value
+
+
+def test_ids_from_the_query_string(backend):
+    at = run_app(user_id="9", question_id="3")
+
+    assert at.session_state["candidate"] == {
+        "user_id": 9, "question_type_id": settings.DEFAULT_QUESTION_TYPE_ID, "question_id": 3,
+    }
+
+
+def test_query_ids_can_be_turned_off(backend, monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_IDS", False)
+
+    at = run_app(user_id="9")
+
+    assert at.session_state["candidate"]["user_id"] == settings.DEFAULT_USER_ID
+
+
+@pytest.fixture
+def manager():
+    return sessions.SessionManager(idle_timeout=60, memory_budget=1000, sweep_interval=3600)
+
+
+def add_session(manager, session_id, memory_bytes=0):
+    manager.begin(session_id, memory_bytes=memory_bytes)
+    manager.end(session_id)
+
+
+def test_idle_sessions_are_marked(manager):
+    add_session(manager, "idle")
+    add_session(manager, "fresh")
+    manager._sessions["idle"].last_seen -= 120
+
+    manager.sweep()
+
+    assert manager.marked("idle")
+    assert not manager.marked("fresh")
+    assert manager.snapshot()["marked"] == 1
+
+
+def test_running_sessions_are_kept(manager):
+    add_session(manager, "running")
+    manager.begin("running")
+    manager._sessions["running"].last_seen -= 120
+
+    manager.sweep()
+
+    assert not manager.marked("running")
+
+
+def test_least_recently_seen_go_first_over_budget(manager):
+    for n, session_id in enumerate(["old", "middle", "new"]):
+        add_session(manager, session_id, memory_bytes=400)
+        manager._sessions[session_id].last_seen -= 30 - n
+
+    manager.sweep()
+
+    assert [manager.marked(session_id) for session_id in ["old", "middle", "new"]] == [True, False, False]
+    # Still held until the marked session has been cleared
+    assert manager.snapshot()["memory_bytes"] == 1200
+
+    manager.cleared("old")
+    assert manager.snapshot()["memory_bytes"] == 800
+    assert not manager.marked("old")
+
+
+def test_sessions_with_a_call_in_flight_are_kept(manager):
+    manager.begin("waiting", in_flight=True)
+    manager.end("waiting")
+    manager._sessions["waiting"].last_seen -= 120
+
+    manager.sweep()
+
+    assert not manager.marked("waiting")
+
+
+class FakeLoop:
+    def __init__(self):
+        self.calls = []
+
+    def call_soon_threadsafe(self, fn, *args):
+        self.calls.append((fn, args))
+
+
+class FakeRuntime:
+    # Stands in for the Streamlit runtime of a served app
+    def __init__(self, active):
+        self.active = set(active)
+        self.eventloop = FakeLoop()
+
+    def exists(self):
+        return True
+
+    def instance(self):
+        return self
+
+    def is_active_session(self, session_id):
+        return session_id in self.active
+
+    def close_session(self, session_id):
+        self.active.discard(session_id)
+
+    def _get_async_objs(self):
+        return self
+
+
+@pytest.fixture
+def runtime(monkeypatch):
+    runtime = FakeRuntime(["idle", "fresh"])
+    monkeypatch.setattr(sessions, "Runtime", runtime)
+    return runtime
+
+
+def test_evicted_sessions_are_closed_on_the_runtime_loop(manager, runtime):
+    add_session(manager, "idle", memory_bytes=400)
+    add_session(manager, "fresh")
+    manager._sessions["idle"].last_seen -= 120
+
+    manager.sweep()
+
+    assert runtime.eventloop.calls == [(runtime.close_session, ("idle",))]
+    fn, args = runtime.eventloop.calls.pop()
+    fn(*args)
+
+    manager.sweep()
+
+    assert not manager.marked("idle")
+    assert manager.snapshot() == {"sessions": 1, "running": 0, "memory_bytes": 0, "marked": 0, "evicted": 1}
+
+
+def test_sessions_the_runtime_dropped_are_pruned(manager, runtime):
+    add_session(manager, "idle")
+    add_session(manager, "closed tab")
+
+    manager.sweep()
+
+    assert set(manager._sessions) == {"idle"}
+    assert manager.snapshot()["evicted"] == 0
+
+
+def test_a_rerun_unmarks_the_session(manager):
+    add_session(manager, "idle")
+    manager.evict("idle")
+
+    manager.begin("idle")
+
+    assert not manager.marked("idle")
+
+
+def mark_this_session(at):
+    manager = sessions.get_manager()
+    session_id = next(iter(manager._sessions))
+    assert manager.evict(session_id)
+    return manager
+
+
+def test_marked_session_clears_its_state_and_resumes(backend, monkeypatch):
+    # No background opening call left in flight
+    monkeypatch.setattr(settings, "OPENING_CACHE", [])
+    sessions.get_manager.clear()
+    at = interview()
+    # A rerun with nothing in flight, after the one that collected the answer
+    at.run()
+    history = at.session_state["chat_history"]
+    manager = mark_this_session(at)
+
+    at.run()
+
+    assert manager.snapshot()["evicted"] == 1
+    # Rebuilt from the session store through its ?session= token
+    assert at.session_state["chat_history"] == history
+
+
+def test_marked_session_keeps_a_call_in_flight(backend, monkeypatch):
+    monkeypatch.setattr(settings, "OPENING_CACHE", [])
+    sessions.get_manager.clear()
+    at = interview()
+    at.run()
+    manager = mark_this_session(at)
+    # Answered between the sweep and the rerun
+    at.session_state["queued_turn"] = "turn-1"
+
+    at.run()
+
+    assert manager.snapshot()["evicted"] == 0
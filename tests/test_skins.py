@@ -0,0 +1,47 @@
+import pytest
+from conftest import interview
+
+from interview_app import settings
+from interview_app.mock_server import MockRequestHandler
+
+APPS = ["main_streamlit.py", "main_streamlit_02.py", "main_streamlit_03.py"]
+
+
+@pytest.mark.parametrize("app", APPS)
+def test_every_skin_runs_an_interview(backend, app):
+    at = interview(app, ["Hello", "My answer"])
+
+    history = at.session_state["chat_history"]
+    assert list(history[0]) == ["greeting", "answer"]
+    assert list(history[1]) == ["question", "answer"]
+    assert history[1]["answer"] == "My answer"
+    assert len(history) == 3
+    assert at.session_state["final_score_history"][:] == [at.session_state["final_score"]]
+    assert len(at.session_state["criteria_score_history"]) == 1
+    assert [m["role"] for m in at.session_state["messages"]] == ["assistant", "user", "assistant", "user",
+                                                                 "assistant"]
+
+
+@pytest.mark.parametrize("app", APPS[1:])
+def test_column_skins_keep_the_results_table(backend, app):
+    at = interview(app, ["Hello", "My answer"])
+
+    table = at.session_state["evaluation_results"]
+    results = at.session_state["response"]["evaluation"]["evaluation_results"]
+    assert list(table["Subcriteria"]) == list(results)
+    assert list(table["Score"]) == [score for _, score in results.values()]
+
+
+@pytest.mark.parametrize("app", APPS)
+def test_backend_errors_are_shown_not_raised(backend, app, monkeypatch):
+    # No opening call left in flight to fail instead of the answer
+    monkeypatch.setattr(settings, "OPENING_CACHE", [])
+    at = interview(app)
+    monkeypatch.setattr(MockRequestHandler, "do_POST", lambda self: self.send_error(400))
+
+    at.chat_input[0].set_value("My answer").run()
+    while at.session_state["pending_turn"] is not None:
+        at.run()
+
+    assert not at.exception
+    assert "Error" in at.session_state["messages"][-1]["content"]
@@ -0,0 +1,141 @@
+import json
+import subprocess
+import sys
+import time
+
+import pytest
+from conftest import ROOT, build_body, interview
+
+from interview_app import sessions, settings, socket_transport
+from interview_app.client import HistorySync
+from interview_app.socket_server import SocketServer
+
+
+@pytest.fixture
+def socket_server():
+    return SocketServer(port=0).start()
+
+
+@pytest.fixture
+def socket(socket_server):
+    socket = socket_transport.InterviewSocket(url=socket_server.url, read_timeout=5)
+    yield socket
+    socket.close()
+
+
+def answered(socket, sync):
+    # Greeting, then its answer: the next turn carries an interview_id
+    stream = socket.stream_interview(None, build_body([]), sync=sync)
+    greeting = "".join(stream)
+    history = [{"greeting": greeting, "answer": "Hello"}]
+    stream = socket.stream_interview(None, build_body(history, stream.data["interview_id"], "Hello"), sync=sync)
+    list(stream)
+    history.append({"question": stream.data["question"]})
+    return history, stream.data["interview_id"]
+
+
+def test_greeting_streams_over_the_socket(socket):
+    stream = socket.stream_interview(None, build_body([]))
+    tokens = list(stream)
+
+    assert len(tokens) > 1
+    assert "".join(tokens) == stream.data["greeting"]
+    assert stream.metrics["transport"] == "websocket"
+
+
+def test_turns_share_one_connection_and_send_deltas(socket, socket_server):
+    sync = HistorySync()
+    history, interview_id = answered(socket, sync)
+    history[-1]["answer"] = "An answer"
+
+    stream = socket.stream_interview(None, build_body(history, interview_id, "An answer", history[-1]["question"]),
+                                     sync=sync)
+    list(stream)
+
+    assert stream.data["evaluation"]["final_score"] is not None
+    assert socket.connects == 1
+    stats = socket_server.backend.snapshot()
+    assert stats["socket_connections"] == 1
+    assert stats["delta_requests"] >= 1
+    assert socket_server.backend.interviews[interview_id].chat_history == history
+
+
+def test_lost_interview_is_resent_in_full(socket, socket_server):
+    sync = HistorySync()
+    history, interview_id = answered(socket, sync)
+    full = socket_server.backend.snapshot()["full_requests"]
+    socket_server.backend.interviews.clear()
+
+    history[-1]["answer"] = "An answer"
+    stream = socket.stream_interview(None, build_body(history, interview_id, "An answer", history[-1]["question"]),
+                                     sync=sync)
+    list(stream)
+
+    assert stream
+    assert socket_server.backend.snapshot()["history_gaps"] == 1
+    assert socket_server.backend.snapshot()["full_requests"] == full + 1
+
+
+def test_invalid_turn_error_names_the_turn(socket):
+    socket._loop.run(socket._send(json.dumps({"type": "turn", "id": 5, "body": "not a body"})))
+
+    message = json.loads(socket._loop.run(socket._receive()))
+
+    assert (message["type"], message["id"], message["status"]) == ("error", 5, 400)
+
+
+def test_error_without_an_id_ends_the_waiting_turn(socket):
+    socket._loop.run(socket._send("{broken"))
+
+    message = socket._next(turn_id=7)
+
+    assert (message["type"], message["status"]) == ("error", 400)
+
+
+def test_idle_connection_is_reopened(socket_server):
+    socket = socket_transport.InterviewSocket(url=socket_server.url, idle_timeout=0.3, read_timeout=5)
+    try:
+        list(socket.stream_interview(None, build_body([])))
+        time.sleep(0.6)
+        list(socket.stream_interview(None, build_body([])))
+    finally:
+        socket.close()
+
+    assert socket.connects == 2
+
+
+def test_app_runs_over_the_socket(socket_server, monkeypatch):
+    monkeypatch.setattr(settings, "TRANSPORT", "websocket")
+    original = socket_transport.InterviewSocket
+    monkeypatch.setattr(socket_transport, "InterviewSocket", lambda: original(url=socket_server.url))
+
+    at = interview(answers=("Hello", "An answer"))
+
+    assert at.session_state["final_score_history"]
+    stats = socket_server.backend.snapshot()
+    assert stats["socket_connections"] == 1
+    assert stats["socket_turns"] == 3
+
+
+def test_socket_closes_with_an_evicted_session(socket_server, monkeypatch):
+    monkeypatch.setattr(settings, "TRANSPORT", "websocket")
+    monkeypatch.setattr(settings, "OPENING_CACHE", [])
+    original = socket_transport.InterviewSocket
+    monkeypatch.setattr(socket_transport, "InterviewSocket", lambda: original(url=socket_server.url))
+    sessions.get_manager.clear()
+    at = interview()
+    at.run()
+    socket = at.session_state["interview_socket"]
+    assert socket._conn is not None
+
+    manager = sessions.get_manager()
+    assert manager.evict(next(iter(manager._sessions)))
+
+    assert socket._conn is None
+
+
+def test_http_transport_does_not_load_the_socket_client():
+    code = "import sys, interview_app.core; print('interview_app.socket_transport' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert out.stdout.strip() == "False"
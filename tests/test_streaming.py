@@ -0,0 +1,47 @@
+from conftest import build_body
+
+from interview_app.client import HistorySync, TurnStream
+
+
+def test_streamed_greeting_arrives_in_tokens(server, client):
+    stream = client.stream_interview(server.url, build_body([]), stream=True)
+
+    assert stream.field == "greeting"
+    assert not stream.meta.get("greeting")
+    tokens = list(stream)
+    assert len(tokens) > 1
+    assert stream.data["greeting"] == "".join(tokens)
+    assert stream.data["interview_id"] == stream.meta["interview_id"]
+
+
+def test_plain_json_is_one_chunk(server, client):
+    stream = client.stream_interview(server.url, build_body([]), stream=False)
+
+    assert stream.data is not None
+    assert list(stream) == [stream.data["greeting"]]
+    assert stream.text() == stream.data["greeting"]
+
+
+def test_evaluation_is_in_the_meta_event(server, client):
+    sync = HistorySync(mode="delta")
+    greeting = client.stream_interview(server.url, build_body([]), sync, stream=True)
+    history = [{"greeting": greeting.text()}]
+    interview_id = greeting.data["interview_id"]
+    question = client.stream_interview(server.url, build_body(history, interview_id), sync, stream=True).text()
+    history.append({"question": question, "answer": "my answer"})
+
+    stream = client.stream_interview(server.url, build_body(history, interview_id, "my answer", question), sync,
+                                     stream=True)
+
+    assert stream.field == "hint"
+    assert "evaluation_results" in stream.meta["evaluation"]
+    assert stream.text() == stream.data["hint"]
+    assert server.backend.snapshot()["delta_requests"] == 1
+
+
+def test_failed_turn_is_falsy(server, client):
+    res = client.begin_interview(server.url.replace("/begin_interview", "/missing"), build_body([]))
+    stream = TurnStream(res)
+
+    assert not stream
+    assert stream.data is None
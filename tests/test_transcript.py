@@ -0,0 +1,87 @@
+from interview_app.transcript import PAGE_SIZE, TranscriptCache, minify_css, render_message
+
+
+def messages(n, start=0):
+    return [{"role": "user" if i % 2 else "assistant", "content": f"message {i}"} for i in range(start, start + n)]
+
+
+def test_pages_hold_page_size_messages():
+    transcript = messages(PAGE_SIZE * 2 + 3)
+
+    pages = TranscriptCache().sync(transcript)
+
+    assert len(pages) == 3
+    assert pages[0] == "".join(render_message(m) for m in transcript[:PAGE_SIZE])
+    assert pages[2] == "".join(render_message(m) for m in transcript[-3:])
+
+
+def test_appended_messages_extend_the_last_page():
+    cache = TranscriptCache()
+    transcript = messages(PAGE_SIZE)
+    full = cache.sync(transcript)[0]
+
+    transcript += messages(2, start=PAGE_SIZE)
+    pages = cache.sync(transcript)
+
+    assert pages[0] == full
+    assert pages[1] == "".join(render_message(m) for m in transcript[-2:])
+
+
+def test_messages_get_stable_ids():
+    cache = TranscriptCache()
+    transcript = messages(3)
+    cache.sync(transcript)
+    ids = [m["id"] for m in transcript]
+
+    cache.sync(transcript)
+
+    assert [m["id"] for m in transcript] == ids
+    assert cache.last_id == ids[-1]
+
+
+def test_sessions_share_rendered_pages():
+    transcript = messages(PAGE_SIZE + 1)
+    first = TranscriptCache().sync(transcript)
+
+    # A restored session renders the same messages under the same ids
+    second = TranscriptCache().sync([dict(m) for m in transcript])
+
+    assert second == first
+    assert second[0] is first[0]
+
+
+def test_cleared_transcript_is_rebuilt():
+    cache = TranscriptCache()
+    cache.sync(messages(5))
+
+    fresh = messages(2, start=10)
+    pages = cache.sync(fresh)
+
+    assert pages == ["".join(render_message(m) for m in fresh)]
+
+
+def test_replaced_transcript_of_the_same_length_is_rebuilt():
+    cache = TranscriptCache()
+    cache.sync(messages(3))
+
+    other = messages(3, start=10)
+    pages = cache.sync(other)
+
+    assert pages == ["".join(render_message(m) for m in other)]
+
+
+def test_minify_css():
+    css = "/* header */\n.box {\n  color: red;\n  margin : 0 ;\n}\n"
+    assert minify_css(css) == ".box{color:red;margin:0}"
+
+
+def test_corrected_message_is_rendered_again():
+    cache = TranscriptCache()
+    transcript = messages(3)
+    cache.sync(transcript)
+
+    transcript[-1].update(content="corrected", id="new-id")
+    pages = cache.sync(transcript)
+
+    assert pages == ["".join(render_message(m) for m in transcript)]
+    assert "corrected" in pages[0]
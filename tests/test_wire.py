@@ -0,0 +1,89 @@
+import pytest
+from conftest import build_body, start_server, stop_server, turn
+
+from interview_app import wire
+from interview_app.client import WireNegotiation
+
+LONG_ANSWER = "a thorough answer " * 200
+
+
+def test_parse_header_drops_refused_entries():
+    assert wire.parse_header("zstd, GZIP;q=0.5, br;q=0") == ["zstd", "gzip"]
+    assert wire.parse_header(None) == []
+
+
+def test_choose_prefers_our_order():
+    assert wire.choose("gzip, zstd", ["zstd", "gzip"]) == "zstd"
+    assert wire.choose("br", ["zstd", "gzip"]) is None
+
+
+def test_gzip_round_trip():
+    data = wire.encode({"answer": LONG_ANSWER})
+    packed = wire.compress(data, "gzip")
+
+    assert len(packed) < len(data)
+    assert wire.decode(wire.decompress(packed, "gzip")) == {"answer": LONG_ANSWER}
+
+
+@pytest.mark.parametrize("data, encoding", [(b"not gzip", "gzip"), (b"{}", "br")])
+def test_bad_bodies_raise_value_error(data, encoding):
+    with pytest.raises(ValueError):
+        wire.decompress(data, encoding)
+
+
+def answered(client, url):
+    # An interview whose next request carries a long transcript
+    data = turn(client, url, build_body([]))
+    history = [{"greeting": data["greeting"], "answer": LONG_ANSWER}]
+    return build_body(history, data["interview_id"], LONG_ANSWER)
+
+
+def test_bodies_are_compressed_once_advertised(server, client):
+    body = answered(client, server.url)
+    assert server.backend.snapshot()["compressed_requests"] == 0
+
+    turn(client, server.url, body)
+
+    assert server.backend.snapshot()["compressed_requests"] == 1
+    assert server.backend.interviews[body["interview_id"]].chat_history == body["chat_history"]
+
+
+def test_small_bodies_stay_uncompressed(server, client):
+    turn(client, server.url, build_body([]))
+    turn(client, server.url, build_body([]))
+
+    assert server.backend.snapshot()["compressed_requests"] == 0
+
+
+def test_plain_backend_only_gets_json(client):
+    server = start_server(negotiate=False)
+    try:
+        body = answered(client, server.url)
+        turn(client, server.url, body)
+        stats = server.backend.snapshot()
+    finally:
+        stop_server(server)
+
+    assert stats["compressed_requests"] == 0
+    assert stats["requests"] == 2
+
+
+def test_refused_body_is_resent_as_plain_json(server, client):
+    body = answered(client, server.url)
+    # The backend stops accepting what it advertised
+    server.negotiate = False
+
+    data = turn(client, server.url, body)
+
+    assert data["interview_id"] == body["interview_id"]
+    stats = server.backend.snapshot()
+    assert stats["requests"] == 3
+    assert stats["compressed_requests"] == 0
+    assert client.wire.encode(server.url, body)[1] == {"Content-Type": wire.JSON_TYPE}
+
+
+def test_negotiation_respects_settings():
+    negotiation = WireNegotiation(compression="none", body_format="json")
+
+    assert negotiation.encodings == []
+    assert negotiation.accept_headers()["Accept"] == wire.JSON_TYPE
@@ -0,0 +1,51 @@
+import threading
+
+from conftest import build_body, interview, start_server, stop_server
+
+from interview_app import settings
+from interview_app.backends import BackendPool
+from interview_app.workers import SubmissionPool, submit_turn
+
+
+def test_pool_counts_calls_in_flight():
+    pool = SubmissionPool(max_workers=2)
+    release = threading.Event()
+    futures = [pool.submit(release.wait, 10) for _ in range(3)]
+    assert pool.in_flight == 3
+
+    release.set()
+    for future in futures:
+        future.result()
+    assert pool.in_flight == 0
+
+
+def test_submitted_turn_streams_on_a_worker(client):
+    server = start_server(latency=0.2)
+    try:
+        pending = submit_turn(client, BackendPool([server.url], health_interval=0), build_body([]))
+        assert not pending.done()
+
+        stream = pending.result()
+    finally:
+        stop_server(server)
+
+    assert pending.done()
+    assert pending.stream is stream
+    assert pending.partial_text() == stream.data["greeting"]
+    # Read to the end on the worker; iterating again yields the whole text once
+    assert list(stream) == [stream.data["greeting"]]
+
+
+def test_submitted_body_does_not_share_the_history(backend, monkeypatch):
+    monkeypatch.setattr(settings, "OPENING_CACHE", [])
+    at = interview()
+    # Still in flight when the script run ends
+    backend.backend.latency = 0.5
+
+    at.chat_input[0].set_value("My answer").run()
+
+    history = at.session_state["chat_history"]
+    sent = at.session_state["pending_turn"].body["chat_history"]
+    assert sent == history
+    assert sent is not history
+    assert not any(entry is original for entry, original in zip(sent, history))